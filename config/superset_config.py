@@ -1,8 +1,13 @@
 # Superset configuration file for DIBIE
 
 import os
+import sqlite3
+import sys
 from pathlib import Path
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
 # Base directory
 BASE_DIR = Path(__file__).parent.parent
 
@@ -48,10 +53,53 @@ FEATURE_FLAGS = {
 }
 
 # Cache configuration
-CACHE_CONFIG = {
-    'CACHE_TYPE': 'SimpleCache',
-    'CACHE_DEFAULT_TIMEOUT': 300,
-}
+# Shared by every worker and kept across restarts, so results warmed by
+# SupersetManager.refresh_after_sync after a DIBIE sync are reused.
+# Entries are invalidated per dataset when a sync changes their tables,
+# which allows a long timeout. Set DIBIE_CACHE_REDIS_URL to use Redis.
+DIBIE_CACHE_DIR = DIBIE_DATA_DIR / 'cache' / 'superset'
+DIBIE_CACHE_REDIS_URL = os.environ.get('DIBIE_CACHE_REDIS_URL')
+
+
+def _dibie_cache(prefix, timeout):
+    if DIBIE_CACHE_REDIS_URL:
+        return {
+            'CACHE_TYPE': 'RedisCache',
+            'CACHE_REDIS_URL': DIBIE_CACHE_REDIS_URL,
+            'CACHE_KEY_PREFIX': f'dibie_{prefix}_',
+            'CACHE_DEFAULT_TIMEOUT': timeout,
+        }
+    return {
+        'CACHE_TYPE': 'FileSystemCache',
+        'CACHE_DIR': str(DIBIE_CACHE_DIR / prefix),
+        'CACHE_THRESHOLD': 10000,
+        'CACHE_DEFAULT_TIMEOUT': timeout,
+    }
+
+
+CACHE_CONFIG = _dibie_cache('metadata', 300)
+DATA_CACHE_CONFIG = _dibie_cache('data', 24 * 60 * 60)
+
+# SQLite warehouse connections
+# The loaders keep the DIBIE databases in WAL mode. Dashboard connections to
+# files under data/database get the reader pragmas of SQLiteProfile
+# (query_only, page cache, mmap, in-memory temp tables), so queries read the
+# last committed snapshot while a sync is writing instead of waiting for it.
+sys.path.insert(0, str(BASE_DIR / 'src'))
+from ingestion.sqlite_profile import SQLiteProfile  # noqa: E402
+
+DIBIE_DATABASE_DIR = (DIBIE_DATA_DIR / 'database').resolve()
+DIBIE_SQLITE_PROFILE = SQLiteProfile()
+
+
+@event.listens_for(Engine, 'connect')
+def _dibie_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    files = SQLiteProfile.database_files(dbapi_connection)
+    if any(Path(name).resolve().parent == DIBIE_DATABASE_DIR for name in files):
+        DIBIE_SQLITE_PROFILE.apply(dbapi_connection, read_only=True)
+
 
 # Upload folder
 UPLOAD_FOLDER = str(BASE_DIR / 'data' / 'uploads')
@@ -200,7 +200,15 @@ class DataNormalizer:
         return "\n".join(sql_lines)
 
 
-def main():
+def main(df: pd.DataFrame = None) -> Dict:
+    """Analizar la tabla maestra
+    
+    Args:
+        df: Tabla maestra ya leída (se lee de Google Sheets si es None)
+    
+    Returns:
+        Propuesta de tablas atómicas
+    """
     print("=" * 70)
     print("DIBIE - Análisis de Tabla Maestra de Datos Financieros")
     print("=" * 70)
@@ -213,12 +221,13 @@ def main():
     
     # 1. Leer datos
     print("\n1. Leyendo datos de Google Sheets...")
-    try:
-        df = normalizer.reader.read_sheet(url)
-        print(f"   ✓ Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
-    except Exception as e:
-        print(f"   ✗ Error al leer datos: {e}")
-        return
+    if df is None:
+        try:
+            df = normalizer.reader.read_sheet(url)
+        except Exception as e:
+            print(f"   ✗ Error al leer datos: {e}")
+            return
+    print(f"   ✓ Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
     
     # 2. Crear diccionario de datos
     print("\n2. Creando diccionario de datos...")
@@ -300,11 +309,14 @@ def main():
         df_clean = df.copy()
         cols = pd.Series(df_clean.columns)
         
-        # Rename duplicate columns
+        # Rename duplicate columns (on a new list: the column index is
+        # shared with the caller's DataFrame)
+        new_columns = list(df_clean.columns)
         for dup in cols[cols.duplicated()].unique():
-            indices = [i for i, x in enumerate(df_clean.columns) if x == dup]
+            indices = [i for i, x in enumerate(new_columns) if x == dup]
             for i, idx in enumerate(indices[1:], start=1):
-                df_clean.columns.values[idx] = f"{dup}_{i}"
+                new_columns[idx] = f"{dup}_{i}"
+        df_clean.columns = new_columns
         
         df_clean.to_parquet(parquet_path, index=False)
         print(f"   ✓ Datos guardados en: {parquet_path}")
@@ -328,6 +340,8 @@ def main():
     print(f"  2. {tables_path}")
     print(f"  3. {sql_path}")
     print(f"  4. {parquet_path}")
+    
+    return tables
 
 
 if __name__ == "__main__":
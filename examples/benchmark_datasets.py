@@ -0,0 +1,224 @@
+"""
+DIBIE - Datos sintéticos para benchmarks
+Tablas con los esquemas reales del flujo DIBIE a la escala de los datos del DANE
+"""
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "data" / "templates"
+
+# Columnas de la hoja maestro que la propuesta asigna a cada tabla
+COLUMNAS_FINANCIERAS = [
+    "valor_lote",
+    "Recursos humanos",
+    "Resp. De Ingresos",
+    "INGRESOS",
+    "INGRESOS DE OPERACIÓN (2-6)",
+    "Valor anual servicio educativo (3+4+5)",
+    "INGRESOS POR OTROS COBROS",
+    "TOTAL INGRESOS (1+9)",
+    "EGRESOS",
+    "INGRESOS NO OPERACIONALES",
+]
+COLUMNAS_TIEMPO = [
+    "Numero de estudiantes (Total estudiantes matriculados el año anterior, incluyendo contratados con la secretaria)",
+    "Costo por estudiante año anterior (en pesos) (Subtotal costo / Número de estudiantes)",
+]
+
+# (columna en la hoja maestro, código, nombre, nivel educativo)
+GRADOS = [
+    ("Prejardín", "PJ", "Prejardín", "Preescolar"),
+    ("Jardín", "J", "Jardín", "Preescolar"),
+    ("Transición", "T", "Transición", "Preescolar"),
+    ("1", "1", "Primero", "Primaria"),
+    ("2", "2", "Segundo", "Primaria"),
+    ("3", "3", "Tercero", "Primaria"),
+    ("4", "4", "Cuarto", "Primaria"),
+    ("5", "5", "Quinto", "Primaria"),
+    ("6", "6", "Sexto", "Secundaria"),
+    ("7", "7", "Séptimo", "Secundaria"),
+    ("8", "8", "Octavo", "Secundaria"),
+    ("9", "9", "Noveno", "Secundaria"),
+    ("10", "10", "Décimo", "Media"),
+    ("11", "11", "Once", "Media"),
+]
+
+MUNICIPIOS = [
+    ("Bogota", "Cundinamarca", 4.65, -74.08),
+    ("Medellin", "Antioquia", 6.25, -75.56),
+    ("Cali", "Valle del Cauca", 3.45, -76.53),
+    ("Barranquilla", "Atlantico", 10.96, -74.80),
+    ("Bucaramanga", "Santander", 7.12, -73.12),
+    ("Pasto", "Nariño", 1.21, -77.28),
+    ("Villavicencio", "Meta", 4.14, -73.63),
+    ("Tunja", "Boyaca", 5.54, -73.36),
+]
+
+PLANTILLAS_COSTOS = [
+    "costos_personal",
+    "servicios_publicos",
+    "servicios_contratados",
+    "materiales_suministros",
+    "mantenimiento",
+    "gastos_administrativos",
+]
+
+
+def numero_hoja(values: np.ndarray) -> np.ndarray:
+    """Enteros como texto con separador de miles, como llegan de Google Sheets"""
+    return np.array([f"{v:,}".replace(",", ".") for v in values], dtype=object)
+
+
+def maestro_instituciones(instituciones: int, rng: np.random.Generator) -> pd.DataFrame:
+    """maestro_instituciones geocodificado"""
+    municipio = rng.integers(0, len(MUNICIPIOS), instituciones)
+    lugares = pd.DataFrame(MUNICIPIOS, columns=["municipio", "departamento", "latitud", "longitud"]).iloc[municipio]
+    ids = np.arange(1, instituciones + 1)
+    return pd.DataFrame({
+        "iebm_id": ids,
+        "dane_institucion": (311001000000 + ids * 7).astype(str),
+        "nombre": [f"Colegio Sintético {i}" for i in ids],
+        "direccion": [f"Calle {i % 200 + 1} # {i % 97 + 1}-{i % 89 + 1}" for i in ids],
+        "municipio": lugares["municipio"].to_numpy(),
+        "departamento": lugares["departamento"].to_numpy(),
+        "latitud": lugares["latitud"].to_numpy() + rng.normal(0, 0.05, instituciones),
+        "longitud": lugares["longitud"].to_numpy() + rng.normal(0, 0.05, instituciones),
+    })
+
+
+def hoja_maestro(maestro: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Hoja "maestro" tal como la devuelve GoogleSheetsReader: todo en texto"""
+    n = len(maestro)
+    hoja = {
+        "cod_colegio": maestro["dane_institucion"].to_numpy(),
+        "nombre_colegio": maestro["nombre"].to_numpy(),
+        "direccion": maestro["direccion"].to_numpy(),
+        "municipio": maestro["municipio"].to_numpy(),
+    }
+    for col in COLUMNAS_FINANCIERAS:
+        hoja[col] = numero_hoja(rng.integers(0, 5_000_000_000, n))
+    hoja[COLUMNAS_TIEMPO[0]] = numero_hoja(rng.integers(100, 3000, n))
+    hoja[COLUMNAS_TIEMPO[1]] = numero_hoja(rng.integers(2_000_000, 12_000_000, n))
+    for columna, _, _, _ in GRADOS:
+        hoja[columna] = numero_hoja(rng.integers(0, 220, n))
+    return pd.DataFrame(hoja)
+
+
+def hechos_matricula(maestro: pd.DataFrame, rng: np.random.Generator, anio: int = 2024) -> pd.DataFrame:
+    """Una fila por institución y grado"""
+    n = len(maestro)
+    grados = pd.DataFrame(GRADOS, columns=["columna", "grado_codigo", "grado_nombre", "nivel_educativo"])
+    return pd.DataFrame({
+        "dane_institucion": np.repeat(maestro["dane_institucion"].to_numpy(), len(GRADOS)),
+        "anio": anio,
+        "grado_codigo": np.tile(grados["grado_codigo"].to_numpy(), n),
+        "grado_nombre": np.tile(grados["grado_nombre"].to_numpy(), n),
+        "nivel_educativo": np.tile(grados["nivel_educativo"].to_numpy(), n),
+        "cantidad_estudiantes": rng.integers(0, 220, n * len(GRADOS)),
+    })
+
+
+def hechos_financieros(maestro: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Una fila de hechos financieros por institución"""
+    n = len(maestro)
+    hechos = pd.DataFrame({
+        "hecho_id": np.arange(1, n + 1),
+        "institucion_id": maestro["iebm_id"].to_numpy(),
+        "fecha_id": 2024,
+    })
+    for col in COLUMNAS_FINANCIERAS:
+        hechos[col] = rng.integers(0, 5_000_000_000, n).astype(float)
+    return hechos
+
+
+def plantilla_costos(nombre: str, maestro: pd.DataFrame, filas: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Filas de una plantilla de costos de data/templates
+    
+    Las columnas son las de la plantilla; cada fila parte de una de sus
+    filas de ejemplo con otra institución, otro mes y valores escalados.
+    """
+    ejemplo = pd.read_csv(TEMPLATES_DIR / f"{nombre}.csv")
+    df = ejemplo.iloc[rng.integers(0, len(ejemplo), filas)].reset_index(drop=True)
+    
+    instituciones = maestro.iloc[rng.integers(0, len(maestro), filas)]
+    df["institucion_id"] = "INST_" + instituciones["iebm_id"].astype(str).to_numpy()
+    df["dane_institucion"] = instituciones["dane_institucion"].to_numpy()
+    df["anio"] = 2024
+    df["mes"] = rng.integers(1, 13, filas)
+    
+    factor = rng.lognormal(0, 0.5, filas)
+    for col in df.columns:
+        if col in ("anio", "mes") or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if col.startswith(("numero", "cantidad", "consumo", "dias")):
+            df[col] = np.maximum(1, np.round(df[col] * factor)).astype("int64")
+        else:
+            df[col] = np.round(df[col] * factor, 0)
+    for col in df.columns:
+        if col.startswith("fecha_"):
+            df[col] = [f"2024-{mes:02d}-{dia:02d}" for mes, dia in zip(df["mes"], rng.integers(1, 29, filas))]
+    return df
+
+
+def generate(filas: int, seed: int = 0) -> dict:
+    """Datos sintéticos a una escala
+    
+    Args:
+        filas: Filas de hechos_matricula; las instituciones son filas / 14
+            y cada plantilla de costos tiene filas / 6
+        seed: Semilla del generador
+    
+    Returns:
+        Nombre de la tabla a DataFrame, más "hoja_maestro" con la hoja cruda
+    """
+    rng = np.random.default_rng(seed)
+    instituciones = max(1, filas // len(GRADOS))
+    maestro = maestro_instituciones(instituciones, rng)
+    
+    tablas = {
+        "hoja_maestro": hoja_maestro(maestro, rng),
+        "maestro_instituciones": maestro,
+        "ubicacion_geografica": maestro[["iebm_id", "direccion", "municipio", "departamento", "latitud", "longitud"]]
+        .rename(columns={"iebm_id": "institucion_id"}),
+        "hechos_matricula": hechos_matricula(maestro, rng),
+        "hechos_financieros": hechos_financieros(maestro, rng),
+    }
+    filas_plantilla = max(1, math.ceil(filas / len(PLANTILLAS_COSTOS)))
+    for nombre in PLANTILLAS_COSTOS:
+        tablas[nombre] = plantilla_costos(nombre, maestro, filas_plantilla, rng)
+    return tablas
+
+
+def write(tablas: dict, directory: Path) -> Path:
+    """Guardar cada tabla como CSV (entrada de load_table) y pickle
+    
+    Un archivo ``listo`` marca el directorio como completo, para reutilizar
+    datos grandes entre corridas.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for nombre, df in tablas.items():
+        df.to_pickle(directory / f"{nombre}.pkl")
+        if nombre != "hoja_maestro":
+            df.to_csv(directory / f"{nombre}.csv", index=False)
+    (directory / "listo").touch()
+    return directory
+
+
+def ensure(filas: int, root: Path, seed: int = 0) -> Path:
+    """Directorio con los datos de una escala, generándolos si no existen"""
+    directory = root / f"filas_{filas}_semilla_{seed}"
+    if not (directory / "listo").exists():
+        write(generate(filas, seed), directory)
+    return directory
+
+
+if __name__ == "__main__":
+    for nombre, df in generate(1000).items():
+        print(f"{nombre:25s} {len(df):>8,} filas  {list(df.columns)[:6]}")
@@ -0,0 +1,388 @@
+"""
+DIBIE - Benchmark del pipeline
+Mide cada ruta del flujo DIBIE con datos sintéticos y la compara con una línea base
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+BENCHMARK_DIR = Path("data/benchmarks")
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+TABLAS_SQLITE = ["maestro_instituciones", "ubicacion_geografica", "hechos_financieros", "hechos_matricula"]
+VISTAS = [
+    "v_mapa_costos_institucion",
+    "v_resumen_costos_institucion",
+    "v_evolucion_costos_mensual",
+    "v_costos_por_nivel_educativo",
+    "v_top_instituciones_costo",
+]
+DB_PATH = "data/database/dibie_financiero.db"
+
+
+# ============================================================================
+# Casos: cada uno prepara sus entradas (sin medir) y ejecuta la ruta (medida)
+# ============================================================================
+
+def _pickle(datos: Path, nombre: str):
+    import pandas as pd
+    return pd.read_pickle(datos / f"{nombre}.pkl")
+
+
+def preparar_load_table(datos: Path):
+    return sorted(str(path) for path in datos.glob("*.csv"))
+
+
+def medir_load_table(archivos):
+    from ingestion.table_loader import TableLoader
+    loader = TableLoader()
+    return sum(len(loader.load_table(path)) for path in archivos)
+
+
+def preparar_reporte_calidad(datos: Path):
+    return _pickle(datos, "hechos_matricula")
+
+
+def medir_reporte_calidad(df):
+    from analysis.data_quality_analyzer import DataQualityAnalyzer
+    DataQualityAnalyzer().generate_quality_report(df, "hechos_matricula")
+    return len(df)
+
+
+def preparar_normalizacion(datos: Path):
+    from benchmark_datasets import COLUMNAS_FINANCIERAS, COLUMNAS_TIEMPO
+    propuesta = {
+        "hechos_financieros": {"columns": COLUMNAS_FINANCIERAS},
+        "dim_tiempo": {"columns": COLUMNAS_TIEMPO},
+    }
+    return _pickle(datos, "hoja_maestro"), _pickle(datos, "maestro_instituciones"), propuesta
+
+
+def medir_normalizacion(entradas):
+    import normalize_data
+    df_raw, df_maestro, propuesta = entradas
+    normalize_data.normalize_financial_data(df_raw=df_raw, df_maestro=df_maestro, propuesta=propuesta)
+    return len(df_raw)
+
+
+def preparar_matricula(datos: Path):
+    return _pickle(datos, "hoja_maestro")
+
+
+def medir_matricula(df):
+    import create_matricula_tables
+    _, hechos = create_matricula_tables.extract_matricula_data(df=df)
+    return len(hechos)
+
+
+def preparar_carga_sqlite(datos: Path):
+    return {nombre: _pickle(datos, nombre) for nombre in TABLAS_SQLITE}
+
+
+def medir_carga_sqlite(tablas):
+    from ingestion.sqlite_profile import SQLiteProfile
+    profile = SQLiteProfile()
+    conn = profile.connect(DB_PATH)
+    try:
+        filas = sum(profile.replace_table(conn, nombre, df) for nombre, df in tablas.items())
+        profile.checkpoint(conn)
+    finally:
+        conn.close()
+    return filas
+
+
+def preparar_consultas_vistas(datos: Path):
+    import create_superset_dashboard_views
+    Path("data/database").mkdir(parents=True, exist_ok=True)
+    medir_carga_sqlite(preparar_carga_sqlite(datos))
+    create_superset_dashboard_views.create_superset_views()
+    return VISTAS
+
+
+def medir_consultas_vistas(vistas):
+    from ingestion.sqlite_profile import SQLiteProfile
+    conn = SQLiteProfile().connect(DB_PATH, read_only=True)
+    try:
+        return sum(len(conn.execute(f"SELECT * FROM {vista}").fetchall()) for vista in vistas)
+    finally:
+        conn.close()
+
+
+def preparar_render_html(datos: Path):
+    df = _pickle(datos, "hechos_matricula")
+    return df.to_dict("records"), list(df.columns)
+
+
+def medir_render_html(entradas):
+    from dashboard.dashboard_generator import DashboardGenerator
+    registros, columnas = entradas
+    generator = DashboardGenerator(config={}, output_dir="dashboard/output", cache_dir=None, compress=False)
+    dashboard = generator.create_dashboard("Matrícula", [
+        generator.create_kpi_card("Registros", len(registros)),
+        generator.create_table("hechos_matricula", registros, columnas),
+    ])
+    generator.save_dashboard(dashboard, "benchmark_matricula", format="html")
+    return len(registros)
+
+
+def preparar_excel(datos: Path):
+    """Libro con una hoja por plantilla de costos y la de matrícula, como los de las instituciones"""
+    import pandas as pd
+    from benchmark_datasets import PLANTILLAS_COSTOS
+    libro = Path("libro_financiero.xlsx").absolute()
+    with pd.ExcelWriter(libro) as writer:
+        for nombre in PLANTILLAS_COSTOS + ["hechos_matricula"]:
+            _pickle(datos, nombre).to_excel(writer, sheet_name=nombre, index=False)
+    return str(libro)
+
+
+def medir_excel_pandas(libro):
+    import pandas as pd
+    return sum(len(df) for df in pd.read_excel(libro, sheet_name=None).values())
+
+
+def medir_excel_paralelo(libro):
+    from ingestion.excel_reader import ExcelReader
+    # Caché vacío en cada corrida: se mide el parseo de todas las hojas
+    reader = ExcelReader(cache_dir=tempfile.mkdtemp(dir="."))
+    return sum(len(df) for df in reader.read_workbook(libro).values())
+
+
+def preparar_excel_cache(datos: Path):
+    from ingestion.excel_reader import ExcelReader
+    reader = ExcelReader(cache_dir="cache_excel")
+    libro = preparar_excel(datos)
+    reader.convert(libro)
+    return reader, libro
+
+
+def medir_excel_cache(entradas):
+    reader, libro = entradas
+    return sum(len(df) for df in reader.read_workbook(libro).values())
+
+
+# Nombre -> (preparar, medir, escala máxima por defecto)
+# La normalización y el melt de matrícula recorren la hoja fila por fila;
+# por encima de 10^5 filas tardan minutos y se omiten salvo --sin-limite.
+# Lo mismo escribir el libro de Excel de los casos excel_* (y una hoja no
+# pasa de 1.048.576 filas).
+CASOS = {
+    "load_table": (preparar_load_table, medir_load_table, None),
+    "reporte_calidad": (preparar_reporte_calidad, medir_reporte_calidad, None),
+    "normalizacion": (preparar_normalizacion, medir_normalizacion, 100_000),
+    "matricula_melt": (preparar_matricula, medir_matricula, 100_000),
+    "carga_sqlite": (preparar_carga_sqlite, medir_carga_sqlite, None),
+    "consultas_vistas": (preparar_consultas_vistas, medir_consultas_vistas, None),
+    "render_html": (preparar_render_html, medir_render_html, None),
+    "excel_pandas": (preparar_excel, medir_excel_pandas, 100_000),
+    "excel_paralelo": (preparar_excel, medir_excel_paralelo, 100_000),
+    "excel_cache": (preparar_excel_cache, medir_excel_cache, 100_000),
+}
+
+
+def ejecutar_caso(caso: str, datos: str, repeticiones: int, memoria: bool = True) -> dict:
+    """Ejecutar un caso en este proceso (uno nuevo por caso)
+    
+    Las entradas se preparan antes de medir. La memoria se mide en una
+    corrida adicional con tracemalloc, que no cuenta para el tiempo: es el
+    pico de memoria asignada por la ruta por encima de sus entradas.
+    """
+    from telemetry import span, telemetry
+    telemetry.metrics_file = None
+    
+    preparar, medir, _ = CASOS[caso]
+    trabajo = tempfile.mkdtemp(prefix=f"dibie_bench_{caso}_")
+    os.chdir(trabajo)
+    Path("logs").mkdir()
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            entradas = preparar(Path(datos))
+            registros = []
+            for _ in range(repeticiones):
+                with span(f"benchmark.{caso}") as s:
+                    s.set(rows=medir(entradas))
+                registros.append(telemetry.recent[-1])
+            
+            pico_asignado = None
+            if memoria:
+                tracemalloc.start()
+                inicial = tracemalloc.get_traced_memory()[0]
+                medir(entradas)
+                pico_asignado = (tracemalloc.get_traced_memory()[1] - inicial) / 1024 ** 2
+                tracemalloc.stop()
+    finally:
+        os.chdir(tempfile.gettempdir())
+        shutil.rmtree(trabajo, ignore_errors=True)
+    
+    segundos = [r["seconds"] for r in registros]
+    return {
+        "filas": registros[0]["rows"],
+        "segundos": round(statistics.median(segundos), 4),
+        "segundos_min": round(min(segundos), 4),
+        "pico_rss_mb": registros[-1]["peak_rss_mb"],
+        "memoria_mb": round(pico_asignado, 1) if pico_asignado is not None else None,
+        # Desglose por componente instrumentado (primera repetición incluida)
+        "spans": {
+            nombre: resumen["total_s"] for nombre, resumen in telemetry.summary().items()
+            if not nombre.startswith("benchmark.")
+        },
+    }
+
+
+# ============================================================================
+# Línea base
+# ============================================================================
+
+def entorno() -> dict:
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def cargar_base(path: Path) -> dict:
+    if not path.exists():
+        return {"entorno": None, "resultados": {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_base(path: Path, resultados: dict):
+    base = cargar_base(path)
+    base["entorno"] = entorno()
+    base["guardada"] = datetime.now().isoformat(timespec='seconds')
+    base["resultados"].update(resultados)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(base, f, indent=2, ensure_ascii=False)
+
+
+def comparar(resultado: dict, base: dict, tolerancia: float) -> str:
+    """Estado de un resultado frente a su línea base
+    
+    Cuenta como regresión un tiempo o una memoria por encima de la base más
+    la tolerancia, si además la diferencia supera el ruido de medición
+    (50 ms o 16 MB).
+    """
+    if base is None:
+        return "nuevo"
+    problemas = []
+    if (resultado["segundos"] > base["segundos"] * (1 + tolerancia)
+            and resultado["segundos"] - base["segundos"] > 0.05):
+        problemas.append("tiempo")
+    memoria, memoria_base = resultado.get("memoria_mb"), base.get("memoria_mb")
+    if (memoria is not None and memoria_base is not None
+            and memoria > memoria_base * (1 + tolerancia) and memoria - memoria_base > 16):
+        problemas.append("memoria")
+    if problemas:
+        return "REGRESIÓN " + "+".join(problemas)
+    if resultado["segundos"] < base["segundos"] * (1 - tolerancia):
+        return "mejora"
+    return "ok"
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas del pipeline DIBIE")
+    parser.add_argument('--filas', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="Escalas (filas de hechos_matricula), de 10^3 a 10^7")
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), default=list(CASOS), help="Casos a medir")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por caso (se reporta la mediana)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--datos', default=str(BENCHMARK_DIR / "datasets"),
+                        help="Directorio de datos sintéticos (se reutilizan entre corridas)")
+    parser.add_argument('--base', default=str(BASELINE_PATH), help="Archivo de línea base")
+    parser.add_argument('--guardar-base', action='store_true', help="Guardar los resultados como línea base")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Fracción tolerada sobre la base")
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir memoria (evita una corrida extra)")
+    parser.add_argument('--sin-limite', action='store_true', help="No omitir casos lentos en escalas grandes")
+    parser.add_argument('--salida', help="Guardar los resultados de la corrida en JSON")
+    args = parser.parse_args(argv)
+    
+    from benchmark_datasets import ensure
+    
+    base = cargar_base(Path(args.base))
+    if base["entorno"] and base["entorno"] != entorno():
+        print(f"⚠ La línea base se midió en otro entorno: {base['entorno']}")
+    
+    print("=" * 96)
+    print("DIBIE - Benchmark del pipeline")
+    print("=" * 96)
+    print(f"{'Caso':<18}{'filas':>12}{'mediana s':>11}{'filas/s':>13}{'pico MB':>10}{'mem MB':>8}"
+          f"{'base s':>10}  estado")
+    
+    resultados, regresiones = {}, []
+    context = multiprocessing.get_context("spawn")
+    for filas in args.filas:
+        datos = ensure(filas, Path(args.datos), args.semilla)
+        for caso in args.casos:
+            clave = f"{caso}@{filas}"
+            limite = CASOS[caso][2]
+            if limite is not None and filas > limite and not args.sin_limite:
+                print(f"{caso:<18}{filas:>12,}{'':>52}  omitido (> {limite:,})")
+                continue
+            
+            # Un proceso por caso, para que el pico de memoria sea solo de ese caso
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                future = executor.submit(ejecutar_caso, caso, str(datos.absolute()), args.repeticiones,
+                                         not args.sin_memoria)
+                try:
+                    resultado = future.result()
+                except ImportError as e:
+                    # Dependencia opcional del caso (motor de Excel)
+                    print(f"{caso:<18}{filas:>12,}{'':>52}  omitido ({e})")
+                    continue
+                except Exception as e:
+                    print(f"{caso:<18}{filas:>12,}{'':>52}  ERROR {type(e).__name__}: {e}")
+                    regresiones.append(clave)
+                    continue
+            
+            resultados[clave] = resultado
+            referencia = base["resultados"].get(clave)
+            estado = comparar(resultado, referencia, args.tolerancia)
+            if estado.startswith("REGRESIÓN"):
+                regresiones.append(clave)
+            
+            velocidad = resultado["filas"] / resultado["segundos"] if resultado["segundos"] else float("inf")
+            memoria = resultado["memoria_mb"] if resultado["memoria_mb"] is not None else float("nan")
+            pico = resultado["pico_rss_mb"] if resultado["pico_rss_mb"] is not None else float("nan")
+            base_s = f"{referencia['segundos']:.3f}" if referencia else "-"
+            print(f"{caso:<18}{resultado['filas']:>12,}{resultado['segundos']:>11.3f}{velocidad:>13,.0f}"
+                  f"{pico:>10.1f}{memoria:>8.1f}{base_s:>10}  {estado}")
+    
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({"entorno": entorno(), "resultados": resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados: {args.salida}")
+    
+    if args.guardar_base:
+        guardar_base(Path(args.base), resultados)
+        print(f"\n✓ Línea base actualizada: {args.base}")
+    elif regresiones:
+        print(f"\n✗ {len(regresiones)} regresiones: {', '.join(regresiones)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+DIBIE - Benchmark del perfil SQLite
+Latencia de consultas de dashboard mientras corre una sincronización
+"""
+import sqlite3
+import sys
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.sqlite_profile import SQLiteProfile
+
+
+DASHBOARD_QUERY = """
+    SELECT institucion_id, anio, SUM(valor) AS total, COUNT(*) AS registros
+    FROM hechos_financieros
+    GROUP BY institucion_id, anio
+    ORDER BY total DESC
+    LIMIT 50
+"""
+
+
+def synthetic_facts(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Tabla de hechos financieros sintética"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "institucion_id": rng.integers(1, 2000, rows),
+        "anio": rng.integers(2018, 2026, rows),
+        "concepto": rng.choice(["INGRESOS", "EGRESOS", "NOMINA", "SERVICIOS"], rows),
+        "valor": rng.random(rows) * 1e7,
+    })
+
+
+def sync(db_path: Path, use_profile: bool, rows: int, syncs: int):
+    """Reemplazar la tabla de hechos ``syncs`` veces, como un sync real
+    
+    Corre en un proceso aparte, igual que la sincronización frente a
+    Superset.
+    """
+    profile = SQLiteProfile()
+    if use_profile:
+        conn = profile.connect(db_path)
+    else:
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA journal_mode = DELETE")
+    try:
+        for i in range(syncs):
+            df = synthetic_facts(rows, seed=i + 1)
+            if use_profile:
+                profile.replace_table(conn, "hechos_financieros", df)
+            else:
+                # Como lo hacían los cargadores antes del perfil
+                df.to_sql("hechos_financieros", conn, if_exists="replace", index=False)
+        if use_profile:
+            profile.checkpoint(conn)
+    finally:
+        conn.close()
+
+
+def run(db_path: Path, use_profile: bool, rows: int, syncs: int):
+    """Ejecutar consultas de dashboard mientras corre la sincronización
+    
+    Args:
+        db_path: Base de datos
+        use_profile: Usar SQLiteProfile en lugar de la conexión por defecto
+            y ``to_sql(if_exists='replace')``
+        rows: Filas por sincronización
+        syncs: Número de sincronizaciones
+    
+    Returns:
+        Latencias de consulta en ms, consultas que vieron la tabla vacía,
+        consultas fallidas y código de salida de la sincronización
+    """
+    profile = SQLiteProfile()
+    if use_profile:
+        conn = profile.connect(db_path)
+    else:
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA journal_mode = DELETE")
+    synthetic_facts(rows).to_sql("hechos_financieros", conn, if_exists="replace", index=False)
+    conn.commit()
+    conn.close()
+    
+    if use_profile:
+        reader = profile.connect(db_path, read_only=True)
+    else:
+        reader = sqlite3.connect(str(db_path), timeout=profile.busy_timeout_ms / 1000)
+    
+    latencies, empty, failures = [], 0, 0
+    writer = multiprocessing.Process(target=sync, args=(db_path, use_profile, rows, syncs))
+    writer.start()
+    while writer.is_alive():
+        started = time.perf_counter()
+        try:
+            result = reader.execute(DASHBOARD_QUERY).fetchall()
+            latencies.append((time.perf_counter() - started) * 1000)
+            empty += not result
+        except sqlite3.OperationalError:
+            failures += 1
+    writer.join()
+    reader.close()
+    return np.array(latencies), empty, failures, writer.exitcode
+
+
+def main(rows: int = 200_000, syncs: int = 5):
+    print("=" * 70)
+    print("DIBIE - Latencia de dashboard durante una sincronización")
+    print("=" * 70)
+    print(f"\n{syncs} sincronizaciones de {rows:,} filas\n")
+    print(f"{'Perfil':<22}{'consultas':>10}{'vacías':>10}{'fallidas':>10}{'p50 ms':>10}{'p95 ms':>10}{'máx ms':>10}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, use_profile in [("journal DELETE", False), ("SQLiteProfile (WAL)", True)]:
+            latencies, empty, failures, exitcode = run(Path(tmp) / f"{label.split()[0]}.db", use_profile, rows, syncs)
+            if len(latencies):
+                p50, p95, worst = np.percentile(latencies, 50), np.percentile(latencies, 95), latencies.max()
+            else:
+                p50 = p95 = worst = float("nan")
+            print(f"{label:<22}{len(latencies):>10}{empty:>10}{failures:>10}{p50:>10.1f}{p95:>10.1f}{worst:>10.1f}")
+            if exitcode != 0:
+                print(f"{'':<22}la sincronización falló (código {exitcode})")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 from ingestion.google_sheets_reader import GoogleSheetsReader
 
 
-def create_maestro_instituciones_sheet(source_url: str, target_sheet_name: str = "maestro_instituciones"):
+def create_maestro_instituciones_sheet(source_url: str, target_sheet_name: str = "maestro_instituciones",
+                                       df: pd.DataFrame = None) -> pd.DataFrame:
     """
     Crear hoja maestro_instituciones con estructura normalizada
     
+    Si se pasa ``df`` (la tabla maestra ya leída) no se vuelve a leer de
+    Google Sheets. Retorna el maestro de instituciones.
+    
     Columnas:
     - iebm_id (auto-incremental)
     - dane_institucion (código DANE)
@@ -34,7 +38,8 @@ def create_maestro_instituciones_sheet(source_url: str, target_sheet_name: str =
     # 1. Leer datos de la hoja maestro
     print("\n1. Leyendo datos de Google Sheets...")
     reader = GoogleSheetsReader()
-    df = reader.read_sheet(source_url)
+    if df is None:
+        df = reader.read_sheet(source_url)
     
     if df is None or df.empty:
         print("✗ No se pudieron leer los datos")
@@ -98,7 +103,7 @@ def create_maestro_instituciones_sheet(source_url: str, target_sheet_name: str =
         csv_path = Path("data/processed/maestro_instituciones.csv")
         df_maestro.to_csv(csv_path, index=False, encoding='utf-8')
         print(f"   ✓ Guardado en: {csv_path}")
-        return
+        return df_maestro
     
     scopes = [
         'https://www.googleapis.com/auth/spreadsheets',
@@ -189,6 +194,8 @@ def create_maestro_instituciones_sheet(source_url: str, target_sheet_name: str =
     print("1. Revisar datos en Google Sheets")
     print("2. Completar columna 'departamento' manualmente")
     print("3. Ejecutar geocoding para obtener latitud/longitud")
+    
+    return df_maestro
 
 
 if __name__ == "__main__":
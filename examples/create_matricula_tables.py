@@ -4,41 +4,50 @@ Crear tabla paramétrica dim_grados y tabla de hechos hechos_matricula
 """
 import pandas as pd
 from pathlib import Path
-import gspread
-from google.oauth2.service_account import Credentials
 import json
+import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-def extract_matricula_data():
+from ingestion.columnar_store import ColumnarStore
+
+
+def extract_matricula_data(df: pd.DataFrame = None):
     """
     Extraer datos de matrícula por grado y crear tablas normalizadas
+    
+    Si se pasa ``df`` (la hoja maestro ya leída como texto) no se vuelve a
+    leer de Google Sheets. Retorna (dim_grados, hechos_matricula).
     """
     print("=" * 70)
     print("DIBIE - Extracción de Datos de Matrícula por Grado")
     print("=" * 70)
     
-    # 1. Autenticar
-    credentials_path = Path("config/credentials_google.json")
-    
-    scopes = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive'
-    ]
-    
-    creds = Credentials.from_service_account_file(
-        str(credentials_path),
-        scopes=scopes
-    )
-    client = gspread.authorize(creds)
-    
-    # 2. Leer datos
+    # 1. Leer datos
     print("\n1. Leyendo datos de Google Sheets...")
-    spreadsheet_id = "1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc"
-    spreadsheet = client.open_by_key(spreadsheet_id)
-    worksheet = spreadsheet.worksheet("maestro")
-    
-    data = worksheet.get_all_values()
-    df = pd.DataFrame(data[1:], columns=data[0])
+    if df is None:
+        import gspread
+        from google.oauth2.service_account import Credentials
+        
+        credentials_path = Path("config/credentials_google.json")
+        
+        scopes = [
+            'https://www.googleapis.com/auth/spreadsheets',
+            'https://www.googleapis.com/auth/drive'
+        ]
+        
+        creds = Credentials.from_service_account_file(
+            str(credentials_path),
+            scopes=scopes
+        )
+        client = gspread.authorize(creds)
+        
+        spreadsheet_id = "1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc"
+        spreadsheet = client.open_by_key(spreadsheet_id)
+        worksheet = spreadsheet.worksheet("maestro")
+        
+        data = worksheet.get_all_values()
+        df = pd.DataFrame(data[1:], columns=data[0])
     print(f"   ✓ {len(df)} filas, {len(df.columns)} columnas")
     
     # 3. Mostrar todas las columnas para identificar las de matrícula
@@ -264,23 +273,17 @@ def extract_matricula_data():
     output_dir = Path("data/normalized")
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # CSV y Parquet
-    dim_grados.to_csv(output_dir / "dim_grados.csv", index=False, encoding='utf-8')
-    dim_grados.to_parquet(output_dir / "dim_grados.parquet", index=False)
-    print(f"   ✓ dim_grados.csv")
-    print(f"   ✓ dim_grados.parquet")
-    
-    hechos_matricula.to_csv(output_dir / "hechos_matricula.csv", index=False, encoding='utf-8')
-    hechos_matricula.to_parquet(output_dir / "hechos_matricula.parquet", index=False)
-    print(f"   ✓ hechos_matricula.csv")
-    print(f"   ✓ hechos_matricula.parquet")
+    # Almacén columnar (particionado por año e institución)
+    store = ColumnarStore(str(output_dir / "store"))
+    store.write_table("dim_grados", dim_grados)
+    store.write_table("hechos_matricula", hechos_matricula)
+    print(f"   ✓ store/dim_grados")
+    print(f"   ✓ store/hechos_matricula")
     
-    # TSV
+    # TSV exportado desde el almacén
     tsv_dir = Path("data/tsv")
-    tsv_dir.mkdir(parents=True, exist_ok=True)
-    
-    dim_grados.to_csv(tsv_dir / "dim_grados.tsv", sep='\t', index=False, encoding='utf-8')
-    hechos_matricula.to_csv(tsv_dir / "hechos_matricula.tsv", sep='\t', index=False, encoding='utf-8')
+    store.export_delimited("dim_grados", tsv_dir / "dim_grados.tsv", sep='\t')
+    store.export_delimited("hechos_matricula", tsv_dir / "hechos_matricula.tsv", sep='\t')
     print(f"   ✓ dim_grados.tsv")
     print(f"   ✓ hechos_matricula.tsv")
     
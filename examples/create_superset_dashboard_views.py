@@ -2,10 +2,14 @@
 DIBIE - Crear Vistas y Dashboards para Apache Superset
 Vistas SQL optimizadas para análisis de costos y mapa interactivo
 """
-import sqlite3
 import pandas as pd
 from pathlib import Path
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.sqlite_profile import SQLiteProfile
 
 
 def create_superset_views():
@@ -24,7 +28,8 @@ def create_superset_views():
         print("  Ejecutar primero: python examples/setup_superset_dashboard.py")
         return
     
-    conn = sqlite3.connect(db_path)
+    profile = SQLiteProfile()
+    conn = profile.connect(db_path)
     cursor = conn.cursor()
     
     # ========================================================================
@@ -237,11 +242,10 @@ def create_superset_views():
     print("\n6. Generando configuración de Superset...")
     
     superset_config = {
-        "database": {
-            "name": "DIBIE Financiero",
-            "sqlalchemy_uri": f"sqlite:///{db_path.absolute()}",
-            "description": "Base de datos de costos y matrícula de instituciones educativas"
-        },
+        "database": profile.superset_database(
+            "DIBIE Financiero", db_path,
+            description="Base de datos de costos y matrícula de instituciones educativas"
+        ),
         "dashboards": [
             {
                 "name": "Mapa de Costos por Institución",
@@ -321,7 +325,7 @@ def create_superset_views():
     print(f"   ✓ Configuración guardada: {config_path}")
     
     # Commit cambios
-    conn.commit()
+    profile.checkpoint(conn)
     conn.close()
     
     # ========================================================================
@@ -351,7 +355,7 @@ def create_superset_views():
     print("  2. Ir a: http://localhost:8088")
     print("  3. Login: admin / admin")
     print("  4. Agregar database connection:")
-    print(f"     sqlite:///{db_path.absolute()}")
+    print(f"     {profile.sqlalchemy_uri(db_path)}")
     print("  5. Crear dashboards usando las vistas")
     
     print("\n💡 Nota:")
@@ -51,9 +51,12 @@ def geocode_address(geolocator, direccion: str, municipio: str, retry=3):
     return None, None
 
 
-def geocode_maestro_instituciones():
+def geocode_maestro_instituciones(df: pd.DataFrame = None) -> pd.DataFrame:
     """
     Agregar coordenadas geográficas al maestro de instituciones
+    
+    Si se pasa ``df`` se geocodifica ese maestro en lugar de leer el CSV.
+    Retorna el maestro con latitud, longitud y departamento.
     """
     print("=" * 70)
     print("DIBIE - Geocoding de Instituciones")
@@ -63,12 +66,14 @@ def geocode_maestro_instituciones():
     print("\n1. Cargando maestro_instituciones.csv...")
     csv_path = Path("data/processed/maestro_instituciones.csv")
     
-    if not csv_path.exists():
+    if df is not None:
+        df = df.copy()
+    elif not csv_path.exists():
         print(f"✗ No se encontró {csv_path}")
         print("   Ejecuta primero: python examples/create_maestro_instituciones.py")
         return
-    
-    df = pd.read_csv(csv_path)
+    else:
+        df = pd.read_csv(csv_path)
     print(f"   ✓ {len(df)} instituciones cargadas")
     
     # 2. Inicializar geocoder
@@ -129,7 +134,7 @@ def geocode_maestro_instituciones():
     if not credentials_path.exists():
         print("   ⚠ No se encontró credentials_google.json")
         print("   Datos guardados solo en CSV")
-        return
+        return df
     
     try:
         scopes = [
@@ -187,6 +192,8 @@ def geocode_maestro_instituciones():
     geocoded_df = df[df['latitud'] != ''].head(3)
     if not geocoded_df.empty:
         print(geocoded_df[['nombre', 'municipio', 'latitud', 'longitud']].to_string(index=False))
+    
+    return df
 
 
 if __name__ == "__main__":
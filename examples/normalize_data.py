@@ -10,11 +10,16 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from ingestion.google_sheets_reader import GoogleSheetsReader
+from ingestion.columnar_store import ColumnarStore
 
 
-def normalize_financial_data():
+def normalize_financial_data(df_raw: pd.DataFrame = None, df_maestro: pd.DataFrame = None,
+                             propuesta: dict = None) -> dict:
     """
     Normalizar datos financieros en tablas atómicas
+    
+    Las entradas que no se pasen se leen de Google Sheets y de
+    data/processed. Retorna las tablas normalizadas por nombre.
     """
     print("=" * 70)
     print("DIBIE - Normalización de Datos Financieros")
@@ -24,46 +29,47 @@ def normalize_financial_data():
     print("\n1. Cargando datos maestros...")
     
     source_url = "https://docs.google.com/spreadsheets/d/1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc/edit?gid=1897725171"
-    reader = GoogleSheetsReader()
-    df_raw = reader.read_sheet(source_url)
+    if df_raw is None:
+        reader = GoogleSheetsReader()
+        df_raw = reader.read_sheet(source_url)
     
     if df_raw is None or df_raw.empty:
         print("✗ No se pudieron cargar datos")
         return
     
     # Cargar maestro de instituciones
-    maestro_path = Path("data/processed/maestro_instituciones.csv")
-    df_maestro = pd.read_csv(maestro_path)
+    if df_maestro is None:
+        maestro_path = Path("data/processed/maestro_instituciones.csv")
+        df_maestro = pd.read_csv(maestro_path)
     
     print(f"   ✓ Datos maestros: {df_raw.shape[0]} filas, {df_raw.shape[1]} columnas")
     print(f"   ✓ Maestro instituciones: {df_maestro.shape[0]} instituciones")
     
     # 2. Cargar propuesta de tablas
     print("\n2. Cargando propuesta de tablas atómicas...")
-    propuesta_path = Path("data/processed/propuesta_tablas_atomicas.json")
-    
-    with open(propuesta_path, 'r', encoding='utf-8') as f:
-        propuesta = json.load(f)
+    if propuesta is None:
+        propuesta_path = Path("data/processed/propuesta_tablas_atomicas.json")
+        with open(propuesta_path, 'r', encoding='utf-8') as f:
+            propuesta = json.load(f)
     
     print(f"   ✓ {len(propuesta)} tablas propuestas")
     
     # 3. Crear directorio de salida
     output_dir = Path("data/normalized")
     output_dir.mkdir(parents=True, exist_ok=True)
+    store = ColumnarStore(str(output_dir / "store"))
     
     # 4. Tabla 1: maestro_instituciones (ya existe, copiar)
     print("\n3. Creando tablas normalizadas...")
     print("\n   Tabla 1: maestro_instituciones")
-    df_maestro.to_csv(output_dir / "maestro_instituciones.csv", index=False, encoding='utf-8')
-    df_maestro.to_parquet(output_dir / "maestro_instituciones.parquet", index=False)
+    store.write_table("maestro_instituciones", df_maestro)
     print(f"      ✓ {len(df_maestro)} registros")
     
     # 5. Tabla 2: ubicacion_geografica
     print("\n   Tabla 2: ubicacion_geografica")
     df_ubicacion = df_maestro[['iebm_id', 'direccion', 'municipio', 'departamento', 'latitud', 'longitud']].copy()
     df_ubicacion.rename(columns={'iebm_id': 'institucion_id'}, inplace=True)
-    df_ubicacion.to_csv(output_dir / "ubicacion_geografica.csv", index=False, encoding='utf-8')
-    df_ubicacion.to_parquet(output_dir / "ubicacion_geografica.parquet", index=False)
+    store.write_table("ubicacion_geografica", df_ubicacion)
     print(f"      ✓ {len(df_ubicacion)} registros")
     
     # 6. Tabla 3: hechos_financieros
@@ -115,8 +121,7 @@ def normalize_financial_data():
         if col not in ['hecho_id', 'institucion_id', 'fecha_id']:
             df_hechos[col] = pd.to_numeric(df_hechos[col], errors='coerce').fillna(0)
     
-    df_hechos.to_csv(output_dir / "hechos_financieros.csv", index=False, encoding='utf-8')
-    df_hechos.to_parquet(output_dir / "hechos_financieros.parquet", index=False)
+    store.write_table("hechos_financieros", df_hechos)
     print(f"      ✓ {len(df_hechos)} registros")
     print(f"      Columnas: {list(df_hechos.columns)}")
     
@@ -163,20 +168,18 @@ def normalize_financial_data():
         if col not in ['fecha_id', 'institucion_id', 'ano', 'periodo']:
             df_tiempo[col] = pd.to_numeric(df_tiempo[col], errors='coerce').fillna(0)
     
-    df_tiempo.to_csv(output_dir / "dim_tiempo.csv", index=False, encoding='utf-8')
-    df_tiempo.to_parquet(output_dir / "dim_tiempo.parquet", index=False)
+    store.write_table("dim_tiempo", df_tiempo)
     print(f"      ✓ {len(df_tiempo)} registros")
     
     # 8. Resumen de archivos generados
     print("\n" + "=" * 70)
     print("Normalización completada!")
     print("=" * 70)
-    print(f"\nArchivos generados en: {output_dir}")
+    print(f"\nTablas generadas en: {store.root}")
     
-    archivos = list(output_dir.glob("*.csv"))
-    for archivo in archivos:
-        size_kb = archivo.stat().st_size / 1024
-        print(f"  - {archivo.name} ({size_kb:.1f} KB)")
+    for table_name in store.tables():
+        size_kb = sum(f.stat().st_size for f in (store.root / table_name).rglob("*.parquet")) / 1024
+        print(f"  - {table_name} ({size_kb:.1f} KB)")
     
     # 9. Crear metadata
     metadata = {
@@ -186,22 +189,22 @@ def normalize_financial_data():
             "maestro_instituciones": {
                 "rows": len(df_maestro),
                 "columns": list(df_maestro.columns),
-                "file": "maestro_instituciones.csv"
+                "file": "store/maestro_instituciones"
             },
             "ubicacion_geografica": {
                 "rows": len(df_ubicacion),
                 "columns": list(df_ubicacion.columns),
-                "file": "ubicacion_geografica.csv"
+                "file": "store/ubicacion_geografica"
             },
             "hechos_financieros": {
                 "rows": len(df_hechos),
                 "columns": list(df_hechos.columns),
-                "file": "hechos_financieros.csv"
+                "file": "store/hechos_financieros"
             },
             "dim_tiempo": {
                 "rows": len(df_tiempo),
                 "columns": list(df_tiempo.columns),
-                "file": "dim_tiempo.csv"
+                "file": "store/dim_tiempo"
             }
         }
     }
@@ -212,6 +215,13 @@ def normalize_financial_data():
     
     print(f"\n  - metadata.json")
     print("\n✓ Datos listos para análisis y dashboards!")
+    
+    return {
+        "maestro_instituciones": df_maestro,
+        "ubicacion_geografica": df_ubicacion,
+        "hechos_financieros": df_hechos,
+        "dim_tiempo": df_tiempo
+    }
 
 
 if __name__ == "__main__":
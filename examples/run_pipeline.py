@@ -0,0 +1,128 @@
+"""
+DIBIE - Pipeline completo
+Ejecuta los scripts del flujo DIBIE como etapas de un DAG con caché
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from log_config import configure_logging
+from pipeline import Pipeline, Stage
+from profiling import add_profile_arguments, profile_run
+
+
+MAESTRO_URL = "https://docs.google.com/spreadsheets/d/1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc/edit?gid=1897725171"
+DB_PATH = "data/database/dibie_financiero.db"
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def script(nombre: str) -> str:
+    """Ruta del script que ejecuta una etapa; su contenido entra en la huella"""
+    return str(SCRIPTS_DIR / f"{nombre}.py")
+
+
+def leer_maestro():
+    """Leer la hoja maestro una sola vez para todas las etapas"""
+    from ingestion.google_sheets_reader import GoogleSheetsReader
+    return GoogleSheetsReader().read_sheet(MAESTRO_URL)
+
+
+def analizar_maestro(maestro):
+    import analyze_master_table
+    return analyze_master_table.main(df=maestro)
+
+
+def crear_maestro_instituciones(maestro):
+    import create_maestro_instituciones
+    return create_maestro_instituciones.create_maestro_instituciones_sheet(MAESTRO_URL, df=maestro)
+
+
+def geocodificar(instituciones):
+    import geocode_instituciones
+    return geocode_instituciones.geocode_maestro_instituciones(df=instituciones)
+
+
+def normalizar(maestro, instituciones_geo, propuesta):
+    import normalize_data
+    return normalize_data.normalize_financial_data(df_raw=maestro, df_maestro=instituciones_geo,
+                                                   propuesta=propuesta)
+
+
+def crear_matricula(maestro):
+    import create_matricula_tables
+    dim_grados, hechos_matricula = create_matricula_tables.extract_matricula_data(df=maestro)
+    return {"dim_grados": dim_grados, "hechos_matricula": hechos_matricula}
+
+
+def sincronizar_sqlite(tablas_normalizadas, matricula):
+    import sync_sheets_to_sqlite
+    return sync_sheets_to_sqlite.sync_sheets_to_sqlite(frames={**tablas_normalizadas, **matricula})
+
+
+def crear_vistas(sqlite):
+    import create_superset_dashboard_views
+    create_superset_dashboard_views.create_superset_views()
+
+
+def build_pipeline(cache_dir: str = "data/cache/pipeline", max_workers: int = 4) -> Pipeline:
+    """Declarar las etapas del flujo DIBIE
+    
+    leer_maestro corre siempre; las demás etapas solo si cambió la huella
+    de sus entradas, que incluye el script que cada una ejecuta: editar
+    normalize_data.py vuelve a correr normalizar. crear_maestro_instituciones,
+    analizar_maestro y crear_matricula son independientes y corren en
+    paralelo.
+    """
+    return Pipeline([
+        Stage("leer_maestro", leer_maestro, outputs=["maestro"], always_run=True),
+        Stage("analizar_maestro", analizar_maestro, inputs=["maestro"], outputs=["propuesta"],
+              files=[script("analyze_master_table")],
+              creates=["data/processed/propuesta_tablas_atomicas.json"]),
+        Stage("crear_maestro_instituciones", crear_maestro_instituciones, inputs=["maestro"],
+              outputs=["instituciones"], files=[script("create_maestro_instituciones")]),
+        Stage("geocodificar", geocodificar, inputs=["instituciones"], outputs=["instituciones_geo"],
+              files=[script("geocode_instituciones")],
+              creates=["data/processed/maestro_instituciones.csv"]),
+        Stage("normalizar", normalizar, inputs=["maestro", "instituciones_geo", "propuesta"],
+              outputs=["tablas_normalizadas"], files=[script("normalize_data")]),
+        Stage("crear_matricula", crear_matricula, inputs=["maestro"], outputs=["matricula"],
+              files=[script("create_matricula_tables")]),
+        Stage("sincronizar_sqlite", sincronizar_sqlite, inputs=["tablas_normalizadas", "matricula"],
+              outputs=["sqlite"], files=[script("sync_sheets_to_sqlite")], creates=[DB_PATH]),
+        Stage("crear_vistas", crear_vistas, inputs=["sqlite"],
+              files=[script("create_superset_dashboard_views")],
+              creates=["data/database/superset_dashboards_config.json"]),
+    ], cache_dir=cache_dir, max_workers=max_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecutar el pipeline DIBIE")
+    parser.add_argument('stages', nargs='*', help="Etapas a ejecutar con sus dependencias (todas si se omite)")
+    parser.add_argument('--force', action='store_true', help="Ejecutar todas las etapas aunque no hayan cambiado")
+    parser.add_argument('--workers', type=int, default=4, help="Etapas en paralelo")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    configure_logging(console_level="INFO")
+    
+    pipeline = build_pipeline(max_workers=args.workers)
+    with profile_run("run_pipeline", args):
+        results = pipeline.run(args.stages or None, force=args.force)
+    
+    print("\n" + "=" * 70)
+    print("DIBIE - Resumen del pipeline")
+    print("=" * 70)
+    for name in pipeline.order(args.stages or None):
+        result = results[name]
+        detail = result.get("error") or ", ".join(result.get("blocked_by", []))
+        print(f"  {name:30s} {result['status']:8s} {result['seconds']:8.2f}s  {detail}")
+    
+    if any(result["status"] in ("failed", "blocked") for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ Generar scripts KQL para crear tablas e ingestar datos
 import pandas as pd
 from pathlib import Path
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.columnar_store import ColumnarStore
 
 
 def generate_kusto_integration():
@@ -301,9 +306,11 @@ print
     
     print(f"   ✓ {config_path.name}")
     
-    # 6. Copiar archivos CSV al directorio Kusto
-    print("\n3. Copiando archivos CSV...")
+    # 6. Exportar archivos CSV al directorio Kusto
+    print("\n3. Exportando archivos CSV...")
     normalized_dir = Path("data/normalized")
+    store = ColumnarStore(str(normalized_dir / "store"))
+    store.import_directory(str(normalized_dir))
     
     csv_files = [
         "maestro_instituciones.csv",
@@ -313,13 +320,11 @@ print
     ]
     
     for csv_file in csv_files:
-        source = normalized_dir / csv_file
-        dest = kusto_dir / csv_file
+        table_name = Path(csv_file).stem
         
-        if source.exists():
-            df = pd.read_csv(source)
-            df.to_csv(dest, index=False, encoding='utf-8')
-            print(f"   ✓ {csv_file} ({len(df)} registros)")
+        if store.has_table(table_name):
+            rows = store.export_delimited(table_name, kusto_dir / csv_file)
+            print(f"   ✓ {csv_file} ({rows} registros)")
     
     # 7. Instrucciones
     print("\n" + "=" * 70)
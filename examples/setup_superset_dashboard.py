@@ -3,9 +3,14 @@ DIBIE - Configurar Dashboards en Apache Superset
 Crear base de datos SQLite y configurar Superset con datos normalizados
 """
 import pandas as pd
-import sqlite3
 from pathlib import Path
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.columnar_store import ColumnarStore
+from ingestion.sqlite_profile import SQLiteProfile
 
 
 def create_sqlite_database():
@@ -25,37 +30,36 @@ def create_sqlite_database():
     print(f"\n1. Creando base de datos SQLite...")
     print(f"   Ruta: {db_path}")
     
-    # Conectar a SQLite
-    conn = sqlite3.connect(db_path)
+    # Conectar a SQLite (modo WAL)
+    profile = SQLiteProfile()
+    conn = profile.connect(db_path)
     cursor = conn.cursor()
     
     # 2. Cargar datos normalizados
     print("\n2. Cargando datos normalizados...")
     normalized_dir = Path("data/normalized")
+    store = ColumnarStore(str(normalized_dir / "store"))
+    store.import_directory(str(normalized_dir))
     
     # Tabla 1: maestro_instituciones
     print("\n   Tabla: maestro_instituciones")
-    df_maestro = pd.read_csv(normalized_dir / "maestro_instituciones.csv")
-    df_maestro.to_sql('maestro_instituciones', conn, if_exists='replace', index=False)
-    print(f"      ✓ {len(df_maestro)} registros cargados")
+    rows = store.export_sqlite('maestro_instituciones', conn)
+    print(f"      ✓ {rows} registros cargados")
     
     # Tabla 2: ubicacion_geografica
     print("\n   Tabla: ubicacion_geografica")
-    df_ubicacion = pd.read_csv(normalized_dir / "ubicacion_geografica.csv")
-    df_ubicacion.to_sql('ubicacion_geografica', conn, if_exists='replace', index=False)
-    print(f"      ✓ {len(df_ubicacion)} registros cargados")
+    rows = store.export_sqlite('ubicacion_geografica', conn)
+    print(f"      ✓ {rows} registros cargados")
     
     # Tabla 3: hechos_financieros
     print("\n   Tabla: hechos_financieros")
-    df_hechos = pd.read_csv(normalized_dir / "hechos_financieros.csv")
-    df_hechos.to_sql('hechos_financieros', conn, if_exists='replace', index=False)
-    print(f"      ✓ {len(df_hechos)} registros cargados")
+    rows = store.export_sqlite('hechos_financieros', conn)
+    print(f"      ✓ {rows} registros cargados")
     
     # Tabla 4: dim_tiempo
     print("\n   Tabla: dim_tiempo")
-    df_tiempo = pd.read_csv(normalized_dir / "dim_tiempo.csv")
-    df_tiempo.to_sql('dim_tiempo', conn, if_exists='replace', index=False)
-    print(f"      ✓ {len(df_tiempo)} registros cargados")
+    rows = store.export_sqlite('dim_tiempo', conn)
+    print(f"      ✓ {rows} registros cargados")
     
     # 3. Crear vistas para análisis
     print("\n3. Creando vistas SQL para análisis...")
@@ -130,6 +134,7 @@ def create_sqlite_database():
     for view in views:
         print(f"      - {view[0]}")
     
+    profile.checkpoint(conn)
     conn.close()
     
     # 5. Crear archivo de configuración para Superset
@@ -137,7 +142,8 @@ def create_sqlite_database():
     
     superset_config = {
         "database_name": "DIBIE Financiero",
-        "sqlalchemy_uri": f"sqlite:///{db_path.absolute()}",
+        "sqlalchemy_uri": profile.sqlalchemy_uri(db_path),
+        "extra": profile.superset_database("DIBIE Financiero", db_path)["extra"],
         "dashboards": [
             {
                 "name": "Análisis Financiero Instituciones",
@@ -187,7 +193,7 @@ def create_sqlite_database():
     print("=" * 70)
     print(f"\nRuta de la base de datos: {db_path.absolute()}")
     print(f"\nURI de conexión para Superset:")
-    print(f"  sqlite:///{db_path.absolute()}")
+    print(f"  {profile.sqlalchemy_uri(db_path)}")
     
     print("\n" + "=" * 70)
     print("INSTRUCCIONES PARA APACHE SUPERSET")
@@ -204,7 +210,7 @@ def create_sqlite_database():
     
     print("\n3. Agregar Base de Datos:")
     print("   - Data → Databases → + Database")
-    print(f"   - SQLALCHEMY URI: sqlite:///{db_path.absolute()}")
+    print(f"   - SQLALCHEMY URI: {profile.sqlalchemy_uri(db_path)}")
     print("   - Database Name: DIBIE Financiero")
     print("   - Test Connection → Connect")
     
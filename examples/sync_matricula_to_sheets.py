@@ -6,6 +6,11 @@ from pathlib import Path
 import gspread
 from google.oauth2.service_account import Credentials
 import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.columnar_store import ColumnarStore
 
 
 def sync_matricula_to_sheets():
@@ -38,10 +43,11 @@ def sync_matricula_to_sheets():
     
     # 3. Cargar datos
     print("\n2. Cargando datos locales...")
-    normalized_dir = Path("data/normalized")
+    store = ColumnarStore("data/normalized/store")
+    store.import_directory("data/normalized")
     
-    dim_grados = pd.read_csv(normalized_dir / "dim_grados.csv")
-    hechos_matricula = pd.read_csv(normalized_dir / "hechos_matricula.csv")
+    dim_grados = store.read("dim_grados")
+    hechos_matricula = store.read("hechos_matricula")
     
     print(f"   ✓ dim_grados: {len(dim_grados)} registros")
     print(f"   ✓ hechos_matricula: {len(hechos_matricula)} registros")
@@ -2,18 +2,33 @@
 DIBIE - Sincronizar datos de Google Sheets a SQLite para Superset
 Carga datos de matrícula desde Google Sheets a base de datos local
 """
-import sqlite3
 import pandas as pd
 from pathlib import Path
 from google.oauth2.service_account import Credentials
 import gspread
 import json
+import os
+import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-def sync_sheets_to_sqlite():
+from ingestion.columnar_store import ColumnarStore
+from ingestion.sqlite_profile import SQLiteProfile
+from dashboard.superset_manager import SupersetManager
+
+
+def sync_sheets_to_sqlite(frames: dict = None) -> dict:
     """
     Sincronizar datos de Google Sheets a SQLite para uso en Superset
+    
+    Args:
+        frames: Tablas ya cargadas en memoria por nombre; las que falten se
+            leen de Google Sheets o del almacén columnar
+    
+    Returns:
+        Huella de cada tabla y tablas modificadas en esta sincronización
     """
+    frames = frames or {}
     print("=" * 70)
     print("DIBIE - Sincronización Google Sheets → SQLite")
     print("=" * 70)
@@ -22,34 +37,44 @@ def sync_sheets_to_sqlite():
     SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
     SPREADSHEET_ID = '1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc'
     
-    # Autenticación
+    # Autenticación (solo si faltan tablas de Sheets)
     print("\n1. Conectando a Google Sheets...")
-    creds = Credentials.from_service_account_file(
-        'config/credentials_google.json',
-        scopes=SCOPES
-    )
-    client = gspread.authorize(creds)
-    spreadsheet = client.open_by_key(SPREADSHEET_ID)
-    print("   ✓ Conectado a: maestro__dibie")
+    spreadsheet = None
+    if not {'dim_grados', 'hechos_matricula'} <= set(frames):
+        creds = Credentials.from_service_account_file(
+            'config/credentials_google.json',
+            scopes=SCOPES
+        )
+        client = gspread.authorize(creds)
+        spreadsheet = client.open_by_key(SPREADSHEET_ID)
+        print("   ✓ Conectado a: maestro__dibie")
+    else:
+        print("   ✓ Tablas de Sheets recibidas en memoria")
     
     # Crear/abrir base de datos SQLite
     db_path = Path("data/database/dibie_financiero.db")
     db_path.parent.mkdir(parents=True, exist_ok=True)
     
-    conn = sqlite3.connect(db_path)
+    # WAL: los dashboards siguen leyendo mientras se sincroniza
+    profile = SQLiteProfile()
+    conn = profile.connect(db_path)
     cursor = conn.cursor()
     print(f"\n2. Base de datos: {db_path}")
     
+    store = ColumnarStore("data/normalized/store")
+    store.import_directory("data/normalized")
+    
     # ========================================================================
     # TABLA 1: dim_grados
     # ========================================================================
     print("\n3. Cargando dim_grados...")
     try:
-        sheet = spreadsheet.worksheet('dim_grados')
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        if 'dim_grados' in frames:
+            df = frames['dim_grados']
+        else:
+            df = pd.DataFrame(spreadsheet.worksheet('dim_grados').get_all_records())
         
-        df.to_sql('dim_grados', conn, if_exists='replace', index=False)
+        profile.replace_table(conn, 'dim_grados', df)
         print(f"   ✓ {len(df)} grados cargados")
         print(f"     Columnas: {', '.join(df.columns.tolist())}")
     except Exception as e:
@@ -60,58 +85,59 @@ def sync_sheets_to_sqlite():
     # ========================================================================
     print("\n4. Cargando hechos_matricula...")
     try:
-        sheet = spreadsheet.worksheet('hechos_matricula')
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        if 'hechos_matricula' in frames:
+            df = frames['hechos_matricula']
+        else:
+            df = pd.DataFrame(spreadsheet.worksheet('hechos_matricula').get_all_records())
         
-        df.to_sql('hechos_matricula', conn, if_exists='replace', index=False)
+        profile.replace_table(conn, 'hechos_matricula', df)
         print(f"   ✓ {len(df)} registros de matrícula cargados")
         print(f"     Total estudiantes: {df['cantidad_estudiantes'].sum():,.0f}")
     except Exception as e:
         print(f"   ⚠ No se pudo cargar hechos_matricula: {e}")
     
     # ========================================================================
-    # TABLA 3: maestro_instituciones (desde CSV local)
+    # TABLA 3: maestro_instituciones (desde almacén columnar)
     # ========================================================================
     print("\n5. Cargando maestro_instituciones...")
     try:
-        csv_path = Path("data/normalized/maestro_instituciones.csv")
-        if csv_path.exists():
-            df = pd.read_csv(csv_path)
-            df.to_sql('maestro_instituciones', conn, if_exists='replace', index=False)
-            print(f"   ✓ {len(df)} instituciones cargadas")
+        if 'maestro_instituciones' in frames:
+            rows = profile.replace_table(conn, 'maestro_instituciones', frames['maestro_instituciones'])
+        elif store.has_table('maestro_instituciones'):
+            rows = store.export_sqlite('maestro_instituciones', conn)
+            print(f"   ✓ {rows} instituciones cargadas")
         else:
-            print(f"   ⚠ No se encontró: {csv_path}")
+            print(f"   ⚠ No se encontró en: {store.root}")
     except Exception as e:
         print(f"   ⚠ Error: {e}")
     
     # ========================================================================
-    # TABLA 4: ubicacion_geografica (desde CSV local)
+    # TABLA 4: ubicacion_geografica (desde almacén columnar)
     # ========================================================================
     print("\n6. Cargando ubicacion_geografica...")
     try:
-        csv_path = Path("data/normalized/ubicacion_geografica.csv")
-        if csv_path.exists():
-            df = pd.read_csv(csv_path)
-            df.to_sql('ubicacion_geografica', conn, if_exists='replace', index=False)
-            print(f"   ✓ {len(df)} ubicaciones cargadas")
+        if 'ubicacion_geografica' in frames:
+            rows = profile.replace_table(conn, 'ubicacion_geografica', frames['ubicacion_geografica'])
+        elif store.has_table('ubicacion_geografica'):
+            rows = store.export_sqlite('ubicacion_geografica', conn)
+            print(f"   ✓ {rows} ubicaciones cargadas")
         else:
-            print(f"   ⚠ No se encontró: {csv_path}")
+            print(f"   ⚠ No se encontró en: {store.root}")
     except Exception as e:
         print(f"   ⚠ Error: {e}")
     
     # ========================================================================
-    # TABLA 5: hechos_financieros (desde CSV local)
+    # TABLA 5: hechos_financieros (desde almacén columnar)
     # ========================================================================
     print("\n7. Cargando hechos_financieros...")
     try:
-        csv_path = Path("data/normalized/hechos_financieros.csv")
-        if csv_path.exists():
-            df = pd.read_csv(csv_path)
-            df.to_sql('hechos_financieros', conn, if_exists='replace', index=False)
-            print(f"   ✓ {len(df)} registros financieros cargados")
+        if 'hechos_financieros' in frames:
+            rows = profile.replace_table(conn, 'hechos_financieros', frames['hechos_financieros'])
+        elif store.has_table('hechos_financieros'):
+            rows = store.export_sqlite('hechos_financieros', conn)
+            print(f"   ✓ {rows} registros financieros cargados")
         else:
-            print(f"   ⚠ No se encontró: {csv_path}")
+            print(f"   ⚠ No se encontró en: {store.root}")
     except Exception as e:
         print(f"   ⚠ Error: {e}")
     
@@ -199,6 +225,19 @@ def sync_sheets_to_sqlite():
             print(f"  • {tabla:30s}: ⚠ No disponible")
     
     # Guardar metadata
+    metadata_path = Path("data/database/metadata.json")
+    try:
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            previous_tables = json.load(f).get("tables", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous_tables = {}
+    
+    fingerprints = SupersetManager.table_fingerprints(str(db_path), tablas)
+    changed_tables = [
+        tabla for tabla, fingerprint in fingerprints.items()
+        if previous_tables.get(tabla, {}).get("fingerprint") != fingerprint
+    ]
+    
     metadata = {
         "database": str(db_path.absolute()),
         "created": pd.Timestamp.now().isoformat(),
@@ -210,24 +249,43 @@ def sync_sheets_to_sqlite():
     for tabla in tablas:
         try:
             count = cursor.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
-            metadata["tables"][tabla] = {"records": count}
+            metadata["tables"][tabla] = {"records": count, "fingerprint": fingerprints.get(tabla)}
         except:
             pass
     
-    metadata_path = Path("data/database/metadata.json")
     with open(metadata_path, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
     
     print(f"\n   ✓ Metadata guardada: {metadata_path}")
     
+    profile.checkpoint(conn)
     conn.close()
     
+    # ========================================================================
+    # REFRESCAR CACHÉ DE SUPERSET (solo datasets afectados)
+    # ========================================================================
+    print(f"\n   Tablas modificadas: {', '.join(changed_tables) if changed_tables else 'ninguna'}")
+    superset_user = os.environ.get('SUPERSET_USERNAME')
+    superset_password = os.environ.get('SUPERSET_PASSWORD')
+    if changed_tables and superset_user and superset_password:
+        manager = SupersetManager()
+        if manager.login(superset_user, superset_password):
+            summary = manager.refresh_after_sync(changed_tables, str(db_path))
+            warmed = sum(summary["warmed"].values())
+            print(f"   ✓ Caché de Superset: {len(summary['datasets'])} datasets invalidados, {warmed} precalentados")
+        else:
+            print("   ⚠ No se pudo iniciar sesión en Superset; caché sin refrescar")
+    elif changed_tables:
+        print("   ℹ Defina SUPERSET_USERNAME y SUPERSET_PASSWORD para precalentar la caché de Superset")
+    
     print("\n" + "=" * 70)
     print("✅ SINCRONIZACIÓN COMPLETADA")
     print("=" * 70)
     print(f"\n📂 Base de datos lista: {db_path}")
-    print(f"   SQLite URI: sqlite:///{db_path.absolute()}")
+    print(f"   SQLite URI: {profile.sqlalchemy_uri(db_path)}")
     print("\n🚀 Siguiente paso: python examples\\create_superset_dashboard_views.py")
+    
+    return {"fingerprints": fingerprints, "changed_tables": changed_tables}
 
 
 if __name__ == "__main__":
@@ -7,6 +7,11 @@ from pathlib import Path
 import gspread
 from google.oauth2.service_account import Credentials
 import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ingestion.columnar_store import ColumnarStore
 
 
 def sync_normalized_tables_to_sheets():
@@ -21,6 +26,8 @@ def sync_normalized_tables_to_sheets():
     spreadsheet_id = "1-E58T6yNokv6y7VS0m5tRihXwUdz4glKQVVDYA8wPLc"
     credentials_path = Path("config/credentials_google.json")
     normalized_dir = Path("data/normalized")
+    store = ColumnarStore(str(normalized_dir / "store"))
+    store.import_directory(str(normalized_dir))
     
     if not credentials_path.exists():
         print("✗ No se encontró config/credentials_google.json")
@@ -79,20 +86,16 @@ def sync_normalized_tables_to_sheets():
     ]
     
     # 5. Guardar en formato TSV (tab-separated)
-    print("\n2. Convirtiendo CSV a TSV (evita problemas con comas)...")
+    print("\n2. Exportando tablas a TSV (evita problemas con comas)...")
     tsv_dir = Path("data/tsv")
-    tsv_dir.mkdir(parents=True, exist_ok=True)
     
     for table in tables_to_sync:
-        csv_path = normalized_dir / table["csv_file"]
-        tsv_path = tsv_dir / table["csv_file"].replace(".csv", ".tsv")
-        
-        if csv_path.exists():
-            df = pd.read_csv(csv_path)
-            df.to_csv(tsv_path, sep='\t', index=False, encoding='utf-8')
-            print(f"   ✓ {table['csv_file']} → {tsv_path.name}")
+        if store.has_table(table["sheet_name"]):
+            tsv_path = tsv_dir / f"{table['sheet_name']}.tsv"
+            store.export_delimited(table["sheet_name"], tsv_path, sep='\t')
+            print(f"   ✓ {table['sheet_name']} → {tsv_path.name}")
         else:
-            print(f"   ⚠ No se encontró {csv_path}")
+            print(f"   ⚠ No se encontró {table['sheet_name']} en {store.root}")
     
     # 6. Sincronizar cada tabla
     print("\n3. Sincronizando tablas con Google Sheets...")
@@ -100,14 +103,12 @@ def sync_normalized_tables_to_sheets():
     for i, table in enumerate(tables_to_sync, 1):
         print(f"\n   Tabla {i}/{len(tables_to_sync)}: {table['sheet_name']}")
         
-        csv_path = normalized_dir / table["csv_file"]
-        
-        if not csv_path.exists():
-            print(f"      ✗ No se encontró {csv_path}")
+        if not store.has_table(table["sheet_name"]):
+            print(f"      ✗ No se encontró {table['sheet_name']} en {store.root}")
             continue
         
         # Leer datos
-        df = pd.read_csv(csv_path)
+        df = store.read(table["sheet_name"])
         print(f"      Datos: {len(df)} filas, {len(df.columns)} columnas")
         
         # Verificar si la hoja ya existe
@@ -1,27 +1,43 @@
 """
 DIBIE Package Initialization
 """
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "DIBIE Team"
 __description__ = "Data Intelligence Business Intelligence Engine"
 
-from .ingestion.google_drive_connector import GoogleDriveConnector
-from .ingestion.table_loader import TableLoader
-from .ingestion.document_processor import DocumentProcessor
-from .analysis.kusto_analyzer import KustoAnalyzer
-from .analysis.eventstream_manager import EventStreamManager
-from .analysis.data_quality_analyzer import DataQualityAnalyzer
-from .dashboard.dashboard_generator import DashboardGenerator
-from .dibie_main import DIBIEOrchestrator
+# Public classes are imported on first access, so importing the package
+# does not load pandas, pyarrow or duckdb
+_EXPORTS = {
+    'GoogleDriveConnector': '.ingestion.google_drive_connector',
+    'TableLoader': '.ingestion.table_loader',
+    'DocumentProcessor': '.ingestion.document_processor',
+    'DocumentIndex': '.ingestion.document_index',
+    'DocumentRegistry': '.ingestion.document_registry',
+    'ColumnarStore': '.ingestion.columnar_store',
+    'SQLiteProfile': '.ingestion.sqlite_profile',
+    'KustoAnalyzer': '.analysis.kusto_analyzer',
+    'EventStreamManager': '.analysis.eventstream_manager',
+    'DataQualityAnalyzer': '.analysis.data_quality_analyzer',
+    'DataValidator': '.analysis.data_validator',
+    'QueryEngine': '.analysis.query_engine',
+    'CostCube': '.analysis.cost_cube',
+    'DashboardGenerator': '.dashboard.dashboard_generator',
+    'DIBIEOrchestrator': '.dibie_main',
+}
 
-__all__ = [
-    'GoogleDriveConnector',
-    'TableLoader',
-    'DocumentProcessor',
-    'KustoAnalyzer',
-    'EventStreamManager',
-    'DataQualityAnalyzer',
-    'DashboardGenerator',
-    'DIBIEOrchestrator'
-]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,236 @@
+"""
+DIBIE - Append Tracker
+Track how far append-only text tables have been profiled
+"""
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+class _BoundedReader(io.RawIOBase):
+    """Binary reader that stops at a fixed byte offset"""
+    
+    def __init__(self, f, limit: int):
+        self.f = f
+        self.remaining = limit
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self.remaining <= 0:
+            return 0
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+class AppendTracker:
+    """Persist profiling progress for append-only CSV/TXT files
+    
+    For each dataset the tracker stores the byte offset up to which rows
+    were profiled, the column names and a fingerprint of the profiled
+    prefix. On the next run only bytes after the offset are read, unless
+    the fingerprint shows that earlier rows were rewritten.
+    
+    Only complete lines are consumed while the file is being written: an
+    unterminated last line is picked up on the next run. Once the file has
+    stopped growing (see ``is_settled``) the last line is read even
+    without a newline.
+    """
+    
+    APPENDABLE_FORMATS = {'.csv': ',', '.txt': '\t', '.tsv': '\t'}
+    
+    # Sampled fingerprints hash this many bytes at each sampled position
+    SAMPLE_BLOCK_SIZE = 64 * 1024
+    SAMPLE_POSITIONS = 8
+    
+    # Seconds without modification after which a file counts as complete
+    SETTLE_SECONDS = 60
+    
+    def __init__(self, state_dir: str = "data/cache/profiles"):
+        """Initialize append tracker
+        
+        Args:
+            state_dir: Directory for per-dataset state files
+        """
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+    
+    def state_paths(self, dataset_name: str) -> Tuple[Path, Path]:
+        """Paths of the metadata and profile files of a dataset"""
+        return (
+            self.state_dir / f"{dataset_name}.json",
+            self.state_dir / f"{dataset_name}.profile"
+        )
+    
+    def load_state(self, dataset_name: str) -> Optional[Dict]:
+        """Load the stored metadata of a dataset
+        
+        Args:
+            dataset_name: Name of the dataset
+        
+        Returns:
+            Metadata dictionary or None
+        """
+        meta_path, profile_path = self.state_paths(dataset_name)
+        if not meta_path.exists() or not profile_path.exists():
+            return None
+        
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save_state(self, dataset_name: str, file_path: str, offset: int, columns: List[str],
+                   rows: int, full_fingerprint: bool):
+        """Store the metadata of a dataset after profiling
+        
+        Args:
+            dataset_name: Name of the dataset
+            file_path: Profiled file
+            offset: Byte offset up to which rows were profiled
+            columns: Column names from the header
+            rows: Number of profiled rows
+            full_fingerprint: Whether the fingerprint covers the whole prefix
+        """
+        meta_path, _ = self.state_paths(dataset_name)
+        state = {
+            "file_path": str(file_path),
+            "offset": offset,
+            "columns": columns,
+            "rows": rows,
+            "full_fingerprint": full_fingerprint,
+            "fingerprint": self.fingerprint(file_path, offset, full_fingerprint),
+            "updated": datetime.now().isoformat()
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+    
+    def is_append_of(self, state: Dict, file_path: str) -> bool:
+        """Check that a file still starts with the profiled prefix
+        
+        Args:
+            state: Stored metadata
+            file_path: Current file
+        
+        Returns:
+            True if only rows after the stored offset may have changed
+        """
+        if str(file_path) != state["file_path"]:
+            return False
+        
+        offset = state["offset"]
+        if os.path.getsize(file_path) < offset:
+            return False
+        
+        return self.fingerprint(file_path, offset, state["full_fingerprint"]) == state["fingerprint"]
+    
+    @classmethod
+    def fingerprint(cls, file_path: str, length: int, full: bool = False) -> str:
+        """Hash the first ``length`` bytes of a file
+        
+        A sampled fingerprint hashes fixed-size blocks at the start, the end
+        and evenly spaced positions of the prefix, so its cost does not grow
+        with the file. A full fingerprint hashes every byte of the prefix.
+        
+        Args:
+            file_path: Path to the file
+            length: Prefix length in bytes
+            full: Hash the whole prefix
+        
+        Returns:
+            Hex digest
+        """
+        sha = hashlib.sha256(str(length).encode())
+        block = cls.SAMPLE_BLOCK_SIZE
+        
+        with open(file_path, 'rb') as f:
+            if full or length <= block * (cls.SAMPLE_POSITIONS + 2):
+                remaining = length
+                while remaining > 0:
+                    data = f.read(min(block, remaining))
+                    if not data:
+                        break
+                    sha.update(data)
+                    remaining -= len(data)
+            else:
+                step = (length - block) // (cls.SAMPLE_POSITIONS + 1)
+                positions = [i * step for i in range(cls.SAMPLE_POSITIONS + 1)] + [length - block]
+                for position in positions:
+                    f.seek(position)
+                    sha.update(f.read(block))
+        
+        return sha.hexdigest()
+    
+    @classmethod
+    def is_settled(cls, file_path: str) -> bool:
+        """Check whether a file has not been modified for SETTLE_SECONDS"""
+        return time.time() - os.path.getmtime(file_path) >= cls.SETTLE_SECONDS
+    
+    @staticmethod
+    def complete_lines_end(file_path: str, start: int, final: bool = False) -> int:
+        """Offset just after the last newline at or after ``start``
+        
+        Args:
+            file_path: Path to the file
+            start: Offset where the search stops
+            final: The file is complete, so a last line without a newline
+                counts too
+        
+        Returns:
+            End offset of the last complete line, or ``start`` if there is none
+        """
+        position = os.path.getsize(file_path)
+        if final:
+            return max(start, position)
+        with open(file_path, 'rb') as f:
+            while position > start:
+                read_from = max(start, position - 64 * 1024)
+                f.seek(read_from)
+                data = f.read(position - read_from)
+                newline = data.rfind(b'\n')
+                if newline >= 0:
+                    return read_from + newline + 1
+                position = read_from
+        return start
+    
+    def iter_rows(self, file_path: str, start: int, end: int, columns: Optional[List[str]] = None,
+                  chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]:
+        """Read the rows stored between two byte offsets
+        
+        Args:
+            file_path: Path to the file
+            start: First byte to read (0 to read the header)
+            end: Byte offset where reading stops
+            columns: Column names when reading past the header
+            chunksize: Rows per chunk
+            **kwargs: Additional parameters for pandas.read_csv
+        
+        Yields:
+            DataFrames of rows
+        """
+        if end <= start:
+            return
+        
+        kwargs.setdefault('sep', self.APPENDABLE_FORMATS.get(Path(file_path).suffix.lower(), ','))
+        if start > 0:
+            kwargs.update(header=None, names=columns)
+        
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            stream = io.BufferedReader(_BoundedReader(f, end - start))
+            with pd.read_csv(stream, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+    
+    @staticmethod
+    def read_header(file_path: str, **kwargs) -> List[str]:
+        """Column names of a delimited text file"""
+        kwargs.setdefault('sep', AppendTracker.APPENDABLE_FORMATS.get(Path(file_path).suffix.lower(), ','))
+        return pd.read_csv(file_path, nrows=0, **kwargs).columns.tolist()
@@ -0,0 +1,464 @@
+"""
+DIBIE - Cost Cube
+Pre-aggregated cost per student over every grouping of the dictionary dimensions
+"""
+import re
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+
+class CostCube:
+    """Additive cost and enrollment measures for every grouping set
+    
+    The cube holds one cell per combination of values of any subset of
+    ``DIMENSIONS`` (the granularities of DICCIONARIO_COSTO_ESTUDIANTE), so
+    the cost per student of any drill-down is a dictionary lookup plus a
+    division. Cells store sums only (cost per category, total cost and
+    students); ratios are never stored because they do not add up.
+    
+    Costs are reported per institution and year. Grade and level cells get
+    the institution-year cost split in proportion to their enrollment (or
+    evenly when every grade has zero students), and an institution-year
+    with costs but no enrollment rows keeps its cost in an ``UNASSIGNED``
+    grade.
+    
+    ``grouping_id`` follows SQL GROUPING_ID: bit ``i`` is set when
+    ``DIMENSIONS[i]`` is rolled up, and the rolled-up value is None.
+    
+    Every cell also counts the base cells under it. Updates add and
+    subtract those counts with the measures, and a cell whose count drops
+    to zero is removed, so an updated cube has the same cells as one built
+    from scratch.
+    """
+    
+    DIMENSIONS = ["institucion_id", "anio", "grado_codigo", "nivel_educativo"]
+    COST_KEYS = ["institucion_id", "anio"]
+    ENROLLMENT_KEYS = ["institucion_id", "anio", "grado_codigo", "nivel_educativo"]
+    
+    # Cost categories of "costos_operativos" in the dictionary
+    COST_CATEGORIES = [
+        "personal", "servicios_publicos", "materiales_suministros", "mantenimiento",
+        "servicios_contratados", "tecnologia", "gastos_administrativos"
+    ]
+    STUDENTS = "estudiantes"
+    TOTAL_COST = "costo_total_operativo"
+    
+    # Source column names mapped to the cube dimensions
+    ALIASES = {"dane_institucion": "institucion_id", "ano": "anio", "cantidad_estudiantes": "estudiantes"}
+    UNASSIGNED = "sin_asignar"
+    # Number of base cells under a cell; stored next to the measures by save()
+    BASE_ROWS = "celdas_base"
+    
+    def __init__(self, cost_columns: Optional[List[str]] = None):
+        """Initialize cost cube
+        
+        Args:
+            cost_columns: Cost columns summed into the total
+                (the dictionary categories present in the data if None)
+        """
+        self.cost_columns = list(cost_columns) if cost_columns else None
+        self.logger = get_logger('CostCube')
+        self.costs = pd.DataFrame()
+        self.enrollment = pd.DataFrame()
+        self._keys: List[Tuple] = []
+        self._values = np.zeros((0, 0))
+        self._counts = np.zeros(0, dtype="int64")
+        self._index: Dict[Tuple, int] = {}
+    
+    @property
+    def measures(self) -> List[str]:
+        """Measure columns of every cell"""
+        return (self.cost_columns or []) + [self.TOTAL_COST, self.STUDENTS]
+    
+    @classmethod
+    def grouping_sets(cls) -> List[Tuple[str, ...]]:
+        """Every subset of the dimensions, from the base cells to the grand total"""
+        return [
+            combo
+            for size in range(len(cls.DIMENSIONS), -1, -1)
+            for combo in combinations(cls.DIMENSIONS, size)
+        ]
+    
+    def build(self, costs: pd.DataFrame, enrollment: pd.DataFrame) -> "CostCube":
+        """Build the cube from cost and enrollment rows
+        
+        Args:
+            costs: Cost rows with institucion_id, anio and cost columns
+                (several rows per institution and year are summed)
+            enrollment: Enrollment rows with institucion_id, anio,
+                grado_codigo, nivel_educativo and estudiantes
+        
+        Returns:
+            The cube itself
+        """
+        costs = self._prepare_costs(costs)
+        enrollment = self._prepare_enrollment(enrollment)
+        self.costs = self._sum_by(costs, self.COST_KEYS)
+        self.enrollment = self._sum_by(enrollment, self.ENROLLMENT_KEYS)
+        
+        base = self._allocate(self.costs, self.enrollment)
+        self._keys, self._values, self._index = [], np.zeros((0, len(self.measures))), {}
+        self._counts = np.zeros(0, dtype="int64")
+        self._add_cells(self._rollup(base))
+        
+        self.logger.info(
+            f"Built cost cube: {len(self._keys)} cells from {len(self.costs)} institution-years"
+        )
+        return self
+    
+    def update(self, costs: Optional[pd.DataFrame] = None, enrollment: Optional[pd.DataFrame] = None,
+               replace: bool = False) -> int:
+        """Apply new cost or enrollment rows without rebuilding the cube
+        
+        Only the institution-years present in the new rows are
+        re-allocated. The difference between their new and old base cells
+        is rolled up and added to the existing cells; cells left without
+        base cells (e.g. the UNASSIGNED grade once enrollment arrives) are
+        removed.
+        
+        Args:
+            costs: New cost rows
+            enrollment: New enrollment rows
+            replace: Replace stored rows with the same key instead of
+                adding to them (for corrected submissions)
+        
+        Returns:
+            Number of cells added or changed
+        """
+        if self.cost_columns is None:
+            raise ValueError("Cube must be built before it can be updated")
+        
+        affected = []
+        new_costs, new_enrollment = self.costs, self.enrollment
+        
+        if costs is not None and len(costs):
+            costs = self._sum_by(self._prepare_costs(costs), self.COST_KEYS)
+            new_costs = self._merge_rows(self.costs, costs, self.COST_KEYS, replace)
+            affected.append(costs[self.COST_KEYS])
+        
+        if enrollment is not None and len(enrollment):
+            enrollment = self._sum_by(self._prepare_enrollment(enrollment), self.ENROLLMENT_KEYS)
+            if replace:
+                # A resubmitted institution-year replaces all of its grades
+                stale = self._rows_in(self.enrollment, enrollment[self.COST_KEYS].drop_duplicates())
+                new_enrollment = self._merge_rows(self.enrollment[~stale], enrollment,
+                                                  self.ENROLLMENT_KEYS, replace=False)
+            else:
+                new_enrollment = self._merge_rows(self.enrollment, enrollment,
+                                                  self.ENROLLMENT_KEYS, replace=False)
+            affected.append(enrollment[self.COST_KEYS])
+        
+        if not affected:
+            return 0
+        
+        affected = pd.concat(affected, ignore_index=True).drop_duplicates()
+        old_base = self._allocate(
+            self.costs[self._rows_in(self.costs, affected)],
+            self.enrollment[self._rows_in(self.enrollment, affected)]
+        )
+        new_base = self._allocate(
+            new_costs[self._rows_in(new_costs, affected)],
+            new_enrollment[self._rows_in(new_enrollment, affected)]
+        )
+        old_base[self.measures + [self.BASE_ROWS]] = -old_base[self.measures + [self.BASE_ROWS]]
+        delta = pd.concat([new_base, old_base], ignore_index=True)
+        
+        self.costs, self.enrollment = new_costs, new_enrollment
+        changed = self._add_cells(self._rollup(delta))
+        
+        self.logger.info(f"Updated {changed} cells for {len(affected)} institution-years")
+        return changed
+    
+    def lookup(self, **dimensions) -> Optional[Dict[str, float]]:
+        """Measures of one cell
+        
+        Dimensions that are not given are rolled up, so
+        ``lookup(anio=2024)`` is the total of every institution in 2024.
+        
+        Args:
+            **dimensions: Values of some of the cube dimensions
+        
+        Returns:
+            Dictionary of measures, or None if the cell does not exist
+        """
+        unknown = set(dimensions) - set(self.DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {sorted(unknown)}")
+        
+        row = self._index.get(self._cell_key(dimensions))
+        if row is None:
+            return None
+        return dict(zip(self.measures, self._values[row].tolist()))
+    
+    def cost_per_student(self, **dimensions) -> Optional[float]:
+        """Total operating cost divided by students of one cell
+        
+        Args:
+            **dimensions: Values of some of the cube dimensions
+        
+        Returns:
+            Cost per student, or None if the cell is missing or has no students
+        """
+        cell = self.lookup(**dimensions)
+        if cell is None or not cell[self.STUDENTS]:
+            return None
+        return cell[self.TOTAL_COST] / cell[self.STUDENTS]
+    
+    def to_frame(self, grouping: Optional[List[str]] = None) -> pd.DataFrame:
+        """Cells of the cube as a DataFrame
+        
+        Args:
+            grouping: Only return the cells grouped by exactly these
+                dimensions (all cells if None)
+        
+        Returns:
+            DataFrame with grouping_id, the dimensions, the measures and
+            costo_por_estudiante
+        """
+        keys = self._keys
+        values = self._values
+        if grouping is not None:
+            grouping_id = self._grouping_id(grouping)
+            rows = [i for i, key in enumerate(keys) if key[0] == grouping_id]
+            keys = [keys[i] for i in rows]
+            values = values[rows]
+        
+        df = pd.DataFrame(keys, columns=["grouping_id"] + self.DIMENSIONS)
+        df["grouping_id"] = df["grouping_id"].astype("int8")
+        for dim in self.DIMENSIONS:
+            df[dim] = df[dim].astype("category")
+        
+        measures = pd.DataFrame(values, columns=self.measures)
+        df = pd.concat([df, measures], axis=1)
+        students = df[self.STUDENTS].where(df[self.STUDENTS] != 0)
+        df["costo_por_estudiante"] = df[self.TOTAL_COST] / students
+        return df
+    
+    def save(self, directory: str = "data/normalized/cubes/costo_estudiante"):
+        """Store the cube and its source sums as Parquet files
+        
+        Args:
+            directory: Output directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        cells = self.to_frame().drop(columns=["costo_por_estudiante"])
+        cells[self.BASE_ROWS] = self._counts
+        cells.to_parquet(directory / "cube.parquet", index=False)
+        self.costs.to_parquet(directory / "costs.parquet", index=False)
+        self.enrollment.to_parquet(directory / "enrollment.parquet", index=False)
+        self.logger.info(f"Saved cost cube to {directory}")
+    
+    @classmethod
+    def load(cls, directory: str = "data/normalized/cubes/costo_estudiante") -> "CostCube":
+        """Load a cube stored with save()
+        
+        Args:
+            directory: Cube directory
+        
+        Returns:
+            CostCube ready for lookups and updates
+        """
+        directory = Path(directory)
+        cells = pd.read_parquet(directory / "cube.parquet")
+        costs = pd.read_parquet(directory / "costs.parquet")
+        
+        cube = cls(cost_columns=[col for col in costs.columns if col not in cls.COST_KEYS + [cls.TOTAL_COST]])
+        enrollment = pd.read_parquet(directory / "enrollment.parquet")
+        if cls.BASE_ROWS not in cells.columns:
+            # Saved before cells counted their base cells
+            return cube.build(costs, enrollment)
+        cube.costs = costs
+        cube.enrollment = enrollment
+        
+        dims = cells[cls.DIMENSIONS].astype(object).where(cells[cls.DIMENSIONS].notna(), None)
+        cube._keys = list(zip(cells["grouping_id"].astype(int), *(dims[dim] for dim in cls.DIMENSIONS)))
+        cube._values = np.array(cells[cube.measures], dtype="float64")
+        cube._counts = np.array(cells[cls.BASE_ROWS], dtype="int64")
+        cube._index = {key: i for i, key in enumerate(cube._keys)}
+        return cube
+    
+    def _prepare_costs(self, costs: pd.DataFrame) -> pd.DataFrame:
+        """Rename, label and total the cost rows"""
+        costs = self._canonical(costs)
+        missing = [key for key in self.COST_KEYS if key not in costs.columns]
+        if missing:
+            raise ValueError(f"Cost rows are missing columns: {missing}")
+        
+        if self.cost_columns is None:
+            self.cost_columns = [col for col in self.COST_CATEGORIES if col in costs.columns]
+            if not self.cost_columns:
+                raise ValueError(
+                    f"Cost rows have none of the dictionary categories {self.COST_CATEGORIES}; "
+                    f"pass cost_columns"
+                )
+        
+        result = costs[self.COST_KEYS].copy()
+        for col in self.cost_columns:
+            if col in costs.columns:
+                result[col] = pd.to_numeric(costs[col], errors='coerce').fillna(0.0).astype("float64")
+            else:
+                result[col] = 0.0
+        result[self.TOTAL_COST] = result[self.cost_columns].sum(axis=1)
+        return result
+    
+    def _prepare_enrollment(self, enrollment: pd.DataFrame) -> pd.DataFrame:
+        """Rename and label the enrollment rows"""
+        enrollment = self._canonical(enrollment)
+        missing = [key for key in self.ENROLLMENT_KEYS[:3] + [self.STUDENTS] if key not in enrollment.columns]
+        if missing:
+            raise ValueError(f"Enrollment rows are missing columns: {missing}")
+        
+        result = enrollment[self.ENROLLMENT_KEYS[:3]].copy()
+        if "nivel_educativo" in enrollment.columns:
+            result["nivel_educativo"] = enrollment["nivel_educativo"].fillna(self.UNASSIGNED)
+        else:
+            result["nivel_educativo"] = self.UNASSIGNED
+        result[self.STUDENTS] = pd.to_numeric(enrollment[self.STUDENTS], errors='coerce').fillna(0.0).astype("float64")
+        return result
+    
+    def _canonical(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply column aliases and turn key values into labels"""
+        renames = {src: dst for src, dst in self.ALIASES.items() if src in df.columns and dst not in df.columns}
+        df = df.rename(columns=renames)
+        keys = [dim for dim in self.DIMENSIONS if dim in df.columns]
+        if keys:
+            df = df.copy()
+            for key in keys:
+                df[key] = self._labels(df[key])
+        return df
+    
+    @staticmethod
+    def _labels(series: pd.Series) -> pd.Series:
+        """Key values as strings ("2024.0" and 2024 become "2024")"""
+        text = series.astype(str).str.strip()
+        text = text.str.replace(r"\.0+$", "", regex=True)
+        return text.mask(series.isna() | (text == ""), CostCube.UNASSIGNED)
+    
+    @classmethod
+    def _label(cls, value) -> str:
+        """Label of a single key value (same rules as _labels)"""
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return cls.UNASSIGNED
+        text = re.sub(r"\.0+$", "", str(value).strip())
+        return text or cls.UNASSIGNED
+    
+    def _sum_by(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Sum the measure columns of rows sharing a key"""
+        measures = [col for col in df.columns if col not in keys]
+        return df.groupby(keys, sort=False, as_index=False)[measures].sum()
+    
+    @staticmethod
+    def _rows_in(df: pd.DataFrame, keys: pd.DataFrame) -> pd.Series:
+        """Mask of rows whose institution-year is in ``keys``"""
+        index = pd.MultiIndex.from_frame(df[CostCube.COST_KEYS])
+        return pd.Series(index.isin(pd.MultiIndex.from_frame(keys[CostCube.COST_KEYS])), index=df.index)
+    
+    def _merge_rows(self, stored: pd.DataFrame, new: pd.DataFrame, keys: List[str],
+                    replace: bool) -> pd.DataFrame:
+        """Add new rows to the stored sums, or replace rows with the same key"""
+        if replace:
+            index = pd.MultiIndex.from_frame(stored[keys])
+            stored = stored[~index.isin(pd.MultiIndex.from_frame(new[keys]))]
+        return self._sum_by(pd.concat([stored, new], ignore_index=True), keys)
+    
+    def _allocate(self, costs: pd.DataFrame, enrollment: pd.DataFrame) -> pd.DataFrame:
+        """Base cells: institution-year costs split over grades by enrollment"""
+        cost_measures = self.cost_columns + [self.TOTAL_COST]
+        
+        totals = enrollment.groupby(self.COST_KEYS, sort=False)[self.STUDENTS].transform("sum")
+        base = enrollment.merge(costs, on=self.COST_KEYS, how="left")
+        share = (enrollment[self.STUDENTS] / totals.where(totals != 0)).to_numpy()
+        
+        # Institution-years without students spread their cost evenly over their grades
+        counts = enrollment.groupby(self.COST_KEYS, sort=False)[self.STUDENTS].transform("size").to_numpy()
+        share = np.where(np.isnan(share), 1.0 / counts, share)
+        
+        for col in cost_measures:
+            base[col] = base[col].fillna(0.0).to_numpy() * share
+        
+        # Costs of institution-years with no enrollment rows at all
+        enrolled = pd.MultiIndex.from_frame(enrollment[self.COST_KEYS])
+        orphans = costs[~pd.MultiIndex.from_frame(costs[self.COST_KEYS]).isin(enrolled)].copy()
+        if len(orphans):
+            orphans["grado_codigo"] = self.UNASSIGNED
+            orphans["nivel_educativo"] = self.UNASSIGNED
+            orphans[self.STUDENTS] = 0.0
+            base = pd.concat([base, orphans], ignore_index=True)
+        
+        base = base[self.DIMENSIONS + self.measures].copy()
+        base[self.BASE_ROWS] = 1
+        return base
+    
+    def _rollup(self, base: pd.DataFrame) -> List[Tuple[Tuple, np.ndarray]]:
+        """Sum the base cells over every grouping set
+        
+        Each cell's values are its measures followed by its base cell count.
+        """
+        cells = []
+        if not len(base):
+            return cells
+        
+        columns = self.measures + [self.BASE_ROWS]
+        for grouping in self.grouping_sets():
+            if grouping:
+                grouped = base.groupby(list(grouping), sort=False)[columns].sum()
+                labels = grouped.index if len(grouping) > 1 else [(value,) for value in grouped.index]
+                values = grouped.to_numpy(dtype="float64")
+            else:
+                labels = [()]
+                values = base[columns].to_numpy(dtype="float64").sum(axis=0, keepdims=True)
+            
+            for label, row in zip(labels, values):
+                named = dict(zip(grouping, label))
+                cells.append((self._cell_key(named, labeled=True), row))
+        return cells
+    
+    def _add_cells(self, cells: List[Tuple[Tuple, np.ndarray]]) -> int:
+        """Add values from _rollup to existing cells, append new ones and drop emptied ones"""
+        new_keys, new_values, new_counts = [], [], []
+        for key, values in cells:
+            row = self._index.get(key)
+            if row is None:
+                self._index[key] = len(self._keys) + len(new_keys)
+                new_keys.append(key)
+                new_values.append(values[:-1])
+                new_counts.append(int(round(values[-1])))
+            else:
+                self._values[row] += values[:-1]
+                self._counts[row] += int(round(values[-1]))
+        
+        if new_keys:
+            self._keys.extend(new_keys)
+            self._values = np.vstack([self._values, np.array(new_values)])
+            self._counts = np.concatenate([self._counts, np.array(new_counts, dtype="int64")])
+        
+        keep = self._counts > 0
+        if not keep.all():
+            self._keys = [key for key, kept in zip(self._keys, keep) if kept]
+            self._values = self._values[keep]
+            self._counts = self._counts[keep]
+            self._index = {key: i for i, key in enumerate(self._keys)}
+        return len(cells)
+    
+    def _grouping_id(self, grouping) -> int:
+        """GROUPING_ID of a set of dimensions"""
+        return sum(1 << i for i, dim in enumerate(self.DIMENSIONS) if dim not in grouping)
+    
+    def _cell_key(self, dimensions: Dict, labeled: bool = False) -> Tuple:
+        """Index key of the cell grouped by the given dimensions"""
+        label = (lambda value: value) if labeled else self._label
+        return (self._grouping_id(dimensions),) + tuple(
+            label(dimensions[dim]) if dim in dimensions else None
+            for dim in self.DIMENSIONS
+        )
@@ -3,9 +3,20 @@ DIBIE - Data Quality Analyzer
 Analyze data quality and generate quality reports
 """
 import pandas as pd
-from typing import Dict, List, Optional
-import logging
+from typing import Dict, Iterable, List, Optional, Union
 from datetime import datetime
+from pathlib import Path
+
+try:
+    from ..log_config import get_logger
+    from ..telemetry import timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import timed
+
+from .append_tracker import AppendTracker
+from .table_profile import TableProfile
 
 
 class DataQualityAnalyzer:
@@ -13,19 +24,7 @@ class DataQualityAnalyzer:
     
     def __init__(self):
         """Initialize data quality analyzer"""
-        self.logger = self._setup_logger()
-    
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the analyzer"""
-        logger = logging.getLogger('DataQualityAnalyzer')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/data_quality.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
+        self.logger = get_logger('DataQualityAnalyzer')
     
     def analyze_completeness(self, df: pd.DataFrame) -> Dict:
         """Analyze data completeness
@@ -111,6 +110,18 @@ class DataQualityAnalyzer:
         completeness = self.analyze_completeness(df)
         duplicates = self.analyze_duplicates(df)
         
+        return self._score(completeness, duplicates)
+    
+    def _score(self, completeness: Dict, duplicates: Dict) -> float:
+        """Combine completeness and duplicate metrics into a quality score
+        
+        Args:
+            completeness: Output of analyze_completeness
+            duplicates: Output of analyze_duplicates
+            
+        Returns:
+            Quality score (0-100)
+        """
         # Weighted scoring
         completeness_score = completeness["overall_completeness_pct"] * 0.6
         uniqueness_score = (100 - duplicates["duplicate_pct"]) * 0.4
@@ -120,6 +131,7 @@ class DataQualityAnalyzer:
         self.logger.info(f"Calculated quality score: {quality_score:.2f}")
         return round(quality_score, 2)
     
+    @timed("quality.generate_report", rows=lambda report: report["record_count"])
     def generate_quality_report(self, df: pd.DataFrame, dataset_name: str) -> Dict:
         """Generate comprehensive quality report
         
@@ -146,33 +158,308 @@ class DataQualityAnalyzer:
         
         return report
     
+    @timed("quality.generate_query_report", rows=lambda report: report["record_count"])
+    def generate_query_report(self, engine, table: str, dataset_name: Optional[str] = None,
+                              subset: Optional[List[str]] = None) -> Dict:
+        """Generate an exact quality report by querying a table in the engine
+        
+        Counts, distinct values and duplicates are computed by the query
+        engine over the Parquet files, so the table is never loaded into
+        pandas.
+        
+        Args:
+            engine: QueryEngine with the table registered
+            table: Table name
+            dataset_name: Name of the dataset (table name if None)
+            subset: Columns that identify duplicate rows
+        
+        Returns:
+            Complete quality report
+        """
+        dataset_name = dataset_name or table
+        self.logger.info(f"Generating query report for: {dataset_name}")
+        
+        stats = engine.profile_table(table, subset=subset)
+        rows = stats["rows"]
+        columns = list(stats["types"])
+        
+        total_cells = rows * len(columns)
+        missing_cells = sum(col["null_count"] for col in stats["columns"].values())
+        completeness = {
+            "overall_completeness_pct": float(((total_cells - missing_cells) / total_cells) * 100) if total_cells else 0.0,
+            "total_cells": int(total_cells),
+            "missing_cells": int(missing_cells),
+            "column_completeness": {
+                col: {
+                    "missing_count": int(col_stats["null_count"]),
+                    "completeness_pct": float(((rows - col_stats["null_count"]) / rows) * 100) if rows else 0.0
+                }
+                for col, col_stats in stats["columns"].items()
+            }
+        }
+        
+        duplicate_count = rows - stats["distinct_rows"]
+        duplicates = {
+            "duplicate_count": int(duplicate_count),
+            "duplicate_pct": float((duplicate_count / rows) * 100) if rows else 0.0,
+            "unique_count": int(stats["distinct_rows"]),
+            "total_records": int(rows)
+        }
+        
+        data_types = {
+            col: {
+                "dtype": stats["types"][col],
+                "unique_values": int(stats["columns"][col]["unique_values"]),
+                "sample_values": stats["samples"][col]
+            }
+            for col in columns
+        }
+        
+        missing_pct = {
+            col: 100 - col_stats["completeness_pct"]
+            for col, col_stats in completeness["column_completeness"].items()
+        }
+        unique_counts = {col: col_stats["unique_values"] for col, col_stats in data_types.items()}
+        
+        return {
+            "dataset_name": dataset_name,
+            "timestamp": datetime.now().isoformat(),
+            "record_count": int(rows),
+            "column_count": len(columns),
+            "quality_score": self._score(completeness, duplicates),
+            "completeness": completeness,
+            "duplicates": duplicates,
+            "data_types": data_types,
+            "recommendations": self._build_recommendations(
+                rows, missing_pct, duplicates["duplicate_pct"], unique_counts
+            )
+        }
+    
+    @timed("quality.generate_approximate_report", rows=lambda report: report["record_count"])
+    def generate_approximate_report(self, chunks: Iterable[pd.DataFrame], dataset_name: str,
+                                    subset: Optional[List[str]] = None, **profile_options) -> Dict:
+        """Generate a quality report in one streaming pass over chunks
+        
+        Null and row counts are exact; distinct counts, frequent values,
+        sample values and duplicates are estimated with sketches. The error
+        bounds of each estimate are listed under "error_bounds".
+        
+        Args:
+            chunks: DataFrames to profile, e.g. TableLoader.iter_chunks()
+            dataset_name: Name of the dataset
+            subset: Columns to check for duplicates
+            **profile_options: Sketch parameters passed to TableProfile
+            
+        Returns:
+            Quality report with the same keys as generate_quality_report
+        """
+        self.logger.info(f"Generating approximate quality report for: {dataset_name}")
+        
+        profile = self.profile_chunks(chunks, subset, **profile_options)
+        return self.report_from_profile(profile, dataset_name)
+    
+    def profile_chunks(self, chunks: Iterable[pd.DataFrame], subset: Optional[List[str]] = None,
+                       **profile_options) -> TableProfile:
+        """Build a mergeable profile from chunks of a table
+        
+        Args:
+            chunks: DataFrames to profile
+            subset: Columns to check for duplicates
+            **profile_options: Sketch parameters passed to TableProfile
+            
+        Returns:
+            Table profile
+        """
+        profile = TableProfile(subset=subset, **profile_options)
+        for chunk in chunks:
+            profile.update(chunk)
+        return profile
+    
+    @timed("quality.generate_merged_report", rows=lambda report: report["record_count"])
+    def generate_merged_report(self, profiles: Iterable[Union[TableProfile, str]], dataset_name: str) -> Dict:
+        """Reduce partial profiles into one quality report
+        
+        Partial profiles can come from different chunks, files or workers,
+        as objects or as files written with TableProfile.save.
+        
+        Args:
+            profiles: Table profiles or paths to saved profiles
+            dataset_name: Name of the dataset
+            
+        Returns:
+            Quality report over all partial profiles
+        """
+        loaded = (TableProfile.load(p) if isinstance(p, (str, Path)) else p for p in profiles)
+        merged = TableProfile.combine(loaded)
+        
+        self.logger.info(f"Merged partial profiles for {dataset_name}: {merged.rows} records")
+        return self.report_from_profile(merged, dataset_name)
+    
+    @timed("quality.generate_incremental_report", rows=lambda report: report["incremental"]["new_records"],
+           bytes=lambda report: report["incremental"]["bytes_read"])
+    def generate_incremental_report(self, file_path: str, dataset_name: Optional[str] = None,
+                                    state_dir: str = "data/cache/profiles", chunksize: int = 100_000,
+                                    full_fingerprint: bool = False, force: bool = False,
+                                    final: Optional[bool] = None, **profile_options) -> Dict:
+        """Generate a quality report, profiling only rows appended since the last run
+        
+        The profile state of each dataset is persisted in state_dir together
+        with the byte offset reached and a fingerprint of the profiled
+        prefix. When the prefix is unchanged only the new rows are read;
+        when earlier rows were rewritten the file is profiled from scratch.
+        
+        Args:
+            file_path: Append-only CSV or TXT file
+            dataset_name: Name of the dataset (defaults to the file stem)
+            state_dir: Directory for persisted profile state
+            chunksize: Rows per chunk
+            full_fingerprint: Hash the whole prefix instead of sampled blocks;
+                catches any rewrite but costs a read of the whole file
+            force: Ignore stored state and re-profile the whole file
+            final: Whether writing has finished, so a last line without a
+                newline is profiled too (None: when the file has not been
+                modified for AppendTracker.SETTLE_SECONDS)
+            **profile_options: Sketch parameters passed to TableProfile
+                (only used when a new profile is started)
+        
+        Returns:
+            Quality report with an "incremental" section describing the update
+        """
+        path = Path(file_path)
+        dataset_name = dataset_name or path.stem
+        tracker = AppendTracker(state_dir)
+        
+        if path.suffix.lower() not in AppendTracker.APPENDABLE_FORMATS:
+            raise ValueError(f"Incremental profiling requires an append-only text file: {file_path}")
+        
+        _, profile_path = tracker.state_paths(dataset_name)
+        state = None if force else tracker.load_state(dataset_name)
+        
+        profile = None
+        appended = state is not None and tracker.is_append_of(state, file_path)
+        if appended:
+            try:
+                profile = TableProfile.load(str(profile_path))
+            except (ValueError, FileNotFoundError):
+                # Written by an older version or damaged: start over
+                self.logger.info(f"Stored profile of {dataset_name} unreadable, re-profiling from scratch")
+        
+        if profile is not None:
+            start = state["offset"]
+            columns = state["columns"]
+            mode = "incremental"
+        else:
+            if state is not None and not appended:
+                self.logger.info(f"Earlier rows of {dataset_name} changed, re-profiling from scratch")
+            profile = TableProfile(**profile_options)
+            start = 0
+            columns = AppendTracker.read_header(file_path)
+            mode = "full"
+        
+        previous_rows = profile.rows
+        if final is None:
+            final = tracker.is_settled(file_path)
+        end = tracker.complete_lines_end(file_path, start, final)
+        
+        for chunk in tracker.iter_rows(file_path, start, end, columns if start else None, chunksize):
+            profile.update(chunk)
+        
+        profile.save(str(profile_path))
+        tracker.save_state(dataset_name, file_path, end, columns, profile.rows, full_fingerprint)
+        
+        self.logger.info(
+            f"Profiled {profile.rows - previous_rows} new records of {dataset_name} ({mode}, {end - start} bytes)"
+        )
+        
+        report = self.report_from_profile(profile, dataset_name)
+        report["incremental"] = {
+            "mode": mode,
+            "new_records": profile.rows - previous_rows,
+            "bytes_read": end - start
+        }
+        return report
+    
+    def report_from_profile(self, profile: TableProfile, dataset_name: str) -> Dict:
+        """Build a quality report from a table profile
+        
+        Args:
+            profile: Populated table profile
+            dataset_name: Name of the dataset
+            
+        Returns:
+            Quality report
+        """
+        completeness = profile.completeness()
+        duplicates = profile.duplicates()
+        data_types = profile.data_types()
+        
+        missing_pct = {
+            col: 100 - stats["completeness_pct"]
+            for col, stats in completeness["column_completeness"].items()
+        }
+        unique_counts = {col: stats["unique_values"] for col, stats in data_types.items()}
+        
+        return {
+            "dataset_name": dataset_name,
+            "timestamp": datetime.now().isoformat(),
+            "record_count": profile.rows,
+            "column_count": len(profile.columns),
+            "quality_score": self._score(completeness, duplicates),
+            "completeness": completeness,
+            "duplicates": duplicates,
+            "data_types": data_types,
+            "recommendations": self._build_recommendations(
+                profile.rows, missing_pct, duplicates["duplicate_pct"], unique_counts
+            ),
+            "approximate": True,
+            "error_bounds": profile.error_bounds()
+        }
+    
     def _generate_recommendations(self, df: pd.DataFrame) -> List[str]:
         """Generate recommendations based on data quality issues
         
         Args:
             df: DataFrame to analyze
             
+        Returns:
+            List of recommendations
+        """
+        missing_pct = {col: (df[col].isnull().sum() / len(df)) * 100 for col in df.columns}
+        duplicate_pct = (df.duplicated().sum() / len(df)) * 100
+        unique_counts = {col: df[col].nunique() for col in df.columns}
+        
+        return self._build_recommendations(len(df), missing_pct, duplicate_pct, unique_counts)
+    
+    def _build_recommendations(self, record_count: int, missing_pct: Dict[str, float],
+                               duplicate_pct: float, unique_counts: Dict[str, int]) -> List[str]:
+        """Turn quality metrics into recommendations
+        
+        Args:
+            record_count: Number of records
+            missing_pct: Missing value percentage per column
+            duplicate_pct: Percentage of duplicate records
+            unique_counts: Distinct value count per column
+            
         Returns:
             List of recommendations
         """
         recommendations = []
         
         # Check for high missing values
-        for col in df.columns:
-            missing_pct = (df[col].isnull().sum() / len(df)) * 100
-            if missing_pct > 20:
-                recommendations.append(f"Column '{col}' has {missing_pct:.1f}% missing values - consider imputation or removal")
+        for col, pct in missing_pct.items():
+            if pct > 20:
+                recommendations.append(f"Column '{col}' has {pct:.1f}% missing values - consider imputation or removal")
         
         # Check for duplicates
-        duplicate_pct = (df.duplicated().sum() / len(df)) * 100
         if duplicate_pct > 5:
             recommendations.append(f"Dataset contains {duplicate_pct:.1f}% duplicates - consider deduplication")
         
         # Check for low cardinality
-        for col in df.columns:
-            unique_pct = (df[col].nunique() / len(df)) * 100
-            if unique_pct < 1 and len(df) > 100:
-                recommendations.append(f"Column '{col}' has very low cardinality - may not be useful for analysis")
+        if record_count > 100:
+            for col, unique_count in unique_counts.items():
+                unique_pct = (unique_count / record_count) * 100
+                if unique_pct < 1:
+                    recommendations.append(f"Column '{col}' has very low cardinality - may not be useful for analysis")
         
         return recommendations
 
@@ -0,0 +1,393 @@
+"""
+DIBIE - Data Validator
+Vectorized validation of tables against the cost data dictionary
+"""
+import importlib.util
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+from .sketches import hash_rows
+
+
+class DataValidator:
+    """Validate tables against the fields declared in a data dictionary
+    
+    The dictionary is compiled once into per-table specs: column types,
+    ``obligatorio`` flags, primary keys, ``validacion`` comparisons and
+    foreign keys. Every check runs as a column operation over a whole
+    DataFrame and yields one boolean mask per check, True where a row
+    violates it.
+    
+    Tables are the dictionary sections with a ``campos`` or
+    ``campos_requeridos`` mapping, named after their section key
+    (``matricula``, ``personal``, ``servicios_publicos``, ...).
+    """
+    
+    # Columns that must exist in a reference table: column -> (table, column)
+    FOREIGN_KEYS = {
+        "dane_institucion": ("maestro_instituciones", "dane_institucion")
+    }
+    
+    COMPARISONS = {
+        ">=": np.greater_equal,
+        "<=": np.less_equal,
+        ">": np.greater,
+        "<": np.less,
+        "==": np.equal,
+        "!=": np.not_equal
+    }
+    
+    _COMPARISON_RE = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?|\w+)\s*(?:\(.*\))?\s*$")
+    _RANGE_RE = re.compile(r"^\s*(\w+)\s+debe estar entre\s+(-?[\d.]+)%?\s+y\s+(-?[\d.]+)%?")
+    
+    def __init__(self, dictionary: Optional[Dict] = None,
+                 dictionary_path: str = "config/diccionario_costo_estudiante.py",
+                 reference_dir: str = "data/normalized"):
+        """Initialize data validator
+        
+        Args:
+            dictionary: Data dictionary (loaded from dictionary_path if None)
+            dictionary_path: Python module defining DICCIONARIO_COSTO_ESTUDIANTE,
+                or its JSON export
+            reference_dir: Directory with the reference tables for foreign keys
+        """
+        self.logger = get_logger('DataValidator')
+        self.reference_dir = Path(reference_dir)
+        self._reference_keys: Dict[str, pd.Index] = {}
+        
+        if dictionary is None:
+            dictionary = self.load_dictionary(dictionary_path)
+        self.tables = self.compile(dictionary)
+        self.business_rules = self._compile_rules(
+            dictionary.get("validacion", {}).get("reglas_negocio", [])
+        )
+    
+    @staticmethod
+    def load_dictionary(dictionary_path: str) -> Dict:
+        """Load a data dictionary from a Python module or JSON file
+        
+        Args:
+            dictionary_path: Path to the dictionary
+        
+        Returns:
+            Dictionary definition
+        """
+        path = Path(dictionary_path)
+        if path.suffix == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.DICCIONARIO_COSTO_ESTUDIANTE
+    
+    def compile(self, dictionary: Dict) -> Dict[str, Dict]:
+        """Compile dictionary sections into table specs
+        
+        Args:
+            dictionary: Data dictionary
+        
+        Returns:
+            Mapping of table name to spec with fields, primary_key, rules
+            and foreign_keys
+        """
+        tables = {}
+        
+        def walk(section: Dict):
+            for name, value in section.items():
+                if not isinstance(value, dict):
+                    continue
+                fields = value.get("campos", value.get("campos_requeridos"))
+                if isinstance(fields, dict):
+                    tables[name] = self._compile_table(fields)
+                walk(value)
+        
+        walk(dictionary)
+        return tables
+    
+    def _compile_table(self, fields: Dict) -> Dict:
+        """Compile the field definitions of one table"""
+        rules = self._compile_rules(
+            definition["validacion"] for definition in fields.values() if definition.get("validacion")
+        )
+        return {
+            "fields": {
+                col: {
+                    "tipo": definition.get("tipo", "string"),
+                    "obligatorio": bool(definition.get("obligatorio", False))
+                }
+                for col, definition in fields.items()
+            },
+            "primary_key": [col for col, definition in fields.items() if definition.get("llave_primaria")],
+            "rules": rules,
+            "foreign_keys": {col: ref for col, ref in self.FOREIGN_KEYS.items() if col in fields}
+        }
+    
+    def _compile_rules(self, expressions: Iterable[str]) -> List[Dict]:
+        """Parse rule expressions into column comparisons
+        
+        Supports ``col OP number``, ``col OP other_col`` and
+        ``col debe estar entre A y B``. Other expressions are skipped.
+        """
+        rules = []
+        for expression in expressions:
+            match = self._COMPARISON_RE.match(expression)
+            if match:
+                col, op, operand = match.groups()
+                rules.append({"expression": expression, "column": col, "op": op, "operand": operand})
+                continue
+            
+            match = self._RANGE_RE.match(expression)
+            if match:
+                col, low, high = match.groups()
+                rules.append({"expression": expression, "column": col, "between": (float(low), float(high))})
+                continue
+            
+            self.logger.debug(f"Skipping unsupported rule: {expression}")
+        return rules
+    
+    def validate(self, df: pd.DataFrame, table: str, check_primary_key: bool = True) -> Dict:
+        """Validate a DataFrame against a table spec
+        
+        Args:
+            df: Rows to validate
+            table: Table name in the compiled dictionary
+            check_primary_key: Flag repeated primary keys within df
+        
+        Returns:
+            Dictionary with the violation masks (one boolean column per check),
+            the invalid row mask, summary counts and missing columns
+        """
+        spec = self._get_spec(table)
+        masks = {}
+        
+        for col, field in spec["fields"].items():
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if field["obligatorio"]:
+                masks[f"obligatorio:{col}"] = self._missing(series)
+            masks[f"tipo:{col}"] = self._type_violations(series, field["tipo"])
+        
+        for rule in spec["rules"] + self.business_rules:
+            mask = self._rule_violations(df, rule)
+            if mask is not None:
+                masks[f"regla:{rule['expression']}"] = mask
+        
+        primary_key = spec["primary_key"]
+        if check_primary_key and primary_key and all(col in df.columns for col in primary_key):
+            keys = df[primary_key].apply(self._normalize_keys)
+            masks["llave_primaria"] = keys.duplicated(keep='first').to_numpy()
+        
+        for col, (ref_table, ref_col) in spec["foreign_keys"].items():
+            if col in df.columns:
+                known = self.reference_keys(ref_table, ref_col)
+                if known is not None:
+                    series = df[col]
+                    masks[f"llave_foranea:{col}"] = (
+                        series.notna() & ~self._normalize_keys(series).isin(known)
+                    ).to_numpy()
+        
+        violations = pd.DataFrame(masks, index=df.index, dtype=bool)
+        invalid = violations.any(axis=1) if masks else pd.Series(False, index=df.index)
+        
+        return {
+            "table": table,
+            "rows": len(df),
+            "invalid_rows": int(invalid.sum()),
+            "violations": violations,
+            "invalid": invalid,
+            "summary": {check: int(count) for check, count in violations.sum().items()},
+            "missing_columns": [
+                col for col, field in spec["fields"].items()
+                if field["obligatorio"] and col not in df.columns
+            ]
+        }
+    
+    def iter_validate(self, chunks: Iterable[pd.DataFrame], table: str) -> Iterator[Dict]:
+        """Validate a table read in chunks
+        
+        Primary key uniqueness is checked across chunks with a sorted array
+        of 64-bit key hashes, so a key is flagged in whichever chunk repeats it.
+        
+        Args:
+            chunks: DataFrames of rows
+            table: Table name in the compiled dictionary
+        
+        Yields:
+            Result of validate() for each chunk
+        """
+        primary_key = self._get_spec(table)["primary_key"]
+        seen = np.empty(0, dtype=np.uint64)
+        
+        for chunk in chunks:
+            result = self.validate(chunk, table, check_primary_key=False)
+            
+            if primary_key and all(col in chunk.columns for col in primary_key):
+                hashes = pd.Series(hash_rows(chunk[primary_key].apply(self._normalize_keys)))
+                repeated = hashes.duplicated().to_numpy().copy()
+                first_seen = hashes[~repeated].to_numpy()
+                
+                positions = np.searchsorted(seen, first_seen).clip(max=max(len(seen) - 1, 0))
+                seen_before = seen[positions] == first_seen if len(seen) else np.zeros(len(first_seen), dtype=bool)
+                repeated[~repeated] = seen_before
+                seen = np.sort(np.concatenate([seen, first_seen[~seen_before]]))
+                
+                result["violations"]["llave_primaria"] = repeated
+                result["invalid"] = result["invalid"] | repeated
+                result["invalid_rows"] = int(result["invalid"].sum())
+                result["summary"]["llave_primaria"] = int(repeated.sum())
+            
+            yield result
+    
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame], table: str) -> Dict:
+        """Validate a table read in chunks and total the violation counts
+        
+        Args:
+            chunks: DataFrames of rows
+            table: Table name in the compiled dictionary
+        
+        Returns:
+            Dictionary with rows, invalid_rows, summary and missing_columns
+        """
+        totals = {"table": table, "rows": 0, "invalid_rows": 0, "summary": {}, "missing_columns": []}
+        
+        for result in self.iter_validate(chunks, table):
+            totals["rows"] += result["rows"]
+            totals["invalid_rows"] += result["invalid_rows"]
+            for check, count in result["summary"].items():
+                totals["summary"][check] = totals["summary"].get(check, 0) + count
+            for col in result["missing_columns"]:
+                if col not in totals["missing_columns"]:
+                    totals["missing_columns"].append(col)
+        
+        self.logger.info(f"Validated {totals['rows']} rows of {table}: {totals['invalid_rows']} invalid")
+        return totals
+    
+    def reference_keys(self, table: str, column: str) -> Optional[pd.Index]:
+        """Normalized key values of a reference table
+        
+        Args:
+            table: Reference table name in reference_dir
+            column: Key column
+        
+        Returns:
+            Index of known keys, or None if the table is not available
+        """
+        cache_key = f"{table}.{column}"
+        if cache_key not in self._reference_keys:
+            # Prefer the columnar store dataset, then the legacy per-table files
+            store_path = self.reference_dir / "store" / table
+            parquet_path = self.reference_dir / f"{table}.parquet"
+            csv_path = self.reference_dir / f"{table}.csv"
+            try:
+                if store_path.is_dir():
+                    values = pd.read_parquet(store_path, columns=[column])[column]
+                elif parquet_path.exists():
+                    values = pd.read_parquet(parquet_path, columns=[column])[column]
+                elif csv_path.exists():
+                    values = pd.read_csv(csv_path, usecols=[column], dtype=str)[column]
+                else:
+                    self.logger.warning(f"Reference table not found: {table}")
+                    return None
+            except (ImportError, ValueError) as e:
+                if not csv_path.exists():
+                    self.logger.warning(f"Could not read reference table {table}: {e}")
+                    return None
+                values = pd.read_csv(csv_path, usecols=[column], dtype=str)[column]
+            
+            self.set_reference_keys(table, column, values)
+        return self._reference_keys[cache_key]
+    
+    def set_reference_keys(self, table: str, column: str, values: pd.Series):
+        """Provide the key values of a reference table directly
+        
+        Args:
+            table: Reference table name
+            column: Key column
+            values: Key values
+        """
+        self._reference_keys[f"{table}.{column}"] = pd.Index(self._normalize_keys(values.dropna()).unique())
+    
+    def _get_spec(self, table: str) -> Dict:
+        """Get a compiled table spec"""
+        if table not in self.tables:
+            raise ValueError(f"Unknown table: {table}. Available: {', '.join(self.tables)}")
+        return self.tables[table]
+    
+    @staticmethod
+    def _missing(series: pd.Series) -> np.ndarray:
+        """Null or blank values"""
+        missing = series.isna()
+        if series.dtype == object or pd.api.types.is_string_dtype(series):
+            missing |= series.astype(str).str.strip().eq('')
+        return missing.to_numpy()
+    
+    @staticmethod
+    def _type_violations(series: pd.Series, tipo: str) -> np.ndarray:
+        """Non-null values that do not parse as the declared type"""
+        if tipo not in ("integer", "decimal") or pd.api.types.is_integer_dtype(series):
+            return np.zeros(len(series), dtype=bool)
+        if pd.api.types.is_bool_dtype(series):
+            return series.notna().to_numpy()
+        
+        numeric = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors='coerce')
+        invalid = series.notna() & numeric.isna()
+        if tipo == "integer":
+            invalid |= numeric.notna() & (numeric % 1 != 0)
+        return invalid.to_numpy()
+    
+    def _rule_violations(self, df: pd.DataFrame, rule: Dict) -> Optional[np.ndarray]:
+        """Rows whose values break a rule, or None if its columns are absent
+        
+        Null values never break a rule; obligatorio checks report them.
+        """
+        if rule["column"] not in df.columns:
+            return None
+        values = pd.to_numeric(df[rule["column"]], errors='coerce')
+        
+        if "between" in rule:
+            low, high = rule["between"]
+            return (values.notna() & ~values.between(low, high)).to_numpy()
+        
+        operand = rule["operand"]
+        if re.fullmatch(r"-?\d+(?:\.\d+)?", operand):
+            other = float(operand)
+            present = values.notna()
+        elif operand in df.columns:
+            other = pd.to_numeric(df[operand], errors='coerce')
+            present = values.notna() & other.notna()
+        else:
+            return None
+        
+        return (present & ~self.COMPARISONS[rule["op"]](values, other)).to_numpy()
+    
+    @staticmethod
+    def _normalize_keys(series: pd.Series) -> pd.Series:
+        """Render key values as strings that compare equal across sources
+        
+        Codes read as floats (``311769001552.0``) and as text
+        (``"311769001552"``) normalize to the same value. Only the distinct
+        values are converted, then mapped back to the rows.
+        """
+        codes, uniques = pd.factorize(series)
+        uniques = pd.Series(uniques)
+        if pd.api.types.is_float_dtype(uniques) and (uniques % 1 == 0).all():
+            uniques = uniques.astype('int64')
+        labels = uniques.astype(str).str.strip().str.replace(r"\.0+$", "", regex=True)
+        
+        normalized = np.asarray(labels, dtype=object)[codes]
+        normalized[codes < 0] = None
+        return pd.Series(normalized, index=series.index, dtype=object)
@@ -4,23 +4,30 @@ Manage Microsoft Fabric EventStreams for real-time data processing
 """
 import json
 from typing import Dict, List, Optional
-import logging
 from datetime import datetime
 
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
 
 class EventStreamManager:
     """Manage EventStreams for real-time data ingestion and processing"""
     
-    def __init__(self, workspace_id: str = "", config_path: str = "config/analysis.json"):
+    def __init__(self, workspace_id: str = "", config_path: str = "config/analysis.json",
+                 config: Optional[Dict] = None):
         """Initialize EventStream manager
         
         Args:
             workspace_id: Microsoft Fabric workspace ID
             config_path: Path to analysis configuration
+            config: Parsed configuration (read from config_path if None)
         """
         self.workspace_id = workspace_id
-        self.config = self._load_config(config_path)
-        self.logger = self._setup_logger()
+        self.config = config if config is not None else self._load_config(config_path)
+        self.logger = get_logger('EventStreamManager')
         
         # Load from config if not provided
         if not self.workspace_id:
@@ -36,18 +43,6 @@ class EventStreamManager:
         except FileNotFoundError:
             return {}
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the manager"""
-        logger = logging.Logger('EventStreamManager')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/eventstream_manager.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
     def create_eventstream_definition(self, name: str, description: str = "") -> Dict:
         """Create EventStream definition
         
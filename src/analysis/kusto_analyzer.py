@@ -4,25 +4,32 @@ Analyze data using Microsoft Fabric Kusto (KQL)
 """
 import json
 from typing import Dict, List, Optional, Any
-import logging
 from datetime import datetime
 
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
 
 class KustoAnalyzer:
     """Analyze data using Kusto Query Language (KQL)"""
     
-    def __init__(self, cluster_uri: str = "", database: str = "", config_path: str = "config/analysis.json"):
+    def __init__(self, cluster_uri: str = "", database: str = "", config_path: str = "config/analysis.json",
+                 config: Optional[Dict] = None):
         """Initialize Kusto analyzer
         
         Args:
             cluster_uri: Kusto cluster URI
             database: Database name
             config_path: Path to analysis configuration
+            config: Parsed configuration (read from config_path if None)
         """
         self.cluster_uri = cluster_uri
         self.database = database
-        self.config = self._load_config(config_path)
-        self.logger = self._setup_logger()
+        self.config = config if config is not None else self._load_config(config_path)
+        self.logger = get_logger('KustoAnalyzer')
         
         # Load from config if not provided
         if not self.cluster_uri:
@@ -38,18 +45,6 @@ class KustoAnalyzer:
         except FileNotFoundError:
             return {}
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the analyzer"""
-        logger = logging.getLogger('KustoAnalyzer')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/kusto_analyzer.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
     def create_analysis_query(self, table_name: str, analysis_type: str) -> str:
         """Create KQL query for different analysis types
         
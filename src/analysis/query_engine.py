@@ -0,0 +1,247 @@
+"""
+DIBIE - Query Engine
+Embedded analytical SQL over the normalized Parquet tables (DuckDB)
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+
+class QueryEngine:
+    """In-process columnar SQL engine over data/normalized
+    
+    Every table of the columnar store (``data/normalized/store/<table>``)
+    and every legacy ``<table>.parquet`` file is registered as a view, so
+    queries read the Parquet files directly: DuckDB only decodes the
+    referenced columns, pushes filters into the scans and runs joins and
+    aggregations vectorized across all threads.
+    
+    DuckDB is an optional dependency; it is imported on first use.
+    """
+    
+    def __init__(self, data_dir: str = "data/normalized", database: str = ":memory:",
+                 threads: Optional[int] = None, memory_limit: Optional[str] = None):
+        """Initialize query engine
+        
+        Args:
+            data_dir: Directory with the normalized tables
+            database: DuckDB database file, or ":memory:"
+            threads: Worker threads (all cores if None)
+            memory_limit: DuckDB memory limit such as "4GB"
+        """
+        self.data_dir = Path(data_dir)
+        self.database = database
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.logger = get_logger('QueryEngine')
+        self._conn = None
+        self._tables: Dict[str, str] = {}
+    
+    @property
+    def conn(self):
+        """DuckDB connection, opened on first use"""
+        return self.connect()
+    
+    def connect(self):
+        """Open the DuckDB connection and register the tables
+        
+        Does nothing if the connection is already open.
+        
+        Returns:
+            DuckDB connection
+        """
+        if self._conn is None:
+            try:
+                import duckdb
+            except ImportError:
+                raise ImportError("duckdb is required for QueryEngine: pip install duckdb")
+            
+            self._conn = duckdb.connect(self.database)
+            if self.threads:
+                self._conn.execute(f"SET threads TO {int(self.threads)}")
+            if self.memory_limit:
+                self._conn.execute(f"SET memory_limit = {self._literal(self.memory_limit)}")
+            self.register_tables()
+        return self._conn
+    
+    def register_tables(self) -> List[str]:
+        """Register the normalized tables as views
+        
+        Store datasets take precedence over legacy Parquet files with the
+        same name.
+        
+        Returns:
+            Names of the registered tables
+        """
+        sources = {}
+        for path in sorted(self.data_dir.glob("*.parquet")):
+            sources[path.stem] = f"read_parquet({self._literal(path.as_posix())})"
+        
+        store_dir = self.data_dir / "store"
+        if store_dir.is_dir():
+            for table_dir in sorted(p for p in store_dir.iterdir() if p.is_dir()):
+                pattern = (table_dir / "**" / "*.parquet").as_posix()
+                sources[table_dir.name] = (
+                    f"read_parquet({self._literal(pattern)}, hive_partitioning = true, union_by_name = true)"
+                )
+        
+        for name, source in sources.items():
+            self.register_view(name, source)
+        
+        self.logger.info(f"Registered {len(sources)} tables from {self.data_dir}")
+        return list(sources)
+    
+    def register_view(self, name: str, source: str):
+        """Register a view over a DuckDB table function or query
+        
+        Args:
+            name: View name
+            source: SQL relation, e.g. read_parquet('file.parquet')
+        """
+        self._tables[name] = source
+        self.conn.execute(f"CREATE OR REPLACE VIEW {self.quote(name)} AS SELECT * FROM {source}")
+    
+    def register_dataframe(self, name: str, df):
+        """Expose a pandas DataFrame as a table
+        
+        Args:
+            name: Table name
+            df: DataFrame (scanned in place, not copied)
+        """
+        self.conn.register(name, df)
+        self._tables[name] = "dataframe"
+    
+    def tables(self) -> List[str]:
+        """Names of the registered tables"""
+        self.connect()
+        return sorted(self._tables)
+    
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None):
+        """Run a query and return the result as a DataFrame
+        
+        Args:
+            sql: SQL statement
+            params: Values for ? placeholders
+        
+        Returns:
+            pandas DataFrame
+        """
+        return self.conn.execute(sql, params or []).df()
+    
+    def query_records(self, sql: str, params: Optional[Sequence[Any]] = None) -> List[Dict]:
+        """Run a query and return the rows as dictionaries
+        
+        Args:
+            sql: SQL statement
+            params: Values for ? placeholders
+        
+        Returns:
+            List of row dictionaries
+        """
+        cursor = self.conn.execute(sql, params or [])
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def columns(self, table: str) -> Dict[str, str]:
+        """Column names and SQL types of a table"""
+        rows = self.conn.execute(f"DESCRIBE {self.quote(table)}").fetchall()
+        return {row[0]: row[1] for row in rows}
+    
+    def profile_table(self, table: str, subset: Optional[List[str]] = None,
+                      sample_size: int = 5) -> Dict:
+        """Exact quality statistics of a table computed inside the engine
+        
+        Args:
+            table: Table name
+            subset: Columns that identify duplicate rows (all columns if None)
+            sample_size: Sample values returned per column
+        
+        Returns:
+            Dictionary with rows, per-column null/distinct counts, types,
+            sample values and the number of distinct rows
+        """
+        columns = self.columns(table)
+        quoted = {col: self.quote(col) for col in columns}
+        relation = self.quote(table)
+        
+        aggregates = ["count(*)"]
+        for col in columns:
+            aggregates.append(f"count({quoted[col]})")
+            aggregates.append(f"count(DISTINCT {quoted[col]})")
+        row = self.conn.execute(f"SELECT {', '.join(aggregates)} FROM {relation}").fetchone()
+        
+        rows = row[0]
+        stats = {}
+        for i, col in enumerate(columns):
+            non_null, distinct = row[1 + 2 * i], row[2 + 2 * i]
+            stats[col] = {"null_count": rows - non_null, "unique_values": distinct}
+        
+        key_columns = ", ".join(quoted[col] for col in (subset or columns))
+        distinct_rows = self.conn.execute(
+            f"SELECT count(*) FROM (SELECT DISTINCT {key_columns} FROM {relation})"
+        ).fetchone()[0]
+        
+        samples = {}
+        for col in columns:
+            values = self.conn.execute(
+                f"SELECT {quoted[col]} FROM {relation} WHERE {quoted[col]} IS NOT NULL LIMIT {int(sample_size)}"
+            ).fetchall()
+            samples[col] = [value[0] for value in values]
+        
+        return {
+            "rows": rows,
+            "types": columns,
+            "columns": stats,
+            "samples": samples,
+            "distinct_rows": distinct_rows
+        }
+    
+    def export_database(self, path: str = "data/database/dibie_analytics.duckdb",
+                        tables: Optional[List[str]] = None) -> str:
+        """Materialize tables into a DuckDB file for external clients
+        
+        The file can be added to Superset (with the duckdb-engine driver)
+        through the SQLAlchemy URI returned here.
+        
+        Args:
+            path: Output database file
+            tables: Tables to copy (all registered tables if None)
+        
+        Returns:
+            SQLAlchemy URI of the database
+        """
+        output = Path(path).resolve()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self.conn.execute(f"ATTACH {self._literal(output.as_posix())} AS analytics_export")
+        try:
+            for name in tables or self.tables():
+                self.conn.execute(
+                    f"CREATE OR REPLACE TABLE analytics_export.{self.quote(name)} AS SELECT * FROM {self.quote(name)}"
+                )
+        finally:
+            self.conn.execute("DETACH analytics_export")
+        
+        self.logger.info(f"Exported {len(tables or self._tables)} tables to {output}")
+        return f"duckdb:///{output.as_posix()}"
+    
+    def close(self):
+        """Close the DuckDB connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._tables = {}
+    
+    @staticmethod
+    def quote(identifier: str) -> str:
+        """Quote an identifier (column names may contain spaces and symbols)"""
+        return '"' + str(identifier).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _literal(value: str) -> str:
+        """Quote a string literal"""
+        return "'" + str(value).replace("'", "''") + "'"
@@ -0,0 +1,393 @@
+"""
+DIBIE - Streaming Sketches
+Probabilistic summaries for approximate profiling of large tables
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def hash_series(series: pd.Series) -> np.ndarray:
+    """Hash the values of a Series to 64-bit integers
+    
+    Numeric columns are hashed as float64 so that the same value hashes
+    identically in chunks where pandas inferred int64 and in chunks where
+    missing values forced float64.
+    
+    Args:
+        series: Values to hash
+    
+    Returns:
+        Array of uint64 hashes
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        series = series.astype('float64')
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """Hash every row of a DataFrame to a 64-bit integer
+    
+    Args:
+        df: Rows to hash
+    
+    Returns:
+        Array of uint64 hashes, one per row
+    """
+    hashes = np.full(len(df), 0x345678, dtype=np.uint64)
+    for col in df.columns:
+        hashes = (hashes ^ hash_series(df[col])) * np.uint64(1000003)
+    return hashes
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for uint64 arrays"""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    length += (values > 0).astype(np.uint8)
+    return length
+
+
+class HyperLogLog:
+    """Distinct count estimator
+    
+    With ``2**precision`` registers the relative standard error is
+    ``1.04 / sqrt(2**precision)``, about 0.8% at the default precision of 14
+    (16 KB of state).
+    """
+    
+    def __init__(self, precision: int = 14):
+        """Initialize HyperLogLog
+        
+        Args:
+            precision: Number of index bits (4-18)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Precision must be between 4 and 18: {precision}")
+        
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate"""
+        return 1.04 / math.sqrt(len(self.registers))
+    
+    def add_hashes(self, hashes: np.ndarray):
+        """Add pre-hashed values
+        
+        Args:
+            hashes: Array of uint64 hashes
+        """
+        if len(hashes) == 0:
+            return
+        
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        remainder = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        # Rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (65 - self.precision) - _bit_length(remainder)
+        np.maximum.at(self.registers, index, rank)
+    
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Merge another HyperLogLog into this one (register-wise max)
+        
+        Args:
+            other: Sketch with the same precision
+            
+        Returns:
+            This sketch
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog of precision {other.precision} into {self.precision}")
+        
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def count(self) -> int:
+        """Estimate the number of distinct values
+        
+        Returns:
+            Estimated distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        
+        return int(round(estimate))
+
+
+class CountMinSketch:
+    """Frequency estimator with a bounded candidate list of heavy hitters
+    
+    Estimates never undercount. With ``width = ceil(e / epsilon)`` and
+    ``depth = ceil(ln(1 / delta))`` the overestimate is at most
+    ``epsilon * N`` with probability ``1 - delta``, where N is the number of
+    values added. The defaults give epsilon = 0.001 and delta = 0.7%.
+    """
+    
+    def __init__(self, width: int = 2719, depth: int = 5, top_k: int = 10):
+        """Initialize count-min sketch
+        
+        Args:
+            width: Counters per row
+            depth: Number of hash rows
+            top_k: Number of frequent values to track
+        """
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.candidates: Dict[Any, int] = {}
+    
+    @property
+    def epsilon(self) -> float:
+        """Maximum overestimate as a fraction of the total count"""
+        return math.e / self.width
+    
+    @property
+    def delta(self) -> float:
+        """Probability that an estimate exceeds the epsilon bound"""
+        return math.exp(-self.depth)
+    
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Counter positions for each row, by double hashing"""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+    
+    def add_series(self, series: pd.Series):
+        """Add the non-null values of a Series
+        
+        Args:
+            series: Values to count
+        """
+        counts = series.dropna().value_counts(sort=False)
+        if counts.empty:
+            return
+        
+        hashes = hash_series(pd.Series(counts.index))
+        values = counts.to_numpy(dtype=np.int64)
+        positions = self._positions(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], positions[row], values)
+        self.total += int(values.sum())
+        
+        # Keep the chunk's most frequent values as heavy-hitter candidates
+        pool = max(self.top_k * 4, 1)
+        chunk_top = counts.nlargest(pool)
+        for value in chunk_top.index.tolist():
+            self.candidates[value] = 0
+        self._refresh_candidates(pool)
+    
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """Merge another count-min sketch into this one (counter-wise sum)
+        
+        Args:
+            other: Sketch with the same width and depth
+            
+        Returns:
+            This sketch
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different dimensions")
+        
+        self.table += other.table
+        self.total += other.total
+        for value in other.candidates:
+            self.candidates.setdefault(value, 0)
+        self._refresh_candidates(max(self.top_k * 4, 1))
+        return self
+    
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        """Estimate counts for pre-hashed values
+        
+        Args:
+            hashes: Array of uint64 hashes
+        
+        Returns:
+            Estimated counts
+        """
+        positions = self._positions(hashes)
+        return self.table[np.arange(self.depth)[:, None], positions].min(axis=0)
+    
+    def _refresh_candidates(self, pool: int):
+        """Re-estimate candidates and keep the largest ``pool`` of them"""
+        if not self.candidates:
+            return
+        
+        values = list(self.candidates.keys())
+        estimates = self.estimate(hash_series(pd.Series(values, dtype=object).infer_objects()))
+        ranked = sorted(zip(values, estimates.tolist()), key=lambda item: -item[1])[:pool]
+        self.candidates = dict(ranked)
+    
+    def top_values(self, k: Optional[int] = None) -> List[Dict]:
+        """Most frequent values
+        
+        Args:
+            k: Number of values (defaults to top_k)
+        
+        Returns:
+            List of value/estimated count pairs, most frequent first
+        """
+        k = k or self.top_k
+        ranked = sorted(self.candidates.items(), key=lambda item: -item[1])[:k]
+        return [{"value": value, "count": int(count)} for value, count in ranked]
+
+
+class ReservoirSample:
+    """Uniform random sample of fixed size over a stream (Algorithm R)"""
+    
+    def __init__(self, size: int = 5, seed: Optional[int] = None):
+        """Initialize reservoir
+        
+        Args:
+            size: Number of values to keep
+            seed: Random seed
+        """
+        self.size = size
+        self.values: List[Any] = []
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+    
+    def add_series(self, series: pd.Series):
+        """Offer the non-null values of a Series to the reservoir
+        
+        Args:
+            series: Values to sample from
+        """
+        values = series.dropna().tolist()
+        if not values:
+            return
+        
+        fill = min(self.size - len(self.values), len(values))
+        if fill > 0:
+            self.values.extend(values[:fill])
+        
+        rest = len(values) - fill
+        if rest > 0:
+            # Item t (0-based, global) replaces slot j ~ U[0, t] when j < size
+            positions = np.arange(self.seen + fill, self.seen + len(values))
+            slots = self.rng.integers(0, positions + 1)
+            for offset in np.flatnonzero(slots < self.size):
+                self.values[slots[offset]] = values[fill + offset]
+        
+        self.seen += len(values)
+    
+    def merge(self, other: 'ReservoirSample') -> 'ReservoirSample':
+        """Merge another reservoir into this one
+        
+        The merged reservoir is a uniform sample of both streams: the number
+        of values taken from each side is drawn from a hypergeometric
+        distribution weighted by how many values each side has seen.
+        
+        Args:
+            other: Reservoir over a disjoint part of the stream
+            
+        Returns:
+            This reservoir
+        """
+        if other.seen == 0:
+            return self
+        
+        total = self.seen + other.seen
+        size = min(self.size, total)
+        from_self = int(self.rng.hypergeometric(self.seen, other.seen, size)) if self.seen else 0
+        from_self = min(from_self, len(self.values))
+        from_other = min(size - from_self, len(other.values))
+        
+        keep = self.rng.choice(len(self.values), from_self, replace=False) if from_self else []
+        take = self.rng.choice(len(other.values), from_other, replace=False) if from_other else []
+        self.values = [self.values[i] for i in keep] + [other.values[i] for i in take]
+        self.seen = total
+        return self
+
+
+class BloomFilter:
+    """Probabilistic set membership
+    
+    Sized for ``capacity`` items at false positive rate ``error_rate``. While
+    fewer than ``capacity`` items have been added, a membership test answers
+    "present" for an absent item with probability at most ``error_rate``.
+    """
+    
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.01):
+        """Initialize Bloom filter
+        
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false positive rate
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+    
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Bit positions for each hash, by double hashing"""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.num_hashes, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rounds * h2[None, :]) % np.uint64(self.num_bits)).astype(np.int64)
+    
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Test membership of pre-hashed items
+        
+        Args:
+            hashes: Array of uint64 hashes
+        
+        Returns:
+            Boolean array, True where the item is probably present
+        """
+        positions = self._positions(hashes)
+        bits = (self.bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return bits.all(axis=0)
+    
+    def merge(self, other: 'BloomFilter') -> 'BloomFilter':
+        """Merge another Bloom filter into this one (bitwise OR)
+        
+        Args:
+            other: Filter with the same number of bits and hash functions
+            
+        Returns:
+            This filter
+        """
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("Cannot merge Bloom filters of different sizes")
+        
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        return self
+    
+    def estimated_count(self) -> float:
+        """Estimate the number of distinct items added from the fill ratio
+        
+        Returns:
+            Estimated item count
+        """
+        set_bits = int(np.unpackbits(self.bits)[:self.num_bits].sum())
+        if set_bits >= self.num_bits:
+            return float('inf')
+        return -self.num_bits / self.num_hashes * math.log(1 - set_bits / self.num_bits)
+    
+    def add(self, hashes: np.ndarray):
+        """Add pre-hashed items
+        
+        Args:
+            hashes: Array of uint64 hashes
+        """
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
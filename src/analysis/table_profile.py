@@ -0,0 +1,415 @@
+"""
+DIBIE - Table Profile
+Single-pass approximate profile of a table read in chunks
+"""
+import json
+import math
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .sketches import BloomFilter, CountMinSketch, HyperLogLog, ReservoirSample, hash_rows, hash_series
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON form of a column name or sampled value that keeps its type"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else {"float": repr(value)}
+    if isinstance(value, (datetime, date)):
+        return {"timestamp": value.isoformat()}
+    return {"text": str(value)}
+
+
+def _decode_value(value: Any) -> Any:
+    """Inverse of _encode_value"""
+    if not isinstance(value, dict):
+        return value
+    if "float" in value:
+        return float(value["float"])
+    if "timestamp" in value:
+        return pd.Timestamp(value["timestamp"])
+    return value["text"]
+
+
+class TableProfile:
+    """Streaming profile state for approximate quality reports
+    
+    Row and null counts are exact. Distinct counts use HyperLogLog, frequent
+    values use a count-min sketch, sample values come from a reservoir and
+    duplicate rows are detected with a Bloom filter over row hashes, or with
+    an exact set of row hashes when ``exact_duplicates`` is enabled.
+    
+    Profiles of disjoint parts of a table (chunks, files, workers) can be
+    combined with ``merge``. Merging is associative, so partial profiles
+    can be reduced in any grouping.
+    """
+    
+    # Layout of the files written by save()
+    FORMAT_VERSION = 1
+    
+    def __init__(self, subset: Optional[List[str]] = None, top_k: int = 10, sample_size: int = 5,
+                 hll_precision: int = 14, bloom_capacity: int = 10_000_000,
+                 bloom_error_rate: float = 0.01, exact_duplicates: bool = False,
+                 seed: Optional[int] = None):
+        """Initialize table profile
+        
+        Args:
+            subset: Columns that identify duplicate rows (all columns if None)
+            top_k: Number of frequent values reported per column
+            sample_size: Number of sample values kept per column
+            hll_precision: HyperLogLog precision (relative error 1.04 / sqrt(2**p))
+            bloom_capacity: Expected number of distinct rows
+            bloom_error_rate: Bloom filter false positive rate at capacity
+            exact_duplicates: Keep a set of 64-bit row hashes instead of a
+                Bloom filter (8 bytes per distinct row, exact merges)
+            seed: Random seed for the reservoirs
+        """
+        self.subset = subset
+        self.top_k = top_k
+        self.sample_size = sample_size
+        self.hll_precision = hll_precision
+        self.seed = seed
+        
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.frequent: Dict[str, CountMinSketch] = {}
+        self.samples: Dict[str, ReservoirSample] = {}
+        
+        self.duplicate_count = 0
+        self.row_filter: Optional[BloomFilter] = None
+        self.row_hashes: Optional[np.ndarray] = None
+        if exact_duplicates:
+            self.row_hashes = np.empty(0, dtype=np.uint64)
+        else:
+            self.row_filter = BloomFilter(bloom_capacity, bloom_error_rate)
+    
+    def _add_column(self, col: str):
+        """Create the sketches for a newly seen column"""
+        self.columns.append(col)
+        # Rows read before the column appeared count as missing
+        self.null_counts[col] = self.rows
+        self.distinct[col] = HyperLogLog(self.hll_precision)
+        self.frequent[col] = CountMinSketch(top_k=self.top_k)
+        self.samples[col] = ReservoirSample(self.sample_size, self.seed)
+    
+    def update(self, chunk: pd.DataFrame):
+        """Add a chunk of rows to the profile
+        
+        Args:
+            chunk: Rows to profile
+        """
+        if chunk.empty:
+            return
+        
+        for col in chunk.columns:
+            if col not in self.null_counts:
+                self._add_column(col)
+        
+        for col in self.columns:
+            if col not in chunk.columns:
+                self.null_counts[col] += len(chunk)
+                continue
+            
+            series = chunk[col]
+            self.dtypes[col] = str(series.dtype)
+            self.null_counts[col] += int(series.isnull().sum())
+            
+            non_null = series.dropna()
+            self.distinct[col].add_hashes(hash_series(non_null))
+            self.frequent[col].add_series(non_null)
+            self.samples[col].add_series(non_null)
+        
+        self._update_duplicates(chunk)
+        self.rows += len(chunk)
+    
+    def _update_duplicates(self, chunk: pd.DataFrame):
+        """Count rows already seen earlier in the stream"""
+        keys = chunk[self.subset] if self.subset else chunk
+        hashes = pd.Series(hash_rows(keys))
+        
+        # Exact within the chunk, hash set or Bloom filter against earlier chunks
+        in_chunk = hashes.duplicated().to_numpy()
+        first_seen = hashes[~in_chunk].to_numpy()
+        
+        if self.row_hashes is not None:
+            seen_before = self._contains_hashes(self.row_hashes, first_seen)
+            self.row_hashes = self._union_hashes(self.row_hashes, first_seen[~seen_before])
+        else:
+            seen_before = self.row_filter.contains(first_seen)
+            self.row_filter.add(first_seen[~seen_before])
+        
+        self.duplicate_count += int(in_chunk.sum()) + int(seen_before.sum())
+    
+    @staticmethod
+    def _contains_hashes(known: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """Membership of hashes in a sorted array of known hashes"""
+        if len(known) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(known, hashes).clip(max=len(known) - 1)
+        return known[positions] == hashes
+    
+    @staticmethod
+    def _union_hashes(known: np.ndarray, new: np.ndarray) -> np.ndarray:
+        """Sorted union of a sorted hash array and hashes not in it"""
+        # Timsort merges the two sorted runs in linear time
+        return np.sort(np.concatenate([known, np.sort(new)]), kind='stable')
+    
+    def merge(self, other: 'TableProfile') -> 'TableProfile':
+        """Merge the profile of a disjoint part of the table into this one
+        
+        Null counts and sketches are combined exactly. Duplicates across the
+        two parts are counted exactly from the hash sets, or estimated from
+        the fill ratio of the merged Bloom filter.
+        
+        Args:
+            other: Profile built with the same sketch parameters
+        
+        Returns:
+            This profile
+        """
+        if (self.row_hashes is None) != (other.row_hashes is None):
+            raise ValueError("Cannot merge exact and approximate duplicate tracking")
+        if self.subset != other.subset:
+            raise ValueError("Cannot merge profiles with different duplicate subsets")
+        
+        for col in other.columns:
+            if col not in self.null_counts:
+                self._add_column(col)
+        
+        for col in self.columns:
+            if col not in other.null_counts:
+                self.null_counts[col] += other.rows
+                continue
+            
+            self.null_counts[col] += other.null_counts[col]
+            self.dtypes.setdefault(col, other.dtypes.get(col, "object"))
+            self.distinct[col].merge(other.distinct[col])
+            self.frequent[col].merge(other.frequent[col])
+            self.samples[col].merge(other.samples[col])
+        
+        self.duplicate_count += other.duplicate_count + self._overlap(other)
+        self.rows += other.rows
+        return self
+    
+    def _overlap(self, other: 'TableProfile') -> int:
+        """Count distinct rows present in both profiles and merge the row sets"""
+        if self.row_hashes is not None:
+            shared = self._contains_hashes(self.row_hashes, other.row_hashes)
+            self.row_hashes = self._union_hashes(self.row_hashes, other.row_hashes[~shared])
+            return int(shared.sum())
+        
+        distinct_self = self.rows - self.duplicate_count
+        distinct_other = other.rows - other.duplicate_count
+        self.row_filter.merge(other.row_filter)
+        
+        overlap = distinct_self + distinct_other - self.row_filter.estimated_count()
+        return int(round(min(max(overlap, 0), distinct_self, distinct_other)))
+    
+    @classmethod
+    def combine(cls, profiles: Iterable['TableProfile']) -> 'TableProfile':
+        """Reduce partial profiles into one
+        
+        The first profile is updated in place and returned.
+        
+        Args:
+            profiles: Profiles of disjoint parts of a table
+        
+        Returns:
+            Merged profile
+        """
+        merged = None
+        for profile in profiles:
+            merged = profile if merged is None else merged.merge(profile)
+        if merged is None:
+            raise ValueError("No profiles to combine")
+        return merged
+    
+    def save(self, path: str) -> str:
+        """Persist the profile state
+        
+        The file is a NumPy .npz archive holding the sketch arrays and a JSON
+        document with the counts, parameters and sampled values. Nothing is
+        pickled, so loading a profile from a shared directory cannot run
+        code.
+        
+        Args:
+            path: Output file path
+        
+        Returns:
+            Path to saved file
+        """
+        meta = {
+            "version": self.FORMAT_VERSION,
+            "subset": self.subset,
+            "top_k": self.top_k,
+            "sample_size": self.sample_size,
+            "hll_precision": self.hll_precision,
+            "seed": self.seed,
+            "rows": self.rows,
+            "columns": [_encode_value(col) for col in self.columns],
+            "dtypes": [self.dtypes.get(col) for col in self.columns],
+            "null_counts": [int(self.null_counts[col]) for col in self.columns],
+            "frequent": [
+                {"total": int(self.frequent[col].total),
+                 "candidates": [[_encode_value(value), int(count)]
+                                for value, count in self.frequent[col].candidates.items()]}
+                for col in self.columns
+            ],
+            "samples": [
+                {"size": self.samples[col].size, "seen": self.samples[col].seen,
+                 "values": [_encode_value(value) for value in self.samples[col].values],
+                 "rng": self.samples[col].rng.bit_generator.state}
+                for col in self.columns
+            ],
+            "duplicate_count": self.duplicate_count,
+            "bloom": None if self.row_filter is None else {
+                "capacity": self.row_filter.capacity, "error_rate": self.row_filter.error_rate
+            },
+        }
+        arrays = {"meta": np.array(json.dumps(meta))}
+        for i, col in enumerate(self.columns):
+            arrays[f"hll_{i}"] = self.distinct[col].registers
+            arrays[f"cms_{i}"] = self.frequent[col].table
+        if self.row_hashes is not None:
+            arrays["row_hashes"] = self.row_hashes
+        else:
+            arrays["bloom_bits"] = self.row_filter.bits
+        
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # A file object keeps numpy from appending .npz to the name
+        with open(output_path, 'wb') as f:
+            np.savez(f, **arrays)
+        return str(output_path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'TableProfile':
+        """Load a profile saved with save()
+        
+        Args:
+            path: Path to the profile file
+        
+        Returns:
+            Table profile
+        
+        Raises:
+            ValueError: If the file is not a saved profile (including
+                profiles pickled by earlier versions)
+        """
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+            meta = json.loads(str(arrays["meta"]))
+        except (ValueError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Not a saved table profile: {path}") from e
+        if meta.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported table profile version in {path}: {meta.get('version')}")
+        
+        bloom = meta["bloom"]
+        profile = cls(subset=meta["subset"], top_k=meta["top_k"], sample_size=meta["sample_size"],
+                      hll_precision=meta["hll_precision"], exact_duplicates=bloom is None, seed=meta["seed"],
+                      **({"bloom_capacity": bloom["capacity"], "bloom_error_rate": bloom["error_rate"]}
+                         if bloom else {}))
+        
+        for i, col in enumerate(_decode_value(col) for col in meta["columns"]):
+            profile._add_column(col)
+            if meta["dtypes"][i] is not None:
+                profile.dtypes[col] = meta["dtypes"][i]
+            profile.null_counts[col] = meta["null_counts"][i]
+            profile.distinct[col].registers = arrays[f"hll_{i}"]
+            
+            frequent = profile.frequent[col]
+            frequent.table = arrays[f"cms_{i}"]
+            frequent.depth, frequent.width = frequent.table.shape
+            frequent.total = meta["frequent"][i]["total"]
+            frequent.candidates = {_decode_value(value): count for value, count in meta["frequent"][i]["candidates"]}
+            
+            sample = profile.samples[col]
+            sample.size = meta["samples"][i]["size"]
+            sample.seen = meta["samples"][i]["seen"]
+            sample.values = [_decode_value(value) for value in meta["samples"][i]["values"]]
+            sample.rng.bit_generator.state = meta["samples"][i]["rng"]
+        
+        profile.rows = meta["rows"]
+        profile.duplicate_count = meta["duplicate_count"]
+        if bloom is None:
+            profile.row_hashes = arrays["row_hashes"]
+        else:
+            profile.row_filter.bits = arrays["bloom_bits"]
+        return profile
+    
+    def completeness(self) -> Dict:
+        """Completeness metrics in the format of DataQualityAnalyzer.analyze_completeness"""
+        total_cells = self.rows * len(self.columns)
+        missing_cells = sum(self.null_counts.values())
+        
+        column_completeness = {}
+        for col in self.columns:
+            missing = self.null_counts[col]
+            column_completeness[col] = {
+                "missing_count": int(missing),
+                "completeness_pct": float(((self.rows - missing) / self.rows) * 100) if self.rows else 0.0
+            }
+        
+        return {
+            "overall_completeness_pct": float(((total_cells - missing_cells) / total_cells) * 100) if total_cells else 0.0,
+            "total_cells": int(total_cells),
+            "missing_cells": int(missing_cells),
+            "column_completeness": column_completeness
+        }
+    
+    def duplicates(self) -> Dict:
+        """Estimated duplicate metrics in the format of DataQualityAnalyzer.analyze_duplicates"""
+        duplicate_count = min(self.duplicate_count, self.rows)
+        return {
+            "duplicate_count": int(duplicate_count),
+            "duplicate_pct": float((duplicate_count / self.rows) * 100) if self.rows else 0.0,
+            "unique_count": int(self.rows - duplicate_count),
+            "total_records": int(self.rows)
+        }
+    
+    def data_types(self) -> Dict:
+        """Column profiles in the format of DataQualityAnalyzer.analyze_data_types"""
+        type_analysis = {}
+        for col in self.columns:
+            non_null = self.rows - self.null_counts[col]
+            type_analysis[col] = {
+                "dtype": self.dtypes.get(col, "object"),
+                # HLL may overshoot slightly; never report more distinct than non-null values
+                "unique_values": int(min(self.distinct[col].count(), non_null)),
+                "sample_values": list(self.samples[col].values),
+                "top_values": self.frequent[col].top_values()
+            }
+        return type_analysis
+    
+    def error_bounds(self) -> Dict:
+        """Documented error bounds of the approximate metrics"""
+        cms = next(iter(self.frequent.values()), None) or CountMinSketch(top_k=self.top_k)
+        bounds = {
+            "unique_values_relative_std_error": HyperLogLog(self.hll_precision).relative_error,
+            "top_values_max_overcount_fraction": cms.epsilon,
+            "top_values_failure_probability": cms.delta
+        }
+
+        if self.row_hashes is not None:
+            bounds["duplicates_exact"] = True
+        else:
+            bounds.update({
+                "duplicates_exact": False,
+                "duplicate_false_positive_rate": self.row_filter.error_rate,
+                "duplicate_filter_capacity": self.row_filter.capacity,
+                # Past capacity the false positive rate, and the overcount, grows
+                "duplicate_filter_saturated": self.rows - self.duplicate_count > self.row_filter.capacity
+            })
+        return bounds
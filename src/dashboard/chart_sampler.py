@@ -0,0 +1,175 @@
+"""
+DIBIE - Chart Sampler
+Aggregate and downsample chart data to a bounded number of points
+"""
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class ChartSampler:
+    """Reduce chart data to at most ``max_points`` points
+    
+    Line and scatter series are sorted by x and reduced with
+    Largest-Triangle-Three-Buckets, which keeps the peaks and troughs a
+    plot would show. Bar and pie data are grouped by x; numeric and date
+    axes with more groups than points are binned into equal-width
+    intervals, and category axes keep the largest groups and merge the
+    rest into ``OTHER_LABEL``.
+    """
+    
+    LINE_TYPES = {'line', 'line_chart', 'time_series', 'scatter', 'area'}
+    AGGREGATIONS = {'sum', 'mean', 'count', 'min', 'max', 'median'}
+    OTHER_LABEL = "Otros"
+    
+    def __init__(self, max_points: int = 1000):
+        """Initialize chart sampler
+        
+        Args:
+            max_points: Largest number of points in a chart
+        """
+        self.max_points = max_points
+    
+    def sample(self, data: Union[pd.DataFrame, List[Dict]], chart_type: str, x_field: str, y_field: str,
+               aggregation: Optional[str] = None, max_points: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+        """Aggregate and downsample the data of one chart
+        
+        Args:
+            data: DataFrame or list of records
+            chart_type: Type of chart
+            x_field: Field for x-axis
+            y_field: Field for y-axis
+            aggregation: Function combining rows with the same x (sum,
+                mean, count, min, max, median); bar and pie charts default
+                to sum, line charts keep every row if None
+            max_points: Point cap for this chart (the sampler's if None)
+        
+        Returns:
+            Tuple of (records with x_field and y_field, sampling metadata)
+        """
+        max_points = max_points or self.max_points
+        if aggregation is not None and aggregation not in self.AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+        
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame.from_records(data)
+        source_points = len(df)
+        df = df[[x_field, y_field]]
+        if aggregation != 'count':
+            df = df.assign(**{y_field: pd.to_numeric(df[y_field], errors='coerce')})
+        
+        if chart_type in self.LINE_TYPES:
+            df, method = self._sample_series(df, x_field, y_field, aggregation, max_points)
+        else:
+            df, method = self._sample_groups(df, x_field, y_field, aggregation or 'sum', max_points)
+        
+        meta = {"method": method, "source_points": source_points, "points": len(df), "max_points": max_points}
+        if aggregation or chart_type not in self.LINE_TYPES:
+            meta["aggregation"] = aggregation or 'sum'
+        return self._records(df, x_field, y_field), meta
+    
+    def _sample_series(self, df: pd.DataFrame, x_field: str, y_field: str, aggregation: Optional[str],
+                       max_points: int) -> Tuple[pd.DataFrame, str]:
+        """Sort a series by x and reduce it with LTTB"""
+        method = "none"
+        if aggregation:
+            df = df.groupby(x_field, sort=True, as_index=False)[y_field].agg(aggregation)
+            method = "aggregated"
+        else:
+            df = df.dropna(subset=[x_field, y_field]).sort_values(x_field, kind='stable')
+        
+        if len(df) <= max_points:
+            return df.reset_index(drop=True), method
+        
+        x = self._axis_values(df[x_field])
+        if x is None:
+            # Text axes have no distance; keep evenly spaced points
+            keep = np.linspace(0, len(df) - 1, max_points).round().astype(int)
+        else:
+            keep = self.lttb(x, df[y_field].to_numpy(dtype='float64'), max_points)
+        return df.iloc[keep].reset_index(drop=True), "lttb"
+    
+    def _sample_groups(self, df: pd.DataFrame, x_field: str, y_field: str, aggregation: str,
+                       max_points: int) -> Tuple[pd.DataFrame, str]:
+        """Group by x, binning or folding groups beyond the cap"""
+        df = df.dropna(subset=[x_field])
+        if df[x_field].nunique() <= max_points:
+            return df.groupby(x_field, sort=True, as_index=False)[y_field].agg(aggregation), "aggregated"
+        
+        x = self._axis_values(df[x_field])
+        if x is not None:
+            edges = np.linspace(x.min(), x.max(), max_points + 1)
+            bins = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, max_points - 1)
+            grouped = df[y_field].groupby(bins).agg(aggregation)
+            starts = edges[grouped.index.to_numpy()]
+            if pd.api.types.is_datetime64_any_dtype(df[x_field]):
+                starts = pd.to_datetime(starts.astype('int64'))
+            return pd.DataFrame({x_field: starts, y_field: grouped.to_numpy()}), "bins"
+        
+        totals = df.groupby(x_field, sort=False)[y_field].agg(aggregation)
+        top = totals.nlargest(max_points - 1).index
+        labels = df[x_field].where(df[x_field].isin(top), self.OTHER_LABEL)
+        grouped = df[y_field].groupby(labels, sort=False).agg(aggregation)
+        grouped = grouped.sort_values(ascending=False)
+        return pd.DataFrame({x_field: grouped.index, y_field: grouped.to_numpy()}), "top"
+    
+    @staticmethod
+    def _axis_values(series: pd.Series) -> Optional[np.ndarray]:
+        """Numeric positions of an axis, or None for text axes"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.to_numpy(dtype='datetime64[ns]').astype('int64').astype('float64')
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.to_numpy(dtype='float64')
+        return None
+    
+    @staticmethod
+    def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+        """Largest-Triangle-Three-Buckets downsampling
+        
+        The first and last points are kept. The points in between are
+        split into ``threshold - 2`` buckets, and each bucket keeps the
+        point forming the largest triangle with the previously kept point
+        and the average of the next bucket.
+        
+        Args:
+            x: Sorted x positions
+            y: Values
+            threshold: Number of points to keep
+        
+        Returns:
+            Indices of the kept points
+        """
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+        
+        every = (n - 2) / (threshold - 2)
+        keep = np.empty(threshold, dtype=np.int64)
+        keep[0] = 0
+        a = 0
+        for i in range(threshold - 2):
+            start = int(i * every) + 1
+            end = int((i + 1) * every) + 1
+            next_end = min(int((i + 2) * every) + 1, n)
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            
+            area = np.abs(
+                (x[a] - avg_x) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (avg_y - y[a])
+            )
+            a = start + int(np.argmax(area))
+            keep[i + 1] = a
+        keep[-1] = n - 1
+        return keep
+    
+    @staticmethod
+    def _records(df: pd.DataFrame, x_field: str, y_field: str) -> List[Dict]:
+        """JSON-ready records of the sampled points"""
+        df = df.copy()
+        if pd.api.types.is_datetime64_any_dtype(df[x_field]):
+            df[x_field] = df[x_field].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        return [
+            {x_field: x.item() if hasattr(x, 'item') else x, y_field: None if pd.isna(y) else float(y)}
+            for x, y in zip(df[x_field].tolist(), df[y_field].tolist())
+        ]
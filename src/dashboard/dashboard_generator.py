@@ -2,27 +2,64 @@
 DIBIE - Dashboard Generator
 Generate interactive dashboards for data analysis results
 """
+import io
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TextIO
 from datetime import datetime
+from decimal import Decimal
 from pathlib import Path
-import logging
+
+try:
+    from ..log_config import get_logger
+    from ..telemetry import annotate, timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import annotate, timed
+
+from .fragment_cache import FragmentCache
+from .html_renderer import HTMLRenderer
+from .static_server import DashboardServer, precompress, precompress_tree
 
 
 class DashboardGenerator:
     """Generate dashboards for visualizing analysis results"""
     
-    def __init__(self, config_path: str = "config/dashboard.json", output_dir: str = "dashboard/output"):
+    def __init__(self, config_path: str = "config/dashboard.json", output_dir: str = "dashboard/output",
+                 query_engine=None, cache_dir: Optional[str] = "data/cache/dashboard",
+                 compress: Optional[bool] = None, config: Optional[Dict] = None):
         """Initialize dashboard generator
         
         Args:
             config_path: Path to dashboard configuration
             output_dir: Directory for dashboard output
+            query_engine: QueryEngine used by the query-backed components
+            cache_dir: Directory for rendered fragments (None disables caching)
+            compress: Minify JSON and precompress output (export.compress
+                in the config if None)
+            config: Parsed configuration (read from config_path if None)
         """
-        self.config = self._load_config(config_path)
+        self.query_engine = query_engine
+        self.config = config if config is not None else self._load_config(config_path)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.logger = self._setup_logger()
+        self.logger = get_logger('DashboardGenerator')
+        self.renderer = HTMLRenderer(**self.config.get("renderer", {}))
+        self._chart_sampler = None
+        self.fragment_cache = FragmentCache(cache_dir) if cache_dir else None
+        self.compress = self.config.get("export", {}).get("compress", False) if compress is None else compress
+    
+    @property
+    def chart_sampler(self):
+        """ChartSampler for the charts section of the config, created on first use
+        
+        Imported here so that dashboards without sampled charts do not load
+        pandas and numpy.
+        """
+        if self._chart_sampler is None:
+            from .chart_sampler import ChartSampler
+            self._chart_sampler = ChartSampler(**self.config.get("charts", {}))
+        return self._chart_sampler
     
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file"""
@@ -32,18 +69,6 @@ class DashboardGenerator:
         except FileNotFoundError:
             return {}
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the generator"""
-        logger = logging.getLogger('DashboardGenerator')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/dashboard_generator.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
     def create_kpi_card(self, title: str, value: Any, unit: str = "", trend: Optional[str] = None) -> Dict:
         """Create a KPI card component
         
@@ -56,38 +81,58 @@ class DashboardGenerator:
         Returns:
             KPI card definition
         """
-        return {
+        return self._with_hash({
             "type": "kpi_card",
             "title": title,
             "value": value,
             "unit": unit,
             "trend": trend,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
-    def create_chart(self, chart_type: str, title: str, data: List[Dict], x_field: str, y_field: str) -> Dict:
+    def create_chart(self, chart_type: str, title: str, data: Any, x_field: str, y_field: str,
+                     aggregation: Optional[str] = None, max_points: Optional[int] = None) -> Dict:
         """Create a chart component
         
+        DataFrames, queries, aggregated charts and record lists longer than
+        max_points are reduced server-side: bar and pie charts are grouped
+        (and binned), line charts are downsampled with LTTB. Short record
+        lists without an aggregation are embedded unchanged.
+        
         Args:
             chart_type: Type of chart (bar, line, pie, scatter)
             title: Chart title
-            data: Data for the chart
+            data: Records, a DataFrame, or a SQL query for the query engine
             x_field: Field for x-axis
             y_field: Field for y-axis
-            
+            aggregation: Function combining rows with the same x
+                (sum, mean, count, min, max, median)
+            max_points: Point cap (charts.max_points in the config if None)
+        
         Returns:
             Chart definition
         """
-        return {
+        config = {
+            "x_field": x_field,
+            "y_field": y_field,
+            "responsive": True
+        }
+        
+        # Read from the config so that short charts never create the sampler
+        max_points = max_points or self.config.get("charts", {}).get("max_points", 1000)
+        if isinstance(data, str):
+            data = self._query_frame(data, [x_field, y_field])
+        if not isinstance(data, list) or aggregation or len(data) > max_points:
+            data, config["sampling"] = self.chart_sampler.sample(
+                data, chart_type, x_field, y_field, aggregation=aggregation, max_points=max_points
+            )
+        
+        return self._with_hash({
             "type": chart_type,
             "title": title,
             "data": data,
-            "config": {
-                "x_field": x_field,
-                "y_field": y_field,
-                "responsive": True
-            }
-        }
+            "config": config
+        })
     
     def create_table(self, title: str, data: List[Dict], columns: List[str]) -> Dict:
         """Create a data table component
@@ -100,7 +145,7 @@ class DashboardGenerator:
         Returns:
             Table definition
         """
-        return {
+        return self._with_hash({
             "type": "table",
             "title": title,
             "data": data,
@@ -111,7 +156,81 @@ class DashboardGenerator:
                 "paginated": True,
                 "page_size": 20
             }
-        }
+        })
+    
+    @staticmethod
+    def _with_hash(component: Dict) -> Dict:
+        """Attach the content hash used to reuse rendered fragments
+        
+        Components are treated as immutable once created; build a new one
+        instead of editing its data in place.
+        """
+        component["content_hash"] = FragmentCache.content_hash(component)
+        return component
+    
+    def create_query_chart(self, chart_type: str, title: str, sql: str, x_field: str, y_field: str,
+                           params: Optional[List[Any]] = None, aggregation: Optional[str] = None,
+                           max_points: Optional[int] = None) -> Dict:
+        """Create a chart component from a SQL query
+        
+        Only the x and y columns are read from the query result, which is
+        then aggregated and downsampled like any DataFrame.
+        
+        Args:
+            chart_type: Type of chart (bar, line, pie, scatter)
+            title: Chart title
+            sql: Query over the normalized tables
+            x_field: Field for x-axis
+            y_field: Field for y-axis
+            params: Values for ? placeholders
+            aggregation: Function combining rows with the same x
+            max_points: Point cap
+        
+        Returns:
+            Chart definition
+        """
+        data = self._query_frame(sql, [x_field, y_field], params)
+        return self.create_chart(chart_type, title, data, x_field, y_field,
+                                 aggregation=aggregation, max_points=max_points)
+    
+    def create_query_table(self, title: str, sql: str, params: Optional[List[Any]] = None) -> Dict:
+        """Create a data table component from a SQL query
+        
+        Args:
+            title: Table title
+            sql: Query over the normalized tables
+            params: Values for ? placeholders
+        
+        Returns:
+            Table definition
+        """
+        data = self._run_query(sql, params)
+        columns = list(data[0].keys()) if data else []
+        return self.create_table(title, data, columns)
+    
+    def _query_frame(self, sql: str, columns: List[str], params: Optional[List[Any]] = None):
+        """Run a query in the query engine, keeping only some of its columns"""
+        if self.query_engine is None:
+            raise ValueError("DashboardGenerator has no query engine")
+        
+        selected = ", ".join(self.query_engine.quote(col) for col in columns)
+        return self.query_engine.query(f"SELECT {selected} FROM ({sql}) AS chart_source", params)
+    
+    def _run_query(self, sql: str, params: Optional[List[Any]] = None) -> List[Dict]:
+        """Run a query in the query engine and return JSON-friendly records"""
+        if self.query_engine is None:
+            raise ValueError("DashboardGenerator has no query engine")
+        
+        records = self.query_engine.query_records(sql, params)
+        for record in records:
+            for key, value in record.items():
+                if hasattr(value, 'isoformat'):
+                    record[key] = value.isoformat()
+                elif hasattr(value, 'item'):
+                    record[key] = value.item()
+                elif isinstance(value, Decimal):
+                    record[key] = float(value)
+        return records
     
     def create_dashboard(self, title: str, components: List[Dict]) -> Dict:
         """Create a complete dashboard
@@ -187,100 +306,37 @@ class DashboardGenerator:
             dashboard: Dashboard definition
             
         Returns:
-            HTML string
+            HTML string (every table row inlined)
         """
-        html = f"""<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{dashboard['title']}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f5f5f5; }}
-        .dashboard {{ max-width: 1400px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; margin-bottom: 30px; }}
-        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; }}
-        .header .timestamp {{ opacity: 0.9; font-size: 0.9em; }}
-        .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }}
-        .kpi-card {{ background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .kpi-card h3 {{ color: #666; font-size: 0.9em; margin-bottom: 10px; text-transform: uppercase; }}
-        .kpi-card .value {{ font-size: 2.5em; font-weight: bold; color: #333; }}
-        .kpi-card .unit {{ color: #999; font-size: 0.8em; margin-left: 5px; }}
-        .trend-up {{ color: #4caf50; }}
-        .trend-down {{ color: #f44336; }}
-        .chart {{ background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); margin-bottom: 20px; }}
-        .chart h2 {{ color: #333; margin-bottom: 20px; }}
-        table {{ width: 100%; border-collapse: collapse; background: white; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #667eea; color: white; font-weight: 600; }}
-        tr:hover {{ background: #f5f5f5; }}
-    </style>
-</head>
-<body>
-    <div class="dashboard">
-        <div class="header">
-            <h1>{dashboard['title']}</h1>
-            <div class="timestamp">Generado: {dashboard['created']}</div>
-        </div>
-        
-        <div class="grid">
-"""
-        
-        # Add KPI cards
-        for component in dashboard['components']:
-            if component['type'] == 'kpi_card':
-                trend_class = f"trend-{component.get('trend', 'neutral')}" if component.get('trend') else ""
-                html += f"""
-            <div class="kpi-card">
-                <h3>{component['title']}</h3>
-                <div class="value {trend_class}">{component['value']}<span class="unit">{component.get('unit', '')}</span></div>
-            </div>
-"""
-        
-        html += """
-        </div>
-        
-        <div class="charts">
-"""
-        
-        # Add charts and tables
-        for component in dashboard['components']:
-            if component['type'] in ['bar_chart', 'line_chart', 'pie_chart']:
-                html += f"""
-            <div class="chart">
-                <h2>{component['title']}</h2>
-                <p>Visualización de datos (requiere biblioteca de gráficos)</p>
-            </div>
-"""
-            elif component['type'] == 'table':
-                html += f"""
-            <div class="chart">
-                <h2>{component['title']}</h2>
-                <table>
-                    <thead><tr>{''.join([f'<th>{col}</th>' for col in component['columns']])}</tr></thead>
-                    <tbody>
-"""
-                for row in component['data'][:10]:  # Limit to 10 rows
-                    html += f"<tr>{''.join([f'<td>{row.get(col, '')}</td>' for col in component['columns']])}</tr>"
-                
-                html += """
-                    </tbody>
-                </table>
-            </div>
-"""
-        
-        html += """
-        </div>
-    </div>
-</body>
-</html>"""
+        buffer = io.StringIO()
+        self.renderer.render(dashboard, buffer)
+        return buffer.getvalue()
+    
+    def stream_html(self, dashboard: Dict, out: TextIO, data_dir: Optional[str] = None,
+                    data_url: Optional[str] = None) -> Dict:
+        """Write dashboard HTML to a file or socket stream as it is rendered
         
-        return html
+        Args:
+            dashboard: Dashboard definition
+            out: Text stream (e.g. an open file or socket.makefile('w'))
+            data_dir: Directory for the JSON pages of large tables
+            data_url: URL of data_dir relative to the page
+            
+        Returns:
+            Render summary
+        """
+        return self.renderer.render(dashboard, out, data_dir=data_dir, data_url=data_url)
     
+    @timed("dashboard.save", bytes=lambda path: Path(path).stat().st_size)
     def save_dashboard(self, dashboard: Dict, filename: str, format: str = 'json') -> str:
         """Save dashboard to file
         
+        With the fragment cache enabled, a file whose inputs did not change
+        is left untouched, only changed components are rendered again and
+        files are written only when their bytes differ. In compressed mode
+        JSON is minified and .gz/.br siblings are written next to every
+        output file.
+
         Args:
             dashboard: Dashboard definition
             filename: Output filename
@@ -290,17 +346,78 @@ class DashboardGenerator:
             Path to saved file
         """
         output_path = self.output_dir / f"{filename}.{format}"
+        data_dir = str(self.output_dir / f"{filename}_data")
+        annotate(format=format, components=len(dashboard.get("components", [])))
         
+        if self.fragment_cache is not None:
+            if format == 'json':
+                key = FragmentCache.dashboard_hash(dashboard) + ("-min" if self.compress else "")
+            else:
+                key = self.renderer.page_key(dashboard, data_dir)
+            if self.fragment_cache.is_current(str(output_path), key):
+                self.logger.info(f"Dashboard unchanged: {output_path}")
+                if self.compress:
+                    self._precompress(output_path, data_dir)
+                return str(output_path)
+        
+        json_options = {"separators": (',', ':')} if self.compress else {"indent": 2}
         if format == 'json':
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(dashboard, f, indent=2, ensure_ascii=False)
+            if self.fragment_cache is not None:
+                data = json.dumps(dashboard, ensure_ascii=False, **json_options).encode('utf-8')
+                self.fragment_cache.write_if_changed(str(output_path), data, key)
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(dashboard, f, ensure_ascii=False, **json_options)
         elif format == 'html':
-            html = self.generate_html(dashboard)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            if self.fragment_cache is not None:
+                # Pages are small once large tables are chunked; assemble in memory to compare
+                buffer = io.StringIO()
+                summary = self.renderer.render(dashboard, buffer, data_dir=data_dir, cache=self.fragment_cache)
+                self.fragment_cache.write_if_changed(str(output_path), buffer.getvalue().encode('utf-8'), key)
+                self.logger.info(
+                    f"Rendered {summary['rendered_fragments']} components, "
+                    f"reused {summary['cached_fragments']} from cache"
+                )
+            else:
+                # Large tables are paginated into JSON files next to the page
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    summary = self.stream_html(dashboard, f, data_dir=data_dir)
+            if summary["paginated_tables"]:
+                self.logger.info(
+                    f"Paginated {summary['paginated_tables']} tables, wrote {summary['json_chunks']} JSON chunks"
+                )
+        
+        if self.compress:
+            self._precompress(output_path, data_dir)
         
         self.logger.info(f"Saved dashboard: {output_path}")
         return str(output_path)
+    
+    def _precompress(self, output_path: Path, data_dir: str):
+        """Write compressed siblings of an output file and its table chunks"""
+        written = precompress(str(output_path))
+        if Path(data_dir).is_dir():
+            written += precompress_tree(data_dir)
+        if written:
+            self.logger.info(f"Precompressed {len(written)} files for {output_path.name}")
+    
+    def serve(self, host: str = "127.0.0.1", port: int = 8050, background: bool = False) -> DashboardServer:
+        """Serve the output directory with compression and caching headers
+        
+        Args:
+            host: Interface to bind
+            port: Port to listen on
+            background: Serve from a daemon thread and return immediately
+        
+        Returns:
+            Dashboard server
+        """
+        server = DashboardServer(
+            str(self.output_dir), host, port,
+            max_age=self.config.get("dashboard", {}).get("refresh_interval", 300)
+        )
+        server.start(background=background)
+        return server
 
 
 if __name__ == "__main__":
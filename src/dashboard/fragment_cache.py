@@ -0,0 +1,205 @@
+"""
+DIBIE - Fragment Cache
+Content-addressed cache of rendered dashboard fragments
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class FragmentCache:
+    """Cache rendered component fragments by content hash
+    
+    Fragments are stored as ``<hash>.html`` files, so a component whose
+    content did not change is never rendered twice. The cache also
+    remembers the content key of every output file it wrote, letting
+    callers skip rebuilding a page whose inputs are unchanged.
+    
+    Timestamps (``timestamp``, ``created``) are left out of content hashes:
+    a KPI recreated with the same value is the same component.
+    
+    Every hit refreshes a fragment's modification time; once more than
+    ``max_fragments`` are stored, the least recently used are deleted.
+    """
+    
+    VOLATILE_FIELDS = {"timestamp", "created", "content_hash"}
+    
+    def __init__(self, cache_dir: str = "data/cache/dashboard", max_fragments: int = 5000):
+        """Initialize fragment cache
+        
+        Args:
+            cache_dir: Directory for fragments and the output index
+            max_fragments: Number of fragments kept on disk
+        """
+        self.cache_dir = Path(cache_dir)
+        self.fragment_dir = self.cache_dir / "fragments"
+        self.fragment_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "outputs.json"
+        self.max_fragments = max_fragments
+        self._outputs: Optional[Dict[str, str]] = None
+        self._fragment_count: Optional[int] = None
+    
+    @classmethod
+    def content_hash(cls, component: Dict) -> str:
+        """Hash of a component's content, ignoring volatile fields
+        
+        Args:
+            component: Component or dashboard definition
+        
+        Returns:
+            Hex digest
+        """
+        content = {key: value for key, value in component.items() if key not in cls.VOLATILE_FIELDS}
+        payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def component_hash(cls, component: Dict) -> str:
+        """Stored content hash of a component, computed if missing"""
+        return component.get("content_hash") or cls.content_hash(component)
+    
+    @classmethod
+    def dashboard_hash(cls, dashboard: Dict) -> str:
+        """Hash of a dashboard from its fields and its component hashes
+        
+        Args:
+            dashboard: Dashboard definition
+        
+        Returns:
+            Hex digest
+        """
+        content = {key: value for key, value in dashboard.items() if key != "components"}
+        content["components"] = [cls.component_hash(component) for component in dashboard.get("components", [])]
+        return cls.content_hash(content)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Cached fragment, or None"""
+        path = self.fragment_dir / f"{key}.html"
+        try:
+            fragment = path.read_text(encoding='utf-8')
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return fragment
+    
+    def put(self, key: str, fragment: str):
+        """Store a rendered fragment, evicting the least recently used beyond max_fragments"""
+        path = self.fragment_dir / f"{key}.html"
+        added = not path.exists()
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(fragment, encoding='utf-8')
+        temp_path.replace(path)
+        
+        if added:
+            if self._fragment_count is None:
+                self._fragment_count = sum(1 for _ in self.fragment_dir.glob("*.html"))
+            else:
+                self._fragment_count += 1
+            if self._fragment_count > self.max_fragments:
+                # Prune below the limit so that eviction does not run on every put
+                self.prune(self.max_fragments * 9 // 10)
+    
+    def prune(self, keep: Optional[int] = None) -> int:
+        """Delete the least recently used fragments
+        
+        Args:
+            keep: Number of fragments to keep (max_fragments if None)
+        
+        Returns:
+            Number of fragments deleted
+        """
+        keep = self.max_fragments if keep is None else keep
+        fragments = []
+        for path in self.fragment_dir.glob("*.html"):
+            try:
+                fragments.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        fragments.sort()
+        
+        removed = fragments[:max(0, len(fragments) - keep)]
+        for _, path in removed:
+            path.unlink(missing_ok=True)
+        self._fragment_count = len(fragments) - len(removed)
+        return len(removed)
+    
+    def is_current(self, output_path: str, key: str) -> bool:
+        """Check that an output file exists and was written from ``key``
+        
+        Args:
+            output_path: Output file
+            key: Content key of the inputs
+        
+        Returns:
+            True if the file does not need to be rebuilt
+        """
+        return Path(output_path).exists() and self._load_outputs().get(str(output_path)) == key
+    
+    def write_if_changed(self, output_path: str, data: bytes, key: Optional[str] = None) -> bool:
+        """Write a file only when its bytes differ from the file on disk
+        
+        Args:
+            output_path: Output file
+            data: New contents
+            key: Content key to record for is_current()
+        
+        Returns:
+            True if the file was written
+        """
+        written = self.write_bytes_if_changed(output_path, data)
+        if key is not None:
+            outputs = self._load_outputs()
+            if outputs.get(str(output_path)) != key:
+                outputs[str(output_path)] = key
+                temp_path = self.index_path.with_suffix(".json.tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(outputs, f, indent=2)
+                os.replace(temp_path, self.index_path)
+        return written
+    
+    @staticmethod
+    def write_bytes_if_changed(output_path: str, data: bytes) -> bool:
+        """Write a file unless it already holds exactly ``data``
+        
+        Args:
+            output_path: Output file
+            data: New contents
+        
+        Returns:
+            True if the file was written
+        """
+        path = Path(output_path)
+        try:
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return True
+    
+    def clear(self):
+        """Remove every cached fragment and the output index"""
+        shutil.rmtree(self.fragment_dir, ignore_errors=True)
+        self.fragment_dir.mkdir(parents=True, exist_ok=True)
+        if self.index_path.exists():
+            self.index_path.unlink()
+        self._outputs = None
+        self._fragment_count = 0
+    
+    def _load_outputs(self) -> Dict[str, str]:
+        """Content keys of the output files written so far"""
+        if self._outputs is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._outputs = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._outputs = {}
+        return self._outputs
@@ -0,0 +1,421 @@
+"""
+DIBIE - HTML Renderer
+Stream dashboards to HTML with paginated tables backed by JSON chunks
+"""
+import hashlib
+import io
+import json
+import math
+from html import escape
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from .fragment_cache import FragmentCache
+
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f5f5f5; }
+        .dashboard { max-width: 1400px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; margin-bottom: 30px; }
+        .header h1 { font-size: 2.5em; margin-bottom: 10px; }
+        .header .timestamp { opacity: 0.9; font-size: 0.9em; }
+        .grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }
+        .kpi-card { background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .kpi-card h3 { color: #666; font-size: 0.9em; margin-bottom: 10px; text-transform: uppercase; }
+        .kpi-card .value { font-size: 2.5em; font-weight: bold; color: #333; }
+        .kpi-card .unit { color: #999; font-size: 0.8em; margin-left: 5px; }
+        .trend-up { color: #4caf50; }
+        .trend-down { color: #f44336; }
+        .chart { background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); margin-bottom: 20px; }
+        .chart h2 { color: #333; margin-bottom: 20px; }
+        table { width: 100%; border-collapse: collapse; background: white; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #667eea; color: white; font-weight: 600; }
+        tr:hover { background: #f5f5f5; }
+        .pager { margin-top: 15px; display: flex; gap: 10px; align-items: center; color: #666; }
+        .pager button { padding: 6px 12px; border: 1px solid #667eea; background: white; color: #667eea; border-radius: 5px; cursor: pointer; }
+        .pager button:disabled { opacity: 0.4; cursor: default; }
+    </style>
+</head>
+<body>
+    <div class="dashboard">
+        <div class="header">
+            <h1>$title</h1>
+            <div class="timestamp">Generado: $created</div>
+        </div>
+        
+        <div class="grid">
+""")
+
+KPI_TEMPLATE = Template("""
+            <div class="kpi-card">
+                <h3>$title</h3>
+                <div class="value $trend_class">$value<span class="unit">$unit</span></div>
+            </div>
+""")
+
+SECTION_BREAK = """
+        </div>
+        
+        <div class="charts">
+"""
+
+CHART_TEMPLATE = Template("""
+            <div class="chart">
+                <h2>$title</h2>
+                <p>Visualización de datos (requiere biblioteca de gráficos)</p>
+            </div>
+""")
+
+TABLE_START_TEMPLATE = Template("""
+            <div class="chart">
+                <h2>$title</h2>
+                <table$attributes>
+                    <thead><tr>$header</tr></thead>
+                    <tbody>
+""")
+
+TABLE_END = """
+                    </tbody>
+                </table>
+"""
+
+PAGER_TEMPLATE = Template("""                <div class="pager">
+                    <button type="button" data-step="-1" disabled>&laquo;</button>
+                    <span class="pager-status">1 / $pages ($rows filas)</span>
+                    <button type="button" data-step="1">&raquo;</button>
+                </div>
+""")
+
+# Loads table rows from the JSON chunks; only the visible page is in the DOM
+PAGER_SCRIPT = """
+    <script>
+    document.querySelectorAll('table[data-src]').forEach(function (table) {
+        var pager = table.nextElementSibling;
+        var status = pager.querySelector('.pager-status');
+        var buttons = pager.querySelectorAll('button');
+        var pageSize = parseInt(table.dataset.pageSize, 10);
+        var chunkRows = parseInt(table.dataset.chunkRows, 10);
+        var pages = parseInt(table.dataset.pages, 10);
+        var rows = table.dataset.rows;
+        var page = 0;
+        var chunks = {};
+        function cell(value) {
+            var td = document.createElement('td');
+            td.textContent = value === null ? '' : value;
+            return td;
+        }
+        function chunk(index) {
+            if (!chunks[index]) {
+                chunks = {};
+                chunks[index] = fetch(table.dataset.src + '/chunk_' + index + '.json')
+                    .then(function (response) { return response.json(); });
+            }
+            return chunks[index];
+        }
+        function show(target) {
+            var first = target * pageSize;
+            var index = Math.floor(first / chunkRows);
+            chunk(index)
+                .then(function (data) {
+                    var body = document.createElement('tbody');
+                    var offset = first - index * chunkRows;
+                    data.rows.slice(offset, offset + pageSize).forEach(function (values) {
+                        var tr = document.createElement('tr');
+                        values.forEach(function (value) { tr.appendChild(cell(value)); });
+                        body.appendChild(tr);
+                    });
+                    table.replaceChild(body, table.tBodies[0]);
+                    page = target;
+                    status.textContent = (page + 1) + ' / ' + pages + ' (' + rows + ' filas)';
+                    buttons[0].disabled = page === 0;
+                    buttons[1].disabled = page === pages - 1;
+                });
+        }
+        buttons.forEach(function (button) {
+            button.addEventListener('click', function () {
+                show(page + parseInt(button.dataset.step, 10));
+            });
+        });
+    });
+    </script>
+"""
+
+PAGE_END = """
+        </div>
+    </div>
+</body>
+</html>"""
+
+CHART_TYPES = {'bar', 'line', 'pie', 'scatter', 'bar_chart', 'line_chart', 'pie_chart'}
+
+# Cached fragments are invalidated whenever a template changes
+TEMPLATE_HASH = hashlib.sha256(''.join([
+    PAGE_TEMPLATE.template, KPI_TEMPLATE.template, CHART_TEMPLATE.template,
+    TABLE_START_TEMPLATE.template, TABLE_END, PAGER_TEMPLATE.template
+]).encode('utf-8')).hexdigest()
+
+
+class HTMLRenderer:
+    """Render dashboard definitions to HTML in a single streaming pass
+    
+    The page is written to any text stream (an open file, or a socket via
+    ``socket.makefile('w')``) as it is produced, so output size does not
+    bound memory. Tables with more than ``inline_rows`` rows are written
+    as numbered JSON chunks next to the HTML; the page inlines only the
+    first page of rows and fetches the chunk holding any other page on
+    demand, which needs the dashboard to be served over HTTP.
+    """
+    
+    # Written next to the chunks: fragment key of the table they belong to
+    CHUNKS_KEY_FILE = "_fragment_key"
+    
+    def __init__(self, inline_rows: int = 100, page_size: Optional[int] = None,
+                 chunk_rows: int = 2000, write_rows: int = 1000):
+        """Initialize HTML renderer
+        
+        Args:
+            inline_rows: Largest table rendered entirely inside the page
+            page_size: Rows per displayed page (the table's page_size config if None)
+            chunk_rows: Rows per JSON chunk file
+            write_rows: Table rows rendered per write to the stream
+        """
+        self.inline_rows = inline_rows
+        self.page_size = page_size
+        self.chunk_rows = chunk_rows
+        self.write_rows = write_rows
+    
+    def render(self, dashboard: Dict, out: TextIO, data_dir: Optional[str] = None,
+               data_url: Optional[str] = None, cache: Optional[FragmentCache] = None) -> Dict:
+        """Write a dashboard as HTML
+        
+        Args:
+            dashboard: Dashboard definition
+            out: Text stream to write to
+            data_dir: Directory for the JSON chunks of large tables
+                (all rows are inlined if None)
+            data_url: URL of data_dir relative to the page
+                (the directory name if None)
+            cache: Fragment cache; components with a cached fragment are
+                not rendered again
+        
+        Returns:
+            Summary with the tables paginated, JSON chunks written and
+            fragments rendered or taken from the cache
+        """
+        kpis, panels = [], []
+        for component in dashboard.get('components', []):
+            (kpis if component.get('type') == 'kpi_card' else panels).append(component)
+        
+        out.write(PAGE_TEMPLATE.substitute(
+            title=escape(str(dashboard.get('title', ''))),
+            created=escape(str(dashboard.get('created', '')))
+        ))
+        
+        summary = {"paginated_tables": 0, "json_chunks": 0, "rendered_fragments": 0, "cached_fragments": 0}
+        for component in kpis:
+            self._write_fragment(component, None, out, data_dir, data_url, cache, summary)
+        
+        out.write(SECTION_BREAK)
+        
+        for index, component in enumerate(panels):
+            self._write_fragment(component, index, out, data_dir, data_url, cache, summary)
+        
+        if summary["paginated_tables"]:
+            out.write(PAGER_SCRIPT)
+        out.write(PAGE_END)
+        return summary
+    
+    def page_key(self, dashboard: Dict, data_dir: Optional[str] = None, data_url: Optional[str] = None) -> str:
+        """Content key of the page rendered for a dashboard
+        
+        Args:
+            dashboard: Dashboard definition
+            data_dir: Directory for the JSON chunks of large tables
+            data_url: URL of data_dir relative to the page
+        
+        Returns:
+            Hex digest that changes with any component, setting or template
+        """
+        return self._key(FragmentCache.dashboard_hash(dashboard), data_dir, data_url)
+    
+    def fragment_key(self, component: Dict, index: Optional[int], data_dir: Optional[str] = None,
+                     data_url: Optional[str] = None) -> str:
+        """Cache key of a component fragment
+        
+        Args:
+            component: Component definition
+            index: Position among the charts and tables (None for KPI cards)
+            data_dir: Directory for the JSON chunks of large tables
+            data_url: URL of data_dir relative to the page
+        
+        Returns:
+            Hex digest
+        """
+        return self._key(FragmentCache.component_hash(component), index, data_dir, data_url)
+    
+    def _key(self, *parts) -> str:
+        """Hash of the given parts, the renderer settings and the templates"""
+        settings = [TEMPLATE_HASH, self.inline_rows, self.page_size, self.chunk_rows]
+        return hashlib.sha256(json.dumps(settings + list(parts), default=str).encode('utf-8')).hexdigest()
+    
+    def _paginates(self, component: Dict, data_dir: Optional[str]) -> bool:
+        """Whether a table is served from JSON chunks"""
+        return (component.get('type') == 'table' and data_dir is not None
+                and len(component.get('data', [])) > self.inline_rows)
+    
+    def _write_fragment(self, component: Dict, index: Optional[int], out: TextIO, data_dir: Optional[str],
+                        data_url: Optional[str], cache: Optional[FragmentCache], summary: Dict):
+        """Write one component, from the cache when its content is unchanged"""
+        paginated = self._paginates(component, data_dir)
+        if paginated:
+            summary["paginated_tables"] += 1
+        
+        if cache is None:
+            summary["json_chunks"] += self._render_component(component, index, out, data_dir, data_url)
+            summary["rendered_fragments"] += 1
+            return
+        
+        key = self.fragment_key(component, index, data_dir, data_url)
+        fragment = cache.get(key)
+        # A cached table fragment is only valid while the chunks on disk are its own
+        if fragment is not None and paginated and self.chunks_key(Path(data_dir) / f"table_{index}") != key:
+            fragment = None
+        
+        if fragment is None:
+            buffer = io.StringIO()
+            summary["json_chunks"] += self._render_component(component, index, buffer, data_dir, data_url)
+            summary["rendered_fragments"] += 1
+            fragment = buffer.getvalue()
+            cache.put(key, fragment)
+        else:
+            summary["cached_fragments"] += 1
+        out.write(fragment)
+    
+    def _render_component(self, component: Dict, index: Optional[int], out: TextIO, data_dir: Optional[str],
+                          data_url: Optional[str]) -> int:
+        """Write one component; returns the number of JSON chunks written"""
+        component_type = component.get('type')
+        if component_type == 'kpi_card':
+            trend = component.get('trend')
+            out.write(KPI_TEMPLATE.substitute(
+                title=escape(str(component.get('title', ''))),
+                trend_class=f"trend-{escape(str(trend))}" if trend else "",
+                value=escape(str(component.get('value', ''))),
+                unit=escape(str(component.get('unit', '')))
+            ))
+        elif component_type == 'table':
+            return self._render_table(component, index, out, data_dir, data_url)
+        elif component_type in CHART_TYPES:
+            out.write(CHART_TEMPLATE.substitute(title=escape(str(component.get('title', '')))))
+        return 0
+    
+    def _render_table(self, component: Dict, index: int, out: TextIO, data_dir: Optional[str],
+                      data_url: Optional[str]) -> int:
+        """Write one table; returns the number of JSON chunks written"""
+        columns = component.get('columns', [])
+        data = component.get('data', [])
+        header = ''.join(f'<th>{escape(str(col))}</th>' for col in columns)
+        
+        if not self._paginates(component, data_dir):
+            out.write(TABLE_START_TEMPLATE.substitute(
+                title=escape(str(component.get('title', ''))), attributes='', header=header
+            ))
+            self._write_rows(data, columns, out)
+            out.write(TABLE_END)
+            out.write("            </div>\n")
+            return 0
+        
+        page_size = self.page_size or component.get('config', {}).get('page_size', 20)
+        chunk_rows = max(page_size, self.chunk_rows // page_size * page_size)
+        table_dir = Path(data_dir) / f"table_{index}"
+        written = self.write_chunks(data, columns, table_dir, chunk_rows)
+        FragmentCache.write_bytes_if_changed(table_dir / self.CHUNKS_KEY_FILE,
+                                             self.fragment_key(component, index, data_dir, data_url).encode('utf-8'))
+        pages = math.ceil(len(data) / page_size)
+        src = f"{data_url or Path(data_dir).name}/table_{index}"
+        
+        attributes = (
+            f' data-src="{escape(src)}" data-page-size="{page_size}" data-chunk-rows="{chunk_rows}"'
+            f' data-pages="{pages}" data-rows="{len(data)}"'
+        )
+        out.write(TABLE_START_TEMPLATE.substitute(
+            title=escape(str(component.get('title', ''))), attributes=attributes, header=header
+        ))
+        self._write_rows(data[:page_size], columns, out)
+        out.write(TABLE_END)
+        out.write(PAGER_TEMPLATE.substitute(pages=pages, rows=len(data)))
+        out.write("            </div>\n")
+        return written
+    
+    def _write_rows(self, data: List[Dict], columns: List[str], out: TextIO):
+        """Write table rows in batches of write_rows"""
+        for start in range(0, len(data), self.write_rows):
+            out.write(''.join(
+                '<tr>' + ''.join(f'<td>{escape(str(row.get(col, "")))}</td>' for col in columns) + '</tr>\n'
+                for row in data[start:start + self.write_rows]
+            ))
+    
+    @staticmethod
+    def iter_chunks(data: List[Dict], columns: List[str], chunk_rows: int) -> Iterator[Dict]:
+        """Split table rows into JSON chunks
+        
+        Args:
+            data: Table rows
+            columns: Column order of the row values
+            chunk_rows: Rows per chunk
+        
+        Yields:
+            Chunk dictionaries with chunk, columns and rows (no totals, so
+            appending rows leaves the earlier chunks unchanged)
+        """
+        chunks = max(1, math.ceil(len(data) / chunk_rows))
+        for chunk in range(chunks):
+            rows = data[chunk * chunk_rows:(chunk + 1) * chunk_rows]
+            yield {
+                "chunk": chunk,
+                "columns": columns,
+                "rows": [[row.get(col) for col in columns] for row in rows]
+            }
+    
+    def chunks_key(self, table_dir: Path) -> Optional[str]:
+        """Fragment key of the table whose chunks are in a directory, or None"""
+        try:
+            return (table_dir / self.CHUNKS_KEY_FILE).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+    
+    def write_chunks(self, data: List[Dict], columns: List[str], table_dir: Path, chunk_rows: int) -> int:
+        """Write the JSON chunks of a table
+        
+        Args:
+            data: Table rows
+            columns: Column order of the row values
+            table_dir: Output directory of the chunks
+            chunk_rows: Rows per chunk
+        
+        Returns:
+            Number of chunk files written (unchanged chunks are skipped)
+        """
+        table_dir.mkdir(parents=True, exist_ok=True)
+        chunks = written = 0
+        for chunk in self.iter_chunks(data, columns, chunk_rows):
+            payload = json.dumps(chunk, ensure_ascii=False, default=str).encode('utf-8')
+            if FragmentCache.write_bytes_if_changed(table_dir / f"chunk_{chunk['chunk']}.json", payload):
+                written += 1
+            chunks += 1
+        
+        # Chunks left over from a larger previous render
+        stale = chunks
+        while (table_dir / f"chunk_{stale}.json").exists():
+            (table_dir / f"chunk_{stale}.json").unlink()
+            stale += 1
+        return written
@@ -0,0 +1,253 @@
+"""
+DIBIE - Static Server
+Precompress dashboard output and serve it with HTTP caching headers
+"""
+import gzip
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.json', '.css', '.js', '.svg', '.txt', '.csv'}
+
+
+def brotli_module():
+    """The brotli module, or None when it is not installed"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def precompress(path: str, min_size: int = 256) -> List[Path]:
+    """Write .gz and .br siblings of a file
+    
+    Siblings are rewritten only when missing or older than the file.
+    Brotli output is skipped when the brotli package is not installed.
+    
+    Args:
+        path: File to compress
+        min_size: Files smaller than this are left alone
+    
+    Returns:
+        Sibling files written
+    """
+    path = Path(path)
+    if path.suffix not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < min_size:
+        return []
+    
+    source_mtime = path.stat().st_mtime_ns
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    brotli = brotli_module()
+    if brotli is not None:
+        encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    
+    written = []
+    data = None
+    for suffix, encode in encoders:
+        sibling = path.with_name(path.name + suffix)
+        if sibling.exists() and sibling.stat().st_mtime_ns >= source_mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        sibling.write_bytes(encode(data))
+        written.append(sibling)
+    return written
+
+
+def precompress_tree(directory: str, min_size: int = 256) -> List[Path]:
+    """Precompress every compressible file under a directory
+    
+    Args:
+        directory: Root directory
+        min_size: Files smaller than this are left alone
+    
+    Returns:
+        Sibling files written
+    """
+    written = []
+    for path in sorted(Path(directory).rglob('*')):
+        if path.is_file():
+            written.extend(precompress(str(path), min_size))
+    return written
+
+
+class DashboardRequestHandler(SimpleHTTPRequestHandler):
+    """Serve precompressed files with ETag and Cache-Control headers"""
+    
+    # Set by DashboardServer
+    root: Path = Path('.')
+    max_age: int = 300
+    etags: Dict[Tuple[str, int, int], str] = {}
+    etag_lock = threading.Lock()
+    
+    ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def _serve(self, send_body: bool):
+        path = self._resolve(urlsplit(self.path).path)
+        if path is None:
+            self.send_error(404, "Not found")
+            return
+        
+        file_path, encoding = self._negotiate(path)
+        stat = file_path.stat()
+        etag = self._etag(file_path, stat, encoding)
+        
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Cache-Control": "no-cache" if path.suffix == '.html' else f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        
+        if self._not_modified(etag):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/json':
+            content_type += '; charset=utf-8'
+        
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(stat.st_size))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        
+        if send_body:
+            with open(file_path, 'rb') as f:
+                self.copyfile(f, self.wfile)
+    
+    def _resolve(self, url_path: str) -> Optional[Path]:
+        """File under the root for a URL path, or None"""
+        relative = unquote(url_path).lstrip('/')
+        path = (self.root / relative).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / 'index.html'
+        if not path.is_file() or path.suffix in ('.gz', '.br'):
+            return None
+        return path
+    
+    def _negotiate(self, path: Path) -> Tuple[Path, Optional[str]]:
+        """Best up-to-date precompressed variant the client accepts"""
+        accepted = {
+            token.split(';')[0].strip().lower()
+            for token in self.headers.get('Accept-Encoding', '').split(',')
+        }
+        source_mtime = path.stat().st_mtime_ns
+        for encoding, suffix in self.ENCODINGS:
+            sibling = path.with_name(path.name + suffix)
+            if encoding in accepted and sibling.exists() and sibling.stat().st_mtime_ns >= source_mtime:
+                return sibling, encoding
+        return path, None
+    
+    def _etag(self, file_path: Path, stat, encoding: Optional[str]) -> str:
+        """Strong ETag from the content hash, cached per file version"""
+        key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        with self.etag_lock:
+            etag = self.etags.get(key)
+        if etag is None:
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(block)
+            etag = f'"{sha.hexdigest()[:32]}{"-" + encoding if encoding else ""}"'
+            with self.etag_lock:
+                self.etags[key] = etag
+        return etag
+    
+    def _not_modified(self, etag: str) -> bool:
+        """Check If-None-Match against the current ETag"""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+    
+    def log_message(self, format, *args):
+        # Lazy %-formatting: nothing is built per request unless DEBUG is on
+        get_logger('DashboardServer').debug(format, *args)
+
+
+class DashboardServer:
+    """Local static server for generated dashboards"""
+    
+    def __init__(self, root: str = "dashboard/output", host: str = "127.0.0.1", port: int = 8050,
+                 max_age: int = 300):
+        """Initialize dashboard server
+        
+        Args:
+            root: Directory to serve
+            host: Interface to bind
+            port: Port to listen on
+            max_age: Cache-Control max-age in seconds for non-HTML files
+        """
+        self.root = Path(root).resolve()
+        self.host = host
+        self.port = port
+        self.max_age = max_age
+        self.logger = get_logger('DashboardServer')
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+    
+    def start(self, background: bool = False) -> ThreadingHTTPServer:
+        """Start serving
+        
+        Args:
+            background: Serve from a daemon thread and return immediately
+        
+        Returns:
+            The HTTP server
+        """
+        handler = type('BoundDashboardRequestHandler', (DashboardRequestHandler,), {
+            'root': self.root,
+            'max_age': self.max_age,
+            'etags': {},
+            'etag_lock': threading.Lock(),
+        })
+        self.httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self.httpd.server_address[1]
+        self.logger.info(f"Serving {self.root} at http://{self.host}:{self.port}/")
+        
+        if background:
+            self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self.thread.start()
+        else:
+            try:
+                self.httpd.serve_forever()
+            except KeyboardInterrupt:
+                self.stop()
+        return self.httpd
+    
+    def stop(self):
+        """Stop serving"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -4,14 +4,35 @@ Configure and manage Apache Superset dashboards
 """
 import subprocess
 import os
-import logging
-from typing import Dict, Optional
+import shutil
+import signal
+import time
+import re
+import json
+import hashlib
+import sqlite3
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
 from pathlib import Path
 
+try:
+    from ..ingestion.sqlite_profile import SQLiteProfile
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from ingestion.sqlite_profile import SQLiteProfile
+    from log_config import get_logger
+
 
 class SupersetManager:
     """Manage Apache Superset integration"""
     
+    PRODUCTION_APP = "superset.app:create_app()"
+    HEALTH_ENDPOINT = "/health"
+    
     def __init__(self, host: str = "localhost", port: int = 8088):
         """Initialize Superset manager
         
@@ -22,20 +43,12 @@ class SupersetManager:
         self.host = host
         self.port = port
         self.base_url = f"http://{host}:{port}"
-        self.logger = self._setup_logger()
-        
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger"""
-        logger = logging.getLogger('SupersetManager')
-        logger.setLevel(logging.INFO)
+        self.logger = get_logger('SupersetManager')
+        self._opener = None
+        self._api_headers: Dict[str, str] = {}
+        self.startup_seconds: Optional[float] = None
+        self.preloaded = False
         
-        handler = logging.FileHandler('logs/superset_manager.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
     def is_installed(self) -> bool:
         """Check if Superset is installed
         
@@ -184,11 +197,32 @@ class SupersetManager:
             self.logger.error(f"Error initializing Superset: {str(e)}")
             return False
     
-    def start_server(self, background: bool = False) -> Optional[subprocess.Popen]:
+    def start_server(self, background: bool = False, production: bool = False,
+                     workers: Optional[int] = None, threads: int = 4, timeout: int = 120,
+                     preload: bool = True, max_requests: int = 1000,
+                     health_timeout: float = 120.0) -> Optional[subprocess.Popen]:
         """Start Superset server
         
+        The default is the Flask development server with the reloader and
+        debugger. With ``production`` Superset runs under gunicorn with
+        several worker processes, each serving ``threads`` requests at a
+        time, so concurrent viewers are not serialized. Where gunicorn is
+        unavailable (Windows) waitress is used as a multi-threaded server.
+        
         Args:
             background: Run in background
+            production: Run under a multi-worker WSGI server
+            workers: Worker processes (2 * CPUs + 1 if None)
+            threads: Threads per worker
+            timeout: Seconds before a silent worker is restarted, also
+                used as the graceful shutdown period
+            preload: Load the app once in the master before forking workers
+                (less memory and faster worker restarts, but code and
+                configuration changes then need stop_server/start_server,
+                see reload_server)
+            max_requests: Requests after which a worker is recycled
+            health_timeout: Seconds to wait for the health check in
+                production mode
             
         Returns:
             Process object if background, None otherwise
@@ -196,30 +230,466 @@ class SupersetManager:
         try:
             self.logger.info(f"Starting Superset server on {self.base_url}")
             
-            cmd = [
-                'superset', 'run',
-                '-p', str(self.port),
-                '--with-threads',
-                '--reload',
-                '--debugger'
-            ]
+            if not production:
+                cmd = [
+                    'superset', 'run',
+                    '-p', str(self.port),
+                    '--with-threads',
+                    '--reload',
+                    '--debugger'
+                ]
+                
+                if background:
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
+                    self.logger.info(f"Server started in background (PID: {process.pid})")
+                    return process
+                else:
+                    subprocess.run(cmd)
+                    return None
+            
+            cmd = self._production_command(workers, threads, timeout, preload, max_requests)
+            if cmd is None:
+                return None
+            
+            env = os.environ.copy()
+            env.setdefault('SUPERSET_CONFIG_PATH', str(Path(__file__).parent.parent.parent / 'config' / 'superset_config.py'))
+            
+            started = time.perf_counter()
+            process = subprocess.Popen(cmd, env=env)
+            self.logger.info(f"Production server started (PID: {process.pid}): {' '.join(cmd)}")
+            
+            latency = self.wait_until_healthy(health_timeout, process=process, started=started)
+            if latency is None:
+                self.logger.error("Server did not pass the health check, stopping it")
+                self.stop_server(process, timeout)
+                return None
             
             if background:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                self.logger.info(f"Server started in background (PID: {process.pid})")
                 return process
-            else:
-                subprocess.run(cmd)
-                return None
+            
+            try:
+                process.wait()
+            except KeyboardInterrupt:
+                self.stop_server(process, timeout)
+            return None
                 
         except Exception as e:
             self.logger.error(f"Error starting server: {str(e)}")
             return None
     
+    def _production_command(self, workers: Optional[int], threads: int, timeout: int,
+                            preload: bool, max_requests: int) -> Optional[List[str]]:
+        """Command line of the production WSGI server, or None if none is installed"""
+        if shutil.which('gunicorn') and os.name != 'nt':
+            workers = workers or 2 * (os.cpu_count() or 1) + 1
+            cmd = [
+                'gunicorn',
+                '--bind', f"{self.host}:{self.port}",
+                '--workers', str(workers),
+                '--worker-class', 'gthread',
+                '--threads', str(threads),
+                '--timeout', str(timeout),
+                '--graceful-timeout', str(timeout),
+                '--max-requests', str(max_requests),
+                '--max-requests-jitter', str(max(max_requests // 10, 1)),
+                # Explore and dashboard URLs carry the chart form data in the
+                # query string; 8190 is the largest bound gunicorn accepts
+                '--limit-request-line', '8190',
+            ]
+            if preload:
+                cmd.append('--preload')
+            self.preloaded = preload
+            cmd.append(self.PRODUCTION_APP)
+            return cmd
+        
+        if shutil.which('waitress-serve'):
+            # waitress is a single process; give it the threads of every worker
+            workers = workers or (os.cpu_count() or 1)
+            return [
+                'waitress-serve',
+                '--host', self.host,
+                '--port', str(self.port),
+                '--threads', str(workers * threads),
+                '--channel-timeout', str(timeout),
+                '--call', self.PRODUCTION_APP.rstrip('()'),
+            ]
+        
+        self.logger.error("No production WSGI server found. Install with: pip install gunicorn "
+                          "(or pip install waitress on Windows)")
+        return None
+    
+    def health_check(self, timeout: float = 5.0) -> bool:
+        """Check that the server answers its health endpoint
+        
+        Args:
+            timeout: Request timeout in seconds
+            
+        Returns:
+            True if the server reports OK
+        """
+        try:
+            with urllib.request.urlopen(f"{self.base_url}{self.HEALTH_ENDPOINT}", timeout=timeout) as response:
+                return response.status == 200 and response.read().strip() == b'OK'
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+    
+    def wait_until_healthy(self, timeout: float = 120.0, interval: float = 0.5,
+                           process: Optional[subprocess.Popen] = None,
+                           started: Optional[float] = None) -> Optional[float]:
+        """Wait for the server to pass the health check
+        
+        Args:
+            timeout: Seconds to wait
+            interval: Seconds between checks
+            process: Server process; waiting stops early if it exits
+            started: time.perf_counter() value the latency is measured from
+            
+        Returns:
+            Startup latency in seconds, or None on timeout or exit
+        """
+        started = started if started is not None else time.perf_counter()
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process is not None and process.poll() is not None:
+                self.logger.error(f"Server exited during startup (code {process.returncode})")
+                return None
+            if self.health_check(timeout=interval * 4):
+                self.startup_seconds = time.perf_counter() - started
+                self.logger.info(f"Server healthy after {self.startup_seconds:.2f}s")
+                return self.startup_seconds
+            time.sleep(interval)
+        self.logger.error(f"Server not healthy after {timeout:.0f}s")
+        return None
+    
+    def reload_server(self, process: subprocess.Popen) -> bool:
+        """Gracefully restart the workers of a production server
+        
+        gunicorn starts new workers and lets the old ones finish their
+        requests, without dropping connections. Without preload the new
+        workers import the code and configuration again. With preload
+        (the start_server default) they are forked from the app already
+        loaded in the master, so changes are not picked up: restart with
+        stop_server and start_server instead.
+        
+        Args:
+            process: Server process returned by start_server
+            
+        Returns:
+            True if the restart was requested
+        """
+        if not hasattr(signal, 'SIGHUP') or process.poll() is not None:
+            self.logger.error("Graceful restart is not available for this server")
+            return False
+        if self.preloaded:
+            self.logger.warning("Server started with preload: workers restart with the code already loaded")
+        process.send_signal(signal.SIGHUP)
+        self.logger.info(f"Graceful restart requested (PID: {process.pid})")
+        return True
+    
+    def stop_server(self, process: subprocess.Popen, timeout: float = 30.0):
+        """Stop a server, letting in-flight requests finish
+        
+        Args:
+            process: Server process returned by start_server
+            timeout: Seconds to wait before killing it
+        """
+        if process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        self.logger.info(f"Server stopped (PID: {process.pid})")
+    
+    def add_database(self, database_name: str, uri: str) -> bool:
+        """Register a database connection in Superset
+        
+        Args:
+            database_name: Name shown in Superset
+            uri: SQLAlchemy URI
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            result = subprocess.run(
+                ['superset', 'set-database-uri', '-d', database_name, '-u', uri],
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            
+            if result.returncode == 0:
+                self.logger.info(f"Database registered: {database_name}")
+                return True
+            else:
+                self.logger.error(f"Database registration failed: {result.stderr}")
+                return False
+        
+        except Exception as e:
+            self.logger.error(f"Error registering database: {str(e)}")
+            return False
+    
+    def setup_analytics_database(self, query_engine, db_path: str = "data/database/dibie_analytics.duckdb",
+                                 database_name: str = "DIBIE Analytics") -> Optional[str]:
+        """Export the normalized tables to DuckDB and register it in Superset
+        
+        Requires the duckdb-engine SQLAlchemy driver in the Superset
+        environment.
+        
+        Args:
+            query_engine: QueryEngine over the normalized tables
+            db_path: DuckDB file to create
+            database_name: Name shown in Superset
+        
+        Returns:
+            SQLAlchemy URI if successful, None otherwise
+        """
+        try:
+            uri = query_engine.export_database(db_path)
+        except Exception as e:
+            self.logger.error(f"Error exporting analytics database: {str(e)}")
+            return None
+        
+        return uri if self.add_database(database_name, uri) else None
+    
+    def login(self, username: str, password: str) -> bool:
+        """Open an authenticated REST API session
+        
+        Args:
+            username: Superset user
+            password: Superset password
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        self._api_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        try:
+            tokens = self._api_request('POST', '/api/v1/security/login', {
+                "username": username,
+                "password": password,
+                "provider": "db",
+                "refresh": True
+            })
+            self._api_headers["Authorization"] = f"Bearer {tokens['access_token']}"
+            csrf = self._api_request('GET', '/api/v1/security/csrf_token/')
+            self._api_headers["X-CSRFToken"] = csrf["result"]
+            self._api_headers["Referer"] = self.base_url
+            self.logger.info(f"Logged in to Superset API as {username}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Superset API login failed: {str(e)}")
+            self._opener = None
+            return False
+    
+    def _api_request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        """Call the Superset REST API and return the decoded JSON response"""
+        if getattr(self, '_opener', None) is None:
+            raise RuntimeError("Not logged in to the Superset API")
+        
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers=self._api_headers)
+        with self._opener.open(request, timeout=300) as response:
+            body = response.read()
+        return json.loads(body) if body else {}
+    
+    @staticmethod
+    def table_fingerprints(db_path: str, tables: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Content fingerprint of SQLite tables
+        
+        Args:
+            db_path: SQLite database
+            tables: Tables to fingerprint (every table if None)
+        
+        Returns:
+            Dictionary of table name to hex digest
+        """
+        conn = SQLiteProfile().connect(db_path, read_only=True)
+        try:
+            if tables is None:
+                tables = [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )]
+            fingerprints = {}
+            for table in tables:
+                sha = hashlib.sha256()
+                try:
+                    cursor = conn.execute(f'SELECT * FROM "{table}"')
+                except sqlite3.OperationalError:
+                    continue
+                sha.update(repr([column[0] for column in cursor.description]).encode('utf-8'))
+                while True:
+                    rows = cursor.fetchmany(10_000)
+                    if not rows:
+                        break
+                    sha.update(repr(rows).encode('utf-8'))
+                fingerprints[table] = sha.hexdigest()
+            return fingerprints
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def view_dependencies(db_path: str) -> Dict[str, Set[str]]:
+        """Base tables each SQLite view reads, following views of views
+        
+        Args:
+            db_path: SQLite database
+        
+        Returns:
+            Dictionary of view name to the set of tables it depends on
+        """
+        conn = SQLiteProfile().connect(db_path, read_only=True)
+        try:
+            views = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall())
+        finally:
+            conn.close()
+        
+        references = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+        direct = {name: set(references.findall(sql or '')) for name, sql in views.items()}
+        
+        def resolve(name: str, seen: Set[str]) -> Set[str]:
+            tables = set()
+            for ref in direct.get(name, ()):
+                if ref in direct and ref not in seen:
+                    tables |= resolve(ref, seen | {ref})
+                elif ref not in direct:
+                    tables.add(ref)
+            return tables
+        
+        return {name: resolve(name, {name}) for name in direct}
+    
+    def affected_datasets(self, changed_tables: Iterable[str], db_path: str,
+                          config_path: str = "data/database/superset_dashboards_config.json") -> List[str]:
+        """Dashboard datasources whose data depends on changed tables
+        
+        Args:
+            changed_tables: Tables rewritten by a sync
+            db_path: SQLite database behind the datasources
+            config_path: Dashboard configuration with slices and datasources
+        
+        Returns:
+            Datasource names in configuration order
+        """
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        changed = set(changed_tables)
+        dependencies = self.view_dependencies(db_path)
+        datasets = []
+        for dashboard in config.get("dashboards", []):
+            for chart in dashboard.get("slices", []):
+                name = chart.get("datasource")
+                if not name or name in datasets:
+                    continue
+                if name in changed or dependencies.get(name, set()) & changed:
+                    datasets.append(name)
+        return datasets
+    
+    def invalidate_datasets(self, datasets: List[str], database_name: str) -> bool:
+        """Drop the cached chart data of some datasets
+        
+        Args:
+            datasets: Dataset (table or view) names
+            database_name: Superset database holding the datasets
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not datasets:
+            return True
+        try:
+            self._api_request('POST', '/api/v1/cachekey/invalidate', {
+                "datasources": [
+                    {
+                        "datasource_name": name,
+                        "database_name": database_name,
+                        "schema": None,
+                        "datasource_type": "table"
+                    }
+                    for name in datasets
+                ]
+            })
+            self.logger.info(f"Invalidated cache of {len(datasets)} datasets")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error invalidating cache: {str(e)}")
+            return False
+    
+    def warm_up_datasets(self, datasets: List[str], database_name: str, max_workers: int = 4) -> Dict[str, bool]:
+        """Run the chart queries of some datasets so their results are cached
+        
+        Each dataset is warmed through Superset, which executes the query of
+        every chart built on it and stores the result in DATA_CACHE_CONFIG.
+        
+        Args:
+            datasets: Dataset (table or view) names
+            database_name: Superset database holding the datasets
+            max_workers: Datasets warmed in parallel
+        
+        Returns:
+            Dictionary of dataset name to success
+        """
+        def warm(name: str) -> bool:
+            try:
+                response = self._api_request('PUT', '/api/v1/dataset/warm_up_cache', {
+                    "db_name": database_name,
+                    "table_name": name
+                })
+                failed = [item for item in response.get("result", []) if item.get("viz_error")]
+                for item in failed:
+                    self.logger.warning(f"Warm-up error in {name} chart {item.get('chart_id')}: {item['viz_error']}")
+                return not failed
+            except Exception as e:
+                self.logger.error(f"Error warming up {name}: {str(e)}")
+                return False
+        
+        if not datasets:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(datasets, executor.map(warm, datasets)))
+        
+        self.logger.info(f"Warmed up {sum(results.values())}/{len(results)} datasets")
+        return results
+    
+    def refresh_after_sync(self, changed_tables: Iterable[str], db_path: str,
+                           config_path: str = "data/database/superset_dashboards_config.json",
+                           max_workers: int = 4) -> Dict:
+        """Invalidate and re-warm the dashboards affected by a sync
+        
+        Requires an API session (see login()).
+        
+        Args:
+            changed_tables: Tables whose content changed in the sync
+            db_path: SQLite database behind the dashboards
+            config_path: Dashboard configuration with slices and datasources
+            max_workers: Datasets warmed in parallel
+        
+        Returns:
+            Summary with the affected datasets and warm-up results
+        """
+        # Read twice below; a generator would be empty the second time
+        changed_tables = list(changed_tables)
+        with open(config_path, 'r', encoding='utf-8') as f:
+            database_name = json.load(f).get("database", {}).get("name", "DIBIE Financiero")
+        
+        datasets = self.affected_datasets(changed_tables, db_path, config_path)
+        summary = {"changed_tables": sorted(changed_tables), "datasets": datasets, "warmed": {}}
+        if not datasets:
+            self.logger.info("No dashboard datasets affected by the sync")
+            return summary
+        
+        summary["invalidated"] = self.invalidate_datasets(datasets, database_name)
+        summary["warmed"] = self.warm_up_datasets(datasets, database_name, max_workers)
+        return summary
+    
     def get_connection_info(self) -> Dict:
         """Get Superset connection information
         
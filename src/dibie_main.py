@@ -2,83 +2,148 @@
 DIBIE - Main Orchestrator
 Main entry point for the DIBIE framework
 """
+import argparse
+import importlib
 import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
-import logging
+from typing import Any, Dict, List, Optional
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    from .log_config import configure_logging, get_logger
+    from .profiling import add_profile_arguments, profile_run
+    from .telemetry import telemetry, timed
+except ImportError:
+    # Run as a script: src/ is on sys.path
+    from log_config import configure_logging, get_logger
+    from profiling import add_profile_arguments, profile_run
+    from telemetry import telemetry, timed
 
-from ingestion.google_drive_connector import GoogleDriveConnector
-from ingestion.table_loader import TableLoader
-from ingestion.document_processor import DocumentProcessor
-from analysis.kusto_analyzer import KustoAnalyzer
-from analysis.eventstream_manager import EventStreamManager
-from analysis.data_quality_analyzer import DataQualityAnalyzer
-from dashboard.dashboard_generator import DashboardGenerator
+
+def _import(module_name: str):
+    """Import a DIBIE module, inside the src package when loaded from it"""
+    if __package__:
+        return importlib.import_module(f".{module_name}", __package__)
+    return importlib.import_module(module_name)
+
+
+def _profile_file_worker(file_path: str, chunksize: int, profile_options: Dict,
+                         state_path: Optional[str] = None):
+    """Profile one file in a worker process
+    
+    Returns the profile, or the path it was saved to when state_path is set.
+    """
+    loader = _import("ingestion.table_loader").TableLoader()
+    analyzer = _import("analysis.data_quality_analyzer").DataQualityAnalyzer()
+    profile = analyzer.profile_chunks(loader.iter_chunks(file_path, chunksize), **profile_options)
+    
+    if state_path:
+        return profile.save(state_path)
+    return profile
 
 
 class DIBIEOrchestrator:
-    """Main orchestrator for DIBIE framework"""
+    """Main orchestrator for DIBIE framework
+    
+    Components are created on first access, so a command only imports,
+    configures and opens logs for the components it uses. Each JSON config
+    file is parsed once and shared by the components that read it.
+    """
     
-    def __init__(self):
-        """Initialize DIBIE orchestrator"""
-        self.logger = self._setup_logger()
-        self.initialize_components()
+    # Attribute name -> (module, class, config file passed as ``config``)
+    COMPONENTS = {
+        "drive_connector": ("ingestion.google_drive_connector", "GoogleDriveConnector", "config/paths.json"),
+        "table_loader": ("ingestion.table_loader", "TableLoader", None),
+        "document_processor": ("ingestion.document_processor", "DocumentProcessor", None),
+        "kusto_analyzer": ("analysis.kusto_analyzer", "KustoAnalyzer", "config/analysis.json"),
+        "eventstream_manager": ("analysis.eventstream_manager", "EventStreamManager", "config/analysis.json"),
+        "quality_analyzer": ("analysis.data_quality_analyzer", "DataQualityAnalyzer", None),
+        "dashboard_generator": ("dashboard.dashboard_generator", "DashboardGenerator", "config/dashboard.json"),
+    }
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup main logger"""
-        logger = logging.getLogger('DIBIE')
-        logger.setLevel(logging.INFO)
+    def __init__(self, eager: bool = False):
+        """Initialize DIBIE orchestrator
         
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+        Args:
+            eager: Create every component now instead of on first access
+        """
+        started = time.perf_counter()
+        self.logger = get_logger('DIBIE')
+        self._configs: Dict[str, Dict] = {}
+        self.component_seconds: Dict[str, float] = {}
+        if eager:
+            self.initialize_components()
+        self.startup_seconds = time.perf_counter() - started
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set yet, i.e. components not created
+        if name in type(self).COMPONENTS:
+            return self._create_component(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def config(self, config_path: str) -> Dict:
+        """Parsed JSON config, read once per orchestrator
         
-        # File handler
-        file_handler = logging.FileHandler('logs/dibie_main.log')
-        file_handler.setLevel(logging.DEBUG)
+        Args:
+            config_path: Path to the configuration file
         
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
+        Returns:
+            Configuration dictionary ({} if the file does not exist)
+        """
+        if config_path not in self._configs:
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    self._configs[config_path] = json.load(f)
+            except FileNotFoundError:
+                self._configs[config_path] = {}
+        return self._configs[config_path]
+    
+    def _create_component(self, name: str) -> Any:
+        """Import, create and store a component"""
+        module_name, class_name, config_path = self.COMPONENTS[name]
+        started = time.perf_counter()
         
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        component_class = getattr(_import(module_name), class_name)
+        kwargs = {"config": self.config(config_path)} if config_path else {}
+        component = component_class(**kwargs)
+        setattr(self, name, component)
         
-        return logger
+        self.component_seconds[name] = time.perf_counter() - started
+        self.logger.debug(f"Initialized {class_name} in {self.component_seconds[name] * 1000:.1f} ms")
+        return component
     
     def initialize_components(self):
         """Initialize all DIBIE components"""
         self.logger.info("Initializing DIBIE components...")
         
         try:
-            self.drive_connector = GoogleDriveConnector()
-            self.table_loader = TableLoader()
-            self.document_processor = DocumentProcessor()
-            self.kusto_analyzer = KustoAnalyzer()
-            self.eventstream_manager = EventStreamManager()
-            self.quality_analyzer = DataQualityAnalyzer()
-            self.dashboard_generator = DashboardGenerator()
+            for name in self.COMPONENTS:
+                getattr(self, name)
             
             self.logger.info("All components initialized successfully")
         except Exception as e:
             self.logger.error(f"Error initializing components: {str(e)}")
             raise
     
-    def process_data_pipeline(self, file_pattern: str = "*.csv") -> Dict:
+    @timed("orchestrator.process_data_pipeline")
+    def process_data_pipeline(self, file_pattern: str = "*.csv", approximate: bool = False,
+                              incremental: bool = False) -> Dict:
         """Run complete data pipeline
         
         Args:
             file_pattern: Pattern for files to process
-            
+            approximate: Profile files in one streaming pass with sketches
+                instead of loading them whole
+            incremental: Keep profile state between runs and profile only rows
+                appended to CSV/TXT files since the previous run
+
         Returns:
             Pipeline results
         """
         self.logger.info(f"Starting data pipeline for pattern: {file_pattern}")
+        AppendTracker = _import("analysis.append_tracker").AppendTracker
         
         results = {
             "files_processed": 0,
@@ -103,15 +168,34 @@ class DIBIEOrchestrator:
             # 3. Process each file
             for file_path in files[:5]:  # Limit to 5 files for demo
                 try:
-                    # Load table
-                    df = self.table_loader.load_table(file_path)
-                    table_info = self.table_loader.get_table_info(df)
-                    
-                    # Analyze quality
-                    quality_report = self.quality_analyzer.generate_quality_report(
-                        df, 
-                        Path(file_path).stem
-                    )
+                    if incremental and Path(file_path).suffix.lower() in AppendTracker.APPENDABLE_FORMATS:
+                        quality_report = self.quality_analyzer.generate_incremental_report(file_path)
+                        table_info = {
+                            "rows": quality_report["record_count"],
+                            "columns": quality_report["column_count"],
+                            "column_names": list(quality_report["data_types"].keys())
+                        }
+                    elif approximate or incremental:
+                        # Stream the table through the sketches
+                        quality_report = self.quality_analyzer.generate_approximate_report(
+                            self.table_loader.iter_chunks(file_path),
+                            Path(file_path).stem
+                        )
+                        table_info = {
+                            "rows": quality_report["record_count"],
+                            "columns": quality_report["column_count"],
+                            "column_names": list(quality_report["data_types"].keys())
+                        }
+                    else:
+                        # Load table
+                        df = self.table_loader.load_table(file_path)
+                        table_info = self.table_loader.get_table_info(df)
+                        
+                        # Analyze quality
+                        quality_report = self.quality_analyzer.generate_quality_report(
+                            df, 
+                            Path(file_path).stem
+                        )
                     
                     results["tables_loaded"].append({
                         "file": file_path,
@@ -153,6 +237,51 @@ class DIBIEOrchestrator:
         
         return results
     
+    def profile_files_parallel(self, file_paths: List[str], dataset_name: str,
+                               workers: Optional[int] = None, chunksize: int = 100_000,
+                               state_dir: Optional[str] = None, **profile_options) -> Dict:
+        """Profile the files of one dataset in parallel and merge the results
+        
+        Each file is profiled in its own worker process; the partial profiles
+        are reduced into a single quality report. With state_dir, partial
+        profiles are also written to disk so that profiles computed on other
+        machines sharing the filesystem can be merged with
+        DataQualityAnalyzer.generate_merged_report.
+        
+        Args:
+            file_paths: Files holding disjoint parts of the dataset
+            dataset_name: Name of the dataset
+            workers: Number of worker processes (defaults to CPU count)
+            chunksize: Rows per chunk read by each worker
+            state_dir: Directory for partial profile files
+            **profile_options: Sketch parameters passed to TableProfile
+            
+        Returns:
+            Quality report over all files
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        workers = workers or os.cpu_count() or 1
+        self.logger.info(f"Profiling {len(file_paths)} files for {dataset_name} with {workers} workers")
+        
+        state_paths = [None] * len(file_paths)
+        if state_dir:
+            state_paths = [
+                str(Path(state_dir) / f"{dataset_name}_{i:04d}_{Path(p).stem}.profile")
+                for i, p in enumerate(file_paths)
+            ]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                _profile_file_worker,
+                file_paths,
+                [chunksize] * len(file_paths),
+                [profile_options] * len(file_paths),
+                state_paths
+            ))
+        
+        return self.quality_analyzer.generate_merged_report(partials, dataset_name)
+    
     def generate_summary_dashboard(self) -> str:
         """Generate a summary dashboard of all processed data
         
@@ -187,41 +316,87 @@ class DIBIEOrchestrator:
         self.logger.info(f"Summary dashboard generated: {output_path}")
         return output_path
     
-    def get_system_status(self) -> Dict:
+    def get_system_status(self, telemetry_window: int = 10_000) -> Dict:
         """Get status of all DIBIE components
         
+        Args:
+            telemetry_window: Number of most recent spans in the metrics
+                file to summarize
+        
         Returns:
             System status dictionary
         """
+        states = {
+            "drive_connector": "active",
+            "table_loader": "active",
+            "document_processor": "active",
+            "kusto_analyzer": "configured",
+            "eventstream_manager": "configured",
+            "quality_analyzer": "active",
+            "dashboard_generator": "active"
+        }
         return {
             "google_drive_accessible": self.drive_connector.is_drive_accessible(),
             "google_drive_path": self.drive_connector.get_drive_path(),
+            # Components not used yet are created on first access
             "components": {
-                "drive_connector": "active",
-                "table_loader": "active",
-                "document_processor": "active",
-                "kusto_analyzer": "configured",
-                "eventstream_manager": "configured",
-                "quality_analyzer": "active",
-                "dashboard_generator": "active"
+                name: state if name in self.__dict__ else "idle"
+                for name, state in states.items()
+            },
+            "startup_ms": round(self.startup_seconds * 1000, 1),
+            "component_init_ms": {
+                name: round(seconds * 1000, 1) for name, seconds in self.component_seconds.items()
+            },
+            # Where pipeline time went, across every process writing the metrics file
+            "telemetry": {
+                "metrics_file": str(telemetry.metrics_file) if telemetry.metrics_file else None,
+                "spans": telemetry.summary(telemetry_window),
             },
             "framework_version": "1.0.0"
         }
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point"""
-    print("=" * 60)
-    print("DIBIE - Data Intelligence Business Intelligence Engine")
-    print("=" * 60)
+    parser = argparse.ArgumentParser(description="DIBIE - Data Intelligence Business Intelligence Engine")
+    parser.add_argument('--status', action='store_true', help="Print the system status and exit")
+    parser.add_argument('--log-level', help="Level of log messages printed to the console "
+                                            "(default: logs.console_level in config/paths.json)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    configure_logging(console_level=args.log_level)
+    
+    with profile_run("dibie_main", args):
+        _run(args)
+
+
+def _run(args: argparse.Namespace):
+    """Run the entry point with parsed arguments"""
+    started = time.perf_counter()
     
     # Initialize orchestrator
     orchestrator = DIBIEOrchestrator()
     
     # Get system status
     status = orchestrator.get_system_status()
+    if args.status:
+        status["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+        return
+    
+    print("=" * 60)
+    print("DIBIE - Data Intelligence Business Intelligence Engine")
+    print("=" * 60)
     print(f"\nGoogle Drive Accessible: {status['google_drive_accessible']}")
     print(f"Google Drive Path: {status['google_drive_path']}")
+    print(f"Startup: {status['startup_ms']:.1f} ms")
+    
+    spans = status["telemetry"]["spans"]
+    if spans:
+        print(f"\nSlowest operations ({status['telemetry']['metrics_file']}):")
+        for name, stats in list(spans.items())[:10]:
+            print(f"  {name:40s} {stats['count']:>5} runs {stats['total_s']:>10.2f}s total "
+                  f"{stats['p95_s']:>8.2f}s p95")
     
     # Generate overview dashboard
     print("\nGenerating overview dashboard...")
@@ -0,0 +1,485 @@
+"""
+DIBIE - Columnar Store
+Canonical partitioned Parquet store for the normalized tables
+"""
+import json
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+from .sqlite_profile import SQLiteProfile
+
+
+class ColumnarStore:
+    """Partitioned Parquet datasets with persisted schemas
+    
+    Each table is a hive-partitioned Parquet dataset under ``root/<table>``.
+    Fact tables are partitioned by year and institution, low-cardinality
+    text columns are dictionary encoded, and the Arrow schema of every table
+    is stored next to its data so later writes are cast to it.
+    
+    Reads go through pyarrow datasets: only the requested columns are
+    decoded, partition filters skip whole directories and other filters are
+    checked against row-group statistics before rows are read.
+    """
+    
+    # Declared layout of the normalized tables; other tables are inferred
+    TABLES = {
+        "hechos_matricula": {
+            "partition_cols": ["anio", "dane_institucion"],
+            "schema": {
+                "anio": "int32",
+                "dane_institucion": "string",
+                "grado_codigo": "category",
+                "grado_nombre": "category",
+                "nivel_educativo": "category",
+                "cantidad_estudiantes": "int64"
+            }
+        },
+        "hechos_financieros": {
+            "partition_cols": ["fecha_id", "institucion_id"],
+            "schema": {"hecho_id": "int64", "fecha_id": "int32", "institucion_id": "int64"}
+        },
+        "dim_tiempo": {
+            "partition_cols": ["ano", "institucion_id"],
+            "schema": {"fecha_id": "int32", "ano": "int32", "institucion_id": "int64", "periodo": "category"}
+        },
+        "dim_grados": {
+            "schema": {"grado_codigo": "string", "nivel_educativo": "category"}
+        },
+        "maestro_instituciones": {
+            "schema": {"iebm_id": "int64", "municipio": "category", "departamento": "category"}
+        },
+        "ubicacion_geografica": {
+            "schema": {"institucion_id": "int64", "municipio": "category", "departamento": "category"}
+        }
+    }
+    
+    # Text columns with at most this share of distinct values are dictionary encoded
+    CATEGORY_RATIO = 0.5
+    
+    TYPE_NAMES = {
+        "string": "string",
+        "int32": "int32",
+        "int64": "int64",
+        "float64": "float64",
+        "bool": "bool_",
+        "timestamp": "timestamp"
+    }
+    
+    def __init__(self, root: str = "data/normalized/store"):
+        """Initialize columnar store
+        
+        Args:
+            root: Directory holding one dataset per table
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow is required for ColumnarStore: pip install pyarrow")
+        
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.catalog_path = self.root / "catalog.json"
+        self.imports_path = self.root / "_imports.json"
+        self.logger = get_logger('ColumnarStore')
+    
+    def load_catalog(self) -> Dict:
+        """Load the table catalog
+        
+        Returns:
+            Mapping of table name to columns, types, partitions and row count
+        """
+        if not self.catalog_path.exists():
+            return {}
+        with open(self.catalog_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def tables(self) -> List[str]:
+        """Names of the stored tables"""
+        return sorted(self.load_catalog())
+    
+    def has_table(self, name: str) -> bool:
+        """Check whether a table is stored"""
+        return name in self.load_catalog()
+    
+    def schema(self, name: str):
+        """Arrow schema of a stored table
+        
+        Args:
+            name: Table name
+        
+        Returns:
+            pyarrow.Schema
+        """
+        import pyarrow as pa
+        
+        schema_path = self.root / name / "_schema.arrow"
+        if not schema_path.exists():
+            raise FileNotFoundError(f"Table not in store: {name}")
+        with pa.memory_map(str(schema_path), 'r') as source:
+            return pa.ipc.read_schema(source)
+    
+    def write_table(self, name: str, df: pd.DataFrame, partition_cols: Optional[List[str]] = None,
+                    schema: Optional[Dict[str, str]] = None, mode: str = "overwrite") -> Dict:
+        """Write a table to the store
+        
+        Args:
+            name: Table name
+            df: Rows to write
+            partition_cols: Partition columns (declared layout if None)
+            schema: Column types ("string", "int32", "int64", "float64", "bool",
+                "timestamp", "category"); merged over the declared schema
+            mode: "overwrite" replaces the table, "partitions" replaces only the
+                partitions present in df, "append" adds files to the table
+        
+        Returns:
+            Catalog entry of the table
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if mode not in ("overwrite", "partitions", "append"):
+            raise ValueError(f"Unsupported write mode: {mode}")
+        
+        layout = self.TABLES.get(name, {})
+        table_dir = self.root / name
+        catalog = self.load_catalog()
+        
+        if mode != "overwrite" and name in catalog:
+            arrow_schema = self.schema(name)
+            partition_cols = catalog[name]["partition_cols"]
+        else:
+            if partition_cols is None:
+                partition_cols = [col for col in layout.get("partition_cols", []) if col in df.columns]
+            declared = {**layout.get("schema", {}), **(schema or {})}
+            arrow_schema = self._build_schema(df, declared, partition_cols)
+        
+        fields = [field for field in arrow_schema if field.name in df.columns]
+        table = pa.Table.from_pandas(
+            self._coerce_text(df[[field.name for field in fields]], fields),
+            schema=pa.schema(fields),
+            preserve_index=False
+        )
+        
+        if mode == "overwrite" and table_dir.exists():
+            shutil.rmtree(table_dir)
+        table_dir.mkdir(parents=True, exist_ok=True)
+        
+        pq.write_to_dataset(
+            table,
+            root_path=str(table_dir),
+            partition_cols=partition_cols or None,
+            existing_data_behavior="delete_matching" if mode == "partitions" else "overwrite_or_ignore",
+            basename_template=f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{{i}}.parquet"
+        )
+        
+        with open(table_dir / "_schema.arrow", 'wb') as f:
+            f.write(arrow_schema.serialize().to_pybytes())
+        
+        catalog[name] = {
+            "columns": arrow_schema.names,
+            "types": {field.name: str(field.type) for field in arrow_schema},
+            "partition_cols": partition_cols,
+            "rows": self._dataset(name, partition_cols).count_rows(),
+            "updated": datetime.now().isoformat()
+        }
+        with open(self.catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(catalog, f, indent=2, ensure_ascii=False)
+        
+        self.logger.info(f"Stored {name}: {len(df)} rows ({mode}), partitions {partition_cols}")
+        return catalog[name]
+    
+    def import_directory(self, source_dir: str = "data/normalized", force: bool = False) -> List[str]:
+        """Load legacy per-table Parquet/CSV files into the store
+        
+        Parquet is preferred when both copies of a table exist. Each legacy
+        file is imported once: the files are no longer refreshed, so a table
+        dropped from the store is not filled back from a stale copy. A
+        warning is logged when a legacy file is newer than the stored table,
+        which means something still writes the old layout.
+        
+        Args:
+            source_dir: Directory with <table>.parquet or <table>.csv files
+            force: Re-import tables that are already stored or were imported
+                before
+        
+        Returns:
+            Names of imported tables
+        """
+        source = Path(source_dir)
+        stored = self.load_catalog()
+        done = self._load_imports()
+        imported = []
+        
+        for path in sorted(source.glob("*.parquet")) + sorted(source.glob("*.csv")):
+            name = path.stem
+            if name in imported:
+                continue
+            key = str(path.resolve())
+            modified = datetime.fromtimestamp(path.stat().st_mtime)
+            if not force:
+                if name in stored:
+                    if modified > datetime.fromisoformat(stored[name]["updated"]):
+                        self.logger.warning(
+                            f"Legacy file {path} is newer than stored table {name}; "
+                            f"not imported (use force=True to replace the table)"
+                        )
+                    continue
+                if key in done:
+                    continue
+            df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+            self.write_table(name, df)
+            done[key] = modified.isoformat()
+            imported.append(name)
+        
+        if imported:
+            with open(self.imports_path, 'w', encoding='utf-8') as f:
+                json.dump(done, f, indent=2, ensure_ascii=False)
+        return imported
+    
+    def _load_imports(self) -> Dict[str, str]:
+        """Legacy files already imported, with their modification times"""
+        if not self.imports_path.exists():
+            return {}
+        with open(self.imports_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def read(self, name: str, columns: Optional[List[str]] = None,
+             filters: Optional[Union[Dict, List]] = None) -> pd.DataFrame:
+        """Read a table
+        
+        Args:
+            name: Table name
+            columns: Columns to read (all if None)
+            filters: {column: value or list of values} or a list of
+                (column, op, value) tuples with op in ==, !=, <, <=, >, >=, in
+        
+        Returns:
+            DataFrame
+        """
+        dataset = self._dataset(name)
+        table = dataset.to_table(columns=columns, filter=self._expression(filters))
+        return table.to_pandas()
+    
+    def iter_batches(self, name: str, columns: Optional[List[str]] = None,
+                     filters: Optional[Union[Dict, List]] = None,
+                     batch_size: int = 65_536) -> Iterator[pd.DataFrame]:
+        """Stream a table in record batches
+        
+        Args:
+            name: Table name
+            columns: Columns to read (all if None)
+            filters: Row filters, as in read()
+            batch_size: Maximum rows per batch
+        
+        Yields:
+            DataFrames of rows
+        """
+        dataset = self._dataset(name)
+        for batch in dataset.to_batches(columns=columns, filter=self._expression(filters),
+                                        batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    
+    def export_delimited(self, name: str, output_path: str, sep: str = ',',
+                         columns: Optional[List[str]] = None,
+                         filters: Optional[Union[Dict, List]] = None) -> int:
+        """Export a table as CSV/TSV in one streaming scan
+        
+        Args:
+            name: Table name
+            output_path: Output file path
+            sep: Field separator (',' for Kusto CSV, '\\t' for TSV)
+            columns: Columns to export (all if None)
+            filters: Row filters, as in read()
+        
+        Returns:
+            Number of rows written
+        """
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        columns = columns or self.load_catalog()[name]["columns"]
+        
+        rows = 0
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            for batch in self.iter_batches(name, columns, filters):
+                batch.to_csv(f, sep=sep, index=False, header=rows == 0)
+                rows += len(batch)
+            if rows == 0:
+                f.write(sep.join(columns) + "\n")
+        
+        self.logger.info(f"Exported {name} to {output} ({rows} rows)")
+        return rows
+    
+    def export_sqlite(self, name: str, db_path: Union[str, sqlite3.Connection],
+                      table_name: Optional[str] = None, columns: Optional[List[str]] = None,
+                      filters: Optional[Union[Dict, List]] = None) -> int:
+        """Replace a SQLite table with the contents of a stored table
+        
+        A path is opened with the loader settings of SQLiteProfile (WAL).
+        The rows are staged and swapped in at the end, so dashboards keep
+        reading the previous table until the export is complete.
+        
+        Args:
+            name: Table name
+            db_path: SQLite database path or open connection
+            table_name: Target table (same name if None)
+            columns: Columns to export (all if None)
+            filters: Row filters, as in read()
+        
+        Returns:
+            Number of rows written
+        """
+        conn = db_path if isinstance(db_path, sqlite3.Connection) else SQLiteProfile().connect(db_path)
+        table_name = table_name or name
+        
+        try:
+            batches = (
+                batch.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+                for batch in self.iter_batches(name, columns, filters)
+            )
+            rows = SQLiteProfile().replace_table(conn, table_name, batches)
+        finally:
+            if conn is not db_path:
+                conn.close()
+        
+        self.logger.info(f"Exported {name} to SQLite table {table_name} ({rows} rows)")
+        return rows
+    
+    def sheet_values(self, name: str, columns: Optional[List[str]] = None,
+                     filters: Optional[Union[Dict, List]] = None) -> List[List[str]]:
+        """Rows of a table as strings for a Google Sheets update
+        
+        Args:
+            name: Table name
+            columns: Columns to export (all if None)
+            filters: Row filters, as in read()
+        
+        Returns:
+            Header row followed by data rows
+        """
+        df = self.read(name, columns, filters)
+        return [df.columns.tolist()] + df.astype(str).values.tolist()
+    
+    def _dataset(self, name: str, partition_cols: Optional[List[str]] = None):
+        """Open a stored table as a pyarrow dataset"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        if partition_cols is None:
+            catalog = self.load_catalog()
+            if name not in catalog:
+                raise FileNotFoundError(f"Table not in store: {name}")
+            partition_cols = catalog[name]["partition_cols"]
+        
+        schema = self.schema(name)
+        partitioning = None
+        if partition_cols:
+            partitioning = ds.partitioning(pa.schema([schema.field(col) for col in partition_cols]),
+                                           flavor="hive")
+        
+        return ds.dataset(str(self.root / name), schema=schema, format="parquet",
+                          partitioning=partitioning, exclude_invalid_files=False,
+                          ignore_prefixes=["_", "."])
+    
+    @staticmethod
+    def _expression(filters: Optional[Union[Dict, List]]):
+        """Build a pyarrow filter expression"""
+        import pyarrow.dataset as ds
+        
+        if not filters:
+            return None
+        
+        if isinstance(filters, dict):
+            filters = [
+                (col, "in", list(value)) if isinstance(value, (list, tuple, set)) else (col, "==", value)
+                for col, value in filters.items()
+            ]
+        
+        expression = None
+        for col, op, value in filters:
+            field = ds.field(col)
+            if op == "in":
+                condition = field.isin(list(value))
+            elif op == "==":
+                condition = field == value
+            elif op == "!=":
+                condition = field != value
+            elif op == "<":
+                condition = field < value
+            elif op == "<=":
+                condition = field <= value
+            elif op == ">":
+                condition = field > value
+            elif op == ">=":
+                condition = field >= value
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            expression = condition if expression is None else expression & condition
+        
+        return expression
+    
+    @staticmethod
+    def _coerce_text(df: pd.DataFrame, fields: List) -> pd.DataFrame:
+        """Render non-text values as strings in columns stored as text"""
+        import pyarrow as pa
+        
+        df = df.copy(deep=False)
+        for field in fields:
+            value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+            series = df[field.name]
+            if pa.types.is_string(value_type) and series.dtype != object and not pd.api.types.is_string_dtype(series):
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    series = series.astype(object)
+                df[field.name] = series.astype(object).where(series.isna(), series.astype(str))
+        return df
+    
+    def _build_schema(self, df: pd.DataFrame, declared: Dict[str, str], partition_cols: List[str]):
+        """Arrow schema from declared types, inferring the rest
+        
+        Partition columns are never dictionary encoded, since their values
+        live in directory names.
+        """
+        import pyarrow as pa
+        
+        fields = []
+        for col in df.columns:
+            series = df[col]
+            type_name = declared.get(col)
+            
+            if type_name is None:
+                is_text = series.dtype == object or pd.api.types.is_string_dtype(series)
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    type_name = "category"
+                elif is_text:
+                    distinct = series.nunique(dropna=True)
+                    type_name = "category" if len(series) and distinct <= len(series) * self.CATEGORY_RATIO else "string"
+            
+            if type_name == "category" and col in partition_cols:
+                type_name = "string"
+            
+            if type_name is None:
+                arrow_type = pa.Schema.from_pandas(df[[col]], preserve_index=False).field(col).type
+            elif type_name == "category":
+                arrow_type = pa.dictionary(pa.int32(), pa.string())
+            elif type_name == "timestamp":
+                arrow_type = pa.timestamp("us")
+            elif type_name in self.TYPE_NAMES:
+                arrow_type = getattr(pa, self.TYPE_NAMES[type_name])()
+            else:
+                raise ValueError(f"Unsupported column type for {col}: {type_name}")
+            
+            fields.append(pa.field(col, arrow_type))
+        
+        return pa.schema(fields)
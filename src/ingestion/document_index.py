@@ -0,0 +1,179 @@
+"""
+DIBIE - Document Index
+Full-text inverted index over processed documents (SQLite FTS5)
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class DocumentIndex:
+    """On-disk full-text index with BM25 ranking
+    
+    Documents are stored as passages in a regular table mirrored into an
+    external-content FTS5 table, so re-indexing a document only touches its
+    own rows and large documents can be indexed block by block.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            file_path TEXT,
+            indexed_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS passages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doc_id INTEGER NOT NULL,
+            body TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_passages_doc ON passages(doc_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+            body,
+            content='passages',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+            INSERT INTO passages_fts(rowid, body) VALUES (new.id, new.body);
+        END;
+        CREATE TRIGGER IF NOT EXISTS passages_ad AFTER DELETE ON passages BEGIN
+            INSERT INTO passages_fts(passages_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        END;
+    """
+    
+    def __init__(self, index_path: str = "data/documents/index.db"):
+        """Initialize document index
+        
+        Args:
+            index_path: Path to the SQLite index file
+        """
+        self.index_path = Path(index_path)
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the index on first use"""
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.index_path))
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+    
+    def add_document(self, name: str, passages: Iterable[str], file_path: str = "") -> int:
+        """Index a document, replacing any previous version with the same name
+        
+        Args:
+            name: Unique document name
+            passages: Text blocks of the document
+            file_path: Path to the source file
+        
+        Returns:
+            Number of passages indexed
+        """
+        count = 0
+        # One transaction: if reading the passages fails, the previous
+        # version is restored along with the rollback of the new rows
+        with self.conn:
+            self._delete(name)
+            cursor = self.conn.execute(
+                "INSERT INTO documents (name, file_path, indexed_at) VALUES (?, ?, ?)",
+                (name, file_path, datetime.now().isoformat())
+            )
+            doc_id = cursor.lastrowid
+            
+            for passage in passages:
+                if passage and passage.strip():
+                    self.conn.execute(
+                        "INSERT INTO passages (doc_id, body) VALUES (?, ?)",
+                        (doc_id, passage)
+                    )
+                    count += 1
+        
+        return count
+    
+    def remove_document(self, name: str) -> bool:
+        """Remove a document from the index
+        
+        Args:
+            name: Document name
+        
+        Returns:
+            True if the document was indexed
+        """
+        with self.conn:
+            return self._delete(name)
+    
+    def _delete(self, name: str) -> bool:
+        """Delete a document and its passages inside the caller's transaction"""
+        row = self.conn.execute("SELECT doc_id FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return False
+        self.conn.execute("DELETE FROM passages WHERE doc_id = ?", (row[0],))
+        self.conn.execute("DELETE FROM documents WHERE doc_id = ?", (row[0],))
+        return True
+    
+    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+        """Search the index
+        
+        Every term in the query must appear in a passage. Documents are ranked
+        by the BM25 score of their best matching passage.
+        
+        Args:
+            query: Free-text query
+            top_k: Maximum number of documents to return
+        
+        Returns:
+            List of matches with name, file_path, score and snippet
+        """
+        match = self._build_match_expression(query)
+        if not match or top_k <= 0:
+            return []
+        
+        cursor = self.conn.execute(
+            """
+            SELECT d.name, d.file_path, bm25(passages_fts) AS score,
+                   snippet(passages_fts, 0, '[', ']', '...', 16)
+            FROM passages_fts
+            JOIN passages p ON p.id = passages_fts.rowid
+            JOIN documents d ON d.doc_id = p.doc_id
+            WHERE passages_fts MATCH ?
+            ORDER BY score
+            """,
+            (match,)
+        )
+        
+        results = []
+        seen = set()
+        for name, file_path, score, snippet in cursor:
+            if name in seen:
+                continue
+            seen.add(name)
+            results.append({
+                "name": name,
+                "file_path": file_path,
+                # FTS5 returns negated BM25 so that lower sorts first
+                "score": -score,
+                "snippet": snippet
+            })
+            if len(results) >= top_k:
+                break
+        
+        return results
+    
+    def document_count(self) -> int:
+        """Number of indexed documents"""
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def close(self):
+        """Close the index connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    @staticmethod
+    def _build_match_expression(query: str) -> str:
+        """Quote each query term so user input never hits FTS5 syntax"""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"' for term in terms if term)
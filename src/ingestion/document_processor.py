@@ -3,9 +3,22 @@ DIBIE - Document Processor
 Process documents from Google Drive (Google Docs, PDFs, etc.)
 """
 import json
+import os
+import re
 from pathlib import Path
-from typing import Dict, List, Optional
-import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .document_index import DocumentIndex
+from .document_registry import DocumentRegistry
+
+try:
+    from ..log_config import get_logger
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+
+
+_LAST_SPACE = re.compile(r'\s\S*\Z')
 
 
 class DocumentProcessor:
@@ -19,6 +32,13 @@ class DocumentProcessor:
         '.gdoc': 'google_doc'
     }
     
+    # Streaming mode reads text in blocks of this many characters
+    STREAM_BLOCK_SIZE = 1024 * 1024
+    
+    # Line boundaries recognised by str.splitlines(); \r\n is already
+    # normalised to \n by universal newlines mode
+    LINE_BREAKS = ('\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029')
+    
     def __init__(self, output_dir: str = "data/documents"):
         """Initialize document processor
         
@@ -27,26 +47,23 @@ class DocumentProcessor:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.logger = self._setup_logger()
+        self.index = DocumentIndex(str(self.output_dir / "index.db"))
+        self.registry = DocumentRegistry(str(self.output_dir / "registry.db"))
+        self.logger = get_logger('DocumentProcessor')
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the document processor"""
-        logger = logging.getLogger('DocumentProcessor')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/document_processor.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
-    def process_text_file(self, file_path: str, encoding: str = 'utf-8') -> Dict:
+    def process_text_file(self, file_path: str, encoding: str = 'utf-8',
+                          streaming: bool = False, include_content: bool = True,
+                          block_size: Optional[int] = None) -> Dict:
         """Process a text file
         
         Args:
             file_path: Path to the text file
             encoding: File encoding
+            streaming: Compute statistics incrementally over fixed-size blocks
+                instead of reading the whole file into memory
+            include_content: Embed the file content in the result. Disable it
+                together with streaming to process large files in constant memory
+            block_size: Characters per block in streaming mode
             
         Returns:
             Dictionary with processed content
@@ -59,22 +76,88 @@ class DocumentProcessor:
         self.logger.info(f"Processing text file: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
+            if streaming:
+                stats, content = self._stream_text_stats(
+                    path, encoding, block_size or self.STREAM_BLOCK_SIZE, include_content
+                )
+            else:
+                with open(file_path, 'r', encoding=encoding) as f:
+                    content = f.read()
+                stats = {
+                    "word_count": len(content.split()),
+                    "char_count": len(content),
+                    "line_count": len(content.splitlines())
+                }
             
-            return {
+            result = {
                 "file_name": path.name,
                 "file_path": str(path),
-                "type": "text",
-                "content": content,
-                "word_count": len(content.split()),
-                "char_count": len(content),
-                "line_count": len(content.splitlines())
+                "type": "text"
             }
+            if include_content:
+                result["content"] = content
+            result.update(stats)
+            
+            return result
         except Exception as e:
             self.logger.error(f"Error processing text file: {str(e)}")
             raise
     
+    def _stream_text_stats(self, path: Path, encoding: str, block_size: int,
+                           keep_content: bool = False) -> Tuple[Dict, Optional[str]]:
+        """Count words, characters and lines block by block
+        
+        Counts match ``str.split()``, ``len()`` and ``str.splitlines()`` on the
+        full text: a word split across two blocks is counted once and a final
+        line without a trailing line break still counts as a line.
+        
+        Args:
+            path: Path to the text file
+            encoding: File encoding
+            block_size: Characters read per block
+            keep_content: Also return the joined content
+            
+        Returns:
+            Tuple of (statistics dictionary, content or None)
+        """
+        word_count = 0
+        char_count = 0
+        line_breaks = 0
+        in_word = False
+        last_char = ""
+        blocks = [] if keep_content else None
+        
+        with open(path, 'r', encoding=encoding) as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                
+                words = len(block.split())
+                # A word running across the block boundary was counted twice
+                if words and in_word and not block[0].isspace():
+                    words -= 1
+                word_count += words
+                in_word = not block[-1].isspace()
+                
+                char_count += len(block)
+                line_breaks += sum(block.count(sep) for sep in self.LINE_BREAKS)
+                last_char = block[-1]
+                
+                if blocks is not None:
+                    blocks.append(block)
+        
+        line_count = line_breaks
+        if last_char and last_char not in self.LINE_BREAKS:
+            line_count += 1
+        
+        stats = {
+            "word_count": word_count,
+            "char_count": char_count,
+            "line_count": line_count
+        }
+        return stats, ("".join(blocks) if blocks is not None else None)
+    
     def extract_metadata(self, file_path: str) -> Dict:
         """Extract metadata from a document
         
@@ -100,12 +183,13 @@ class DocumentProcessor:
             "modified": stat.st_mtime
         }
     
-    def save_processed_document(self, data: Dict, name: str) -> str:
+    def save_processed_document(self, data: Dict, name: str, index: bool = True) -> str:
         """Save processed document data
         
         Args:
             data: Processed document data
             name: Name for the output file
+            index: Add the document to the full-text index
             
         Returns:
             Path to saved file
@@ -116,8 +200,110 @@ class DocumentProcessor:
             json.dump(data, f, indent=2, ensure_ascii=False)
         
         self.logger.info(f"Saved processed document: {output_path}")
+        
+        if index:
+            self.index_document(data, name)
+        
         return str(output_path)
     
+    def index_document(self, data: Dict, name: str) -> int:
+        """Add a processed document to the full-text index
+        
+        Uses the embedded content when present; text documents processed
+        without content are re-read from their source file block by block.
+        
+        Args:
+            data: Processed document data
+            name: Document name in the index
+            
+        Returns:
+            Number of passages indexed
+        """
+        file_path = data.get("file_path", "")
+        
+        if "content" in data:
+            passages = [data["content"]]
+        elif data.get("type") == "text" and file_path and Path(file_path).exists():
+            passages = self._iter_text_passages(Path(file_path))
+        else:
+            passages = [data.get("file_name", name)]
+        
+        count = self.index.add_document(name, passages, file_path)
+        self.logger.info(f"Indexed document {name}: {count} passages")
+        return count
+    
+    def rebuild_index(self) -> int:
+        """Index every processed document JSON in the output directory
+        
+        Returns:
+            Number of documents indexed
+        """
+        count = 0
+        for json_path in sorted(self.output_dir.glob("*.json")):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Skipping {json_path}: {str(e)}")
+                continue
+            
+            if isinstance(data, dict):
+                self.index_document(data, json_path.stem)
+                count += 1
+        
+        self.logger.info(f"Rebuilt index with {count} documents")
+        return count
+    
+    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+        """Search processed documents
+        
+        Args:
+            query: Free-text query; all terms must match
+            top_k: Maximum number of documents to return
+            
+        Returns:
+            Matching documents ranked by BM25, best first
+        """
+        return self.index.search(query, top_k)
+    
+    def _iter_text_passages(self, path: Path, encoding: str = 'utf-8',
+                            block_size: Optional[int] = None) -> Iterator[str]:
+        """Yield passages of a text file, breaking at whitespace
+        
+        A block without any whitespace (minified JSON, base64) is cut at
+        the block size, so memory stays bounded by block_size.
+        
+        Args:
+            path: Path to the text file
+            encoding: File encoding
+            block_size: Approximate characters per passage
+            
+        Yields:
+            Text passages
+        """
+        block_size = block_size or self.STREAM_BLOCK_SIZE
+        carry = ""
+        
+        with open(path, 'r', encoding=encoding) as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                
+                block = carry + block
+                # Last whitespace character of any kind (tab, CR, NBSP...)
+                last_space = _LAST_SPACE.search(block)
+                if last_space is None or last_space.start() == 0:
+                    carry = ""
+                    yield block
+                    continue
+                cut = last_space.start()
+                carry = block[cut:]
+                yield block[:cut]
+        
+        if carry:
+            yield carry
+    
     def list_documents(self, directory: str, extensions: Optional[List[str]] = None) -> List[str]:
         """List documents in a directory
         
@@ -133,12 +319,142 @@ class DocumentProcessor:
         if not dir_path.exists():
             raise FileNotFoundError(f"Directory not found: {directory}")
         
+        wanted = {ext.lower() for ext in (extensions or self.SUPPORTED_TYPES.keys())}
         documents = []
         
-        for ext in (extensions or self.SUPPORTED_TYPES.keys()):
-            documents.extend(dir_path.rglob(f"*{ext}"))
+        # Single walk over the tree instead of one rglob per extension
+        for root, _, files in os.walk(dir_path):
+            for file_name in files:
+                if os.path.splitext(file_name)[1].lower() in wanted:
+                    documents.append(os.path.join(root, file_name))
+        
+        return documents
+    
+    def process_directory(self, directory: str, extensions: Optional[List[str]] = None,
+                          include_content: bool = True, force: bool = False) -> Dict:
+        """Process every new or changed document in a directory
+        
+        Files whose size and modification time match the registry are skipped
+        after one stat. Changed files are hashed; content already processed
+        under another path is recorded as a duplicate instead of re-processed.
+        Registered files under the directory that were deleted are dropped
+        from the registry, and their documents from the output and the index.
+        
+        Args:
+            directory: Directory to search
+            extensions: List of file extensions to filter
+            include_content: Embed text content in the processed documents
+            force: Re-process every document regardless of the registry
+            
+        Returns:
+            Summary with processed, skipped, duplicate and removed documents
+        """
+        summary = {
+            "processed": [],
+            "skipped": 0,
+            "duplicates": {},
+            "removed": [],
+            "errors": {}
+        }
+        
+        documents = self.list_documents(directory, extensions)
+        for file_path in documents:
+            try:
+                stat = os.stat(file_path)
+                if not force and self.registry.is_unchanged(file_path, stat):
+                    summary["skipped"] += 1
+                    continue
+                
+                previous = self.registry.lookup(file_path)
+                digest = DocumentRegistry.hash_file(file_path)
+                existing = None if force else self.registry.find_by_hash(digest)
+                
+                if existing is not None:
+                    self.registry.record(file_path, digest, existing["document_name"], stat)
+                    if existing["path"] != file_path:
+                        summary["duplicates"][file_path] = existing["path"]
+                    else:
+                        summary["skipped"] += 1
+                else:
+                    name = f"{Path(file_path).stem}_{digest[:12]}"
+                    data = self._process_file(file_path, include_content)
+                    data["sha256"] = digest
+                    self.save_processed_document(data, name)
+                    self.registry.record(file_path, digest, name, stat)
+                    summary["processed"].append(file_path)
+                
+                if previous is not None:
+                    self._drop_orphaned_document(previous["document_name"])
+                
+            except Exception as e:
+                self.logger.error(f"Error processing {file_path}: {str(e)}")
+                summary["errors"][file_path] = str(e)
+        
+        summary["removed"] = self._prune_deleted(directory, documents, extensions)
+        
+        self.logger.info(
+            f"Processed {len(summary['processed'])} documents, skipped {summary['skipped']}, "
+            f"{len(summary['duplicates'])} duplicates, removed {len(summary['removed'])}"
+        )
+        return summary
+    
+    def _prune_deleted(self, directory: str, seen: List[str], extensions: Optional[List[str]] = None) -> List[str]:
+        """Forget registered files under a directory that were not found by the last walk
+        
+        Args:
+            directory: Directory that was walked
+            seen: Paths found by the walk
+            extensions: Extensions the walk was filtered to
+        
+        Returns:
+            Paths removed from the registry
+        """
+        root = os.path.abspath(directory)
+        wanted = {ext.lower() for ext in (extensions or self.SUPPORTED_TYPES.keys())}
+        seen = {os.path.abspath(path) for path in seen}
+        removed = []
+        
+        for file_path in self.registry.paths():
+            absolute = os.path.abspath(file_path)
+            if (absolute in seen or not absolute.startswith(root + os.sep)
+                    or os.path.splitext(file_path)[1].lower() not in wanted or os.path.exists(file_path)):
+                continue
+            entry = self.registry.forget(file_path)
+            self._drop_orphaned_document(entry["document_name"])
+            removed.append(file_path)
+        return removed
+    
+    def _drop_orphaned_document(self, name: str):
+        """Remove a processed document that no source path references anymore
+        
+        Args:
+            name: Name of the processed document
+        """
+        if not name or self.registry.reference_count(name) > 0:
+            return
+        
+        self.index.remove_document(name)
+        (self.output_dir / f"{name}.json").unlink(missing_ok=True)
+        self.logger.info(f"Removed outdated document: {name}")
+    
+    def _process_file(self, file_path: str, include_content: bool = True) -> Dict:
+        """Process a single document according to its type
+        
+        Args:
+            file_path: Path to the document
+            include_content: Embed text content in the result
+            
+        Returns:
+            Processed document data
+        """
+        doc_type = self.SUPPORTED_TYPES.get(Path(file_path).suffix.lower())
+        
+        if doc_type == 'text':
+            return self.process_text_file(file_path, streaming=True, include_content=include_content)
         
-        return [str(d) for d in documents if d.is_file()]
+        data = self.extract_metadata(file_path)
+        data.update({"file_name": data["name"], "file_path": data["path"], "type": doc_type})
+        return data
 
 
 if __name__ == "__main__":
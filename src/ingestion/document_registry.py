@@ -0,0 +1,170 @@
+"""
+DIBIE - Document Registry
+Track content hashes of processed documents to skip unchanged files
+"""
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class DocumentRegistry:
+    """Content-hash registry of processed source documents
+    
+    Each source path is recorded with its size, modification time and SHA-256
+    digest. A file whose size and mtime are unchanged is skipped after a single
+    stat; otherwise it is hashed, and files with a digest that was already
+    processed under another path are reported as duplicates.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            document_name TEXT,
+            processed_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files(sha256);
+    """
+    
+    HASH_BLOCK_SIZE = 1024 * 1024
+    
+    def __init__(self, registry_path: str = "data/documents/registry.db"):
+        """Initialize document registry
+        
+        Args:
+            registry_path: Path to the SQLite registry file
+        """
+        self.registry_path = Path(registry_path)
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the registry on first use"""
+        if self._conn is None:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.registry_path))
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+    
+    def lookup(self, file_path: str) -> Optional[Dict]:
+        """Get the registry entry for a path
+        
+        Args:
+            file_path: Source file path
+        
+        Returns:
+            Entry dictionary or None
+        """
+        row = self.conn.execute("SELECT * FROM files WHERE path = ?", (str(file_path),)).fetchone()
+        return dict(row) if row else None
+    
+    def find_by_hash(self, digest: str) -> Optional[Dict]:
+        """Get a processed entry with the given content digest
+        
+        Args:
+            digest: SHA-256 hex digest
+        
+        Returns:
+            Entry dictionary or None
+        """
+        row = self.conn.execute(
+            "SELECT * FROM files WHERE sha256 = ? AND document_name IS NOT NULL LIMIT 1",
+            (digest,)
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def reference_count(self, document_name: str) -> int:
+        """Count source paths that point at a processed document
+        
+        Args:
+            document_name: Name of the processed document
+        
+        Returns:
+            Number of registered paths
+        """
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM files WHERE document_name = ?", (document_name,)
+        ).fetchone()[0]
+    
+    def is_unchanged(self, file_path: str, stat: Optional[os.stat_result] = None) -> bool:
+        """Check whether a file matches its registry entry without reading it
+        
+        Args:
+            file_path: Source file path
+            stat: Result of os.stat, if already available
+        
+        Returns:
+            True if size and modification time are unchanged
+        """
+        entry = self.lookup(file_path)
+        if entry is None:
+            return False
+        
+        stat = stat or os.stat(file_path)
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+    
+    def record(self, file_path: str, digest: str, document_name: str,
+               stat: Optional[os.stat_result] = None):
+        """Record a file as processed
+        
+        Args:
+            file_path: Source file path
+            digest: SHA-256 hex digest of the content
+            document_name: Name of the processed document
+            stat: Result of os.stat, if already available
+        """
+        stat = stat or os.stat(file_path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, document_name, processed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(file_path), stat.st_size, stat.st_mtime_ns, digest,
+                 document_name, datetime.now().isoformat())
+            )
+    
+    def paths(self) -> List[str]:
+        """All registered source paths"""
+        return [row[0] for row in self.conn.execute("SELECT path FROM files")]
+    
+    def forget(self, file_path: str) -> Optional[Dict]:
+        """Remove the entry of a source file that no longer exists
+        
+        Args:
+            file_path: Source file path
+        
+        Returns:
+            The removed entry, or None if the path was not registered
+        """
+        entry = self.lookup(file_path)
+        if entry is not None:
+            with self.conn:
+                self.conn.execute("DELETE FROM files WHERE path = ?", (str(file_path),))
+        return entry
+    
+    def close(self):
+        """Close the registry connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    @classmethod
+    def hash_file(cls, file_path: str) -> str:
+        """Compute the SHA-256 digest of a file in blocks
+        
+        Args:
+            file_path: Path to the file
+        
+        Returns:
+            Hex digest
+        """
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.HASH_BLOCK_SIZE), b''):
+                sha.update(block)
+        return sha.hexdigest()
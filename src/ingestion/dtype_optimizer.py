@@ -0,0 +1,164 @@
+"""
+DIBIE - Dtype Optimizer
+Infer compact column types for loaded tables
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class DtypeOptimizer:
+    """Convert DataFrame columns to the tightest safe dtype
+    
+    Each column is inferred from a sample of its non-null values and then
+    converted in full. A conversion that would lose information on the full
+    column (a value that does not parse, a float that does not round-trip
+    through float32) is dropped and the column keeps its previous type.
+    
+    Text columns become nullable integers, floats or datetimes when every
+    value parses, and ``category`` when they have few distinct values.
+    Numeric columns are downcast to the smallest integer or float type.
+    """
+    
+    INTEGER_TYPES = ["Int8", "Int16", "Int32", "Int64"]
+    DATE_FORMATS = ["ISO8601", "%d/%m/%Y", "%d-%m-%Y"]
+    
+    def __init__(self, sample_size: int = 10_000, category_ratio: float = 0.5,
+                 parse_dates: bool = True, seed: int = 0):
+        """Initialize dtype optimizer
+        
+        Args:
+            sample_size: Non-null values sampled per column for inference
+            category_ratio: Maximum share of distinct values for a category
+            parse_dates: Convert text columns where every value is a date
+            seed: Random seed for sampling
+        """
+        self.sample_size = sample_size
+        self.category_ratio = category_ratio
+        self.parse_dates = parse_dates
+        self.seed = seed
+    
+    def optimize(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """Convert every column of a DataFrame to a compact dtype
+        
+        Args:
+            df: DataFrame to optimize
+        
+        Returns:
+            Tuple of (optimized DataFrame, report with memory before/after and
+            the conversions applied)
+        """
+        memory_before = int(df.memory_usage(deep=True).sum())
+        optimized = {}
+        conversions = {}
+        
+        for col in df.columns:
+            series = df[col]
+            converted = self.convert_column(series)
+            optimized[col] = converted
+            if str(converted.dtype) != str(series.dtype):
+                conversions[str(col)] = {"from": str(series.dtype), "to": str(converted.dtype)}
+        
+        result = pd.DataFrame(optimized, index=df.index)
+        result.columns = df.columns
+        memory_after = int(result.memory_usage(deep=True).sum())
+        
+        return result, {
+            "memory_before_mb": memory_before / 1024 / 1024,
+            "memory_after_mb": memory_after / 1024 / 1024,
+            "memory_saved_mb": (memory_before - memory_after) / 1024 / 1024,
+            "memory_saved_pct": float((memory_before - memory_after) / memory_before * 100) if memory_before else 0.0,
+            "conversions": conversions
+        }
+    
+    def convert_column(self, series: pd.Series) -> pd.Series:
+        """Convert one column to its most compact safe dtype
+        
+        Args:
+            series: Column to convert
+        
+        Returns:
+            Converted column (the original if nothing applies)
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series):
+            return series
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        
+        if pd.api.types.is_numeric_dtype(series):
+            return self._downcast_numeric(series)
+        
+        if series.dtype == object or pd.api.types.is_string_dtype(series):
+            return self._convert_text(series)
+        
+        return series
+    
+    def _sample(self, series: pd.Series) -> pd.Series:
+        """Non-null values used for inference"""
+        values = series.dropna()
+        if len(values) > self.sample_size:
+            values = values.sample(self.sample_size, random_state=self.seed)
+        return values
+    
+    def _convert_text(self, series: pd.Series) -> pd.Series:
+        """Parse a text column as numbers, dates or categories"""
+        # Sheets and CSV exports use empty strings for missing cells; object
+        # columns may also hold numbers, which are kept as they are
+        text = series.astype(object).where(series.notna())
+        stripped = text.map(lambda value: value.strip() if isinstance(value, str) else value)
+        blank = stripped.map(lambda value: isinstance(value, str) and value == "")
+        stripped = stripped.mask(blank)
+        # Values a conversion must keep: everything but missing and blank cells
+        present = int(series.notna().sum()) - int(blank.sum())
+        sample = self._sample(stripped)
+        
+        if len(sample) == 0:
+            return series
+        
+        # Codes with leading zeros (DANE, NIT) stay text
+        has_leading_zero = sample.astype(str).str.match(r"^0\d").any()
+        if not has_leading_zero and pd.to_numeric(sample, errors='coerce').notna().all():
+            numeric = pd.to_numeric(stripped, errors='coerce')
+            if numeric.notna().sum() == present:
+                return self._downcast_numeric(numeric)
+        
+        all_text = sample.map(lambda value: isinstance(value, str)).all()
+        if self.parse_dates and all_text and sample.str.contains(r"\d[-/]\d", regex=True).all():
+            for date_format in self.DATE_FORMATS:
+                sample_dates = pd.to_datetime(sample, format=date_format, errors='coerce')
+                if sample_dates.notna().all():
+                    dates = pd.to_datetime(stripped, format=date_format, errors='coerce')
+                    if dates.notna().sum() == present:
+                        return dates
+                    break
+        
+        if sample.nunique() <= len(sample) * self.category_ratio:
+            distinct = stripped.nunique()
+            categories = stripped.astype('category')
+            if distinct <= present * self.category_ratio and categories.notna().sum() == present:
+                return categories
+        
+        return series
+    
+    def _downcast_numeric(self, series: pd.Series) -> pd.Series:
+        """Smallest integer or float type that holds every value"""
+        values = series.dropna()
+        if len(values) == 0:
+            return series
+        
+        if pd.api.types.is_integer_dtype(series) or (values % 1 == 0).all():
+            low, high = values.min(), values.max()
+            for type_name in self.INTEGER_TYPES:
+                info = np.iinfo(type_name.lower())
+                if info.min <= low and high <= info.max:
+                    # Columns without missing values keep a plain numpy integer type
+                    if not series.isna().any() and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                        return series.astype(type_name.lower())
+                    return series.astype(type_name)
+            return series
+        
+        as_float32 = values.astype('float32')
+        if np.isfinite(as_float32).all() and (as_float32.astype('float64') == values.astype('float64')).all():
+            return series.astype('float32')
+        return series.astype('float64') if series.dtype != 'float64' else series
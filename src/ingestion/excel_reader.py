@@ -0,0 +1,451 @@
+"""
+DIBIE - Excel Reader
+Parse the sheets of a workbook in parallel into a Parquet cache
+"""
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from xml.etree import ElementTree
+
+import pandas as pd
+
+try:
+    from ..log_config import get_logger
+    from ..telemetry import annotate, timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import annotate, timed
+
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# <dimension ref="A1:AB12345"/> near the top of a sheet's XML; the row of its last cell
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension ref="[A-Z]*\d*:?[A-Z]+(\d+)"')
+
+
+def excel_engine(file_path: Union[str, Path]) -> str:
+    """Fastest installed pandas engine for a workbook
+    
+    python-calamine (Rust, read-only) reads .xlsx and .xls several times
+    faster than openpyxl and xlrd; pandas supports it from 2.2.
+    """
+    pandas_version = tuple(int(part) for part in re.findall(r'\d+', pd.__version__)[:2])
+    if pandas_version >= (2, 2) and importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "xlrd" if Path(file_path).suffix.lower() == '.xls' else "openpyxl"
+
+
+def xlsx_sheets(file_path: Union[str, Path]) -> List[Tuple[str, Optional[int]]]:
+    """Sheet names and row counts of an .xlsx, read from its XML
+    
+    Needs no Excel engine and does not parse any cells. The row count is
+    the last row of the ``<dimension>`` a sheet declares, or None if the
+    writer left it out.
+    
+    Args:
+        file_path: Path to the workbook
+    
+    Returns:
+        (sheet name, rows) in workbook order
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target", "") for rel in relations.iter(f"{_PACKAGE_REL_NS}Relationship")}
+        
+        members = set(archive.namelist())
+        sheets = []
+        for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+            target = targets.get(sheet.get(f"{_REL_NS}id"), "")
+            member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            rows = None
+            if member in members:
+                with archive.open(member) as f:
+                    match = _DIMENSION.search(f.read(4096))
+                rows = int(match.group(1)) if match else None
+            sheets.append((sheet.get("name"), rows))
+    return sheets
+
+
+def iter_sheet_rows(file_path: str, sheet: str, engine: str, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Stream a sheet as DataFrames of at most chunksize rows
+    
+    The first row is the header. With calamine the cells stay in native
+    memory and are converted to Python one row at a time; other engines use
+    openpyxl in read-only mode, which parses the sheet XML as it goes.
+    
+    Args:
+        file_path: Path to the workbook
+        sheet: Sheet name
+        engine: "calamine" or another engine (read with openpyxl)
+        chunksize: Rows per DataFrame
+    
+    Yields:
+        DataFrames of rows
+    """
+    workbook = None
+    if engine == "calamine":
+        from python_calamine import CalamineWorkbook
+        rows = iter(CalamineWorkbook.from_path(file_path).get_sheet_by_name(sheet).iter_rows())
+    else:
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        rows = workbook[sheet].iter_rows(values_only=True)
+    
+    try:
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _column_names(header)
+        width = len(columns)
+        batch = []
+        for row in rows:
+            batch.append(row[:width])
+            if len(batch) == chunksize:
+                yield _frame(batch, columns)
+                batch = []
+        if batch:
+            yield _frame(batch, columns)
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+
+def _column_names(header: Sequence) -> List[str]:
+    """Header cells as unique column names, as pandas names them"""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        if value is None or value == "":
+            name = f"Unnamed: {i}"
+        elif isinstance(value, float) and value.is_integer():
+            name = str(int(value))
+        else:
+            name = str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _frame(rows: List[Sequence], columns: List[str]) -> pd.DataFrame:
+    """DataFrame of streamed rows with blank cells as missing values"""
+    df = pd.DataFrame(rows, columns=columns)
+    # calamine reports blank cells as empty strings
+    return df.replace({"": None}).infer_objects()
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Text column names and a single type per column, as Parquet requires
+    
+    Columns that mix numbers and text (typed by hand in a spreadsheet) are
+    stored as text.
+    """
+    df = df.copy(deep=False)
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        series = df[col]
+        if pd.api.types.infer_dtype(series, skipna=True) in ("mixed", "mixed-integer"):
+            df[col] = series.where(series.isna(), series.astype(str))
+    return df
+
+
+def _convert_sheet(file_path: str, sheet: str, engine: str, target: str, stream: bool,
+                   chunksize: int, read_kwargs: Dict) -> Dict:
+    """Parse one sheet and write it as Parquet parts (runs in a worker process)"""
+    started = time.perf_counter()
+    directory = Path(target)
+    # Parts of a conversion that did not finish
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    
+    if stream:
+        chunks = iter_sheet_rows(file_path, sheet, engine, chunksize)
+    else:
+        chunks = [pd.read_excel(file_path, sheet_name=sheet, engine=engine, **read_kwargs)]
+    
+    parts, rows, columns = [], 0, []
+    for i, chunk in enumerate(chunks):
+        chunk = _arrow_safe(chunk)
+        part = f"part-{i:05d}.parquet"
+        chunk.to_parquet(directory / part, index=False)
+        parts.append(part)
+        rows += len(chunk)
+        columns = columns or list(chunk.columns)
+    
+    return {
+        "dir": directory.name,
+        "parts": parts,
+        "rows": rows,
+        "columns": columns,
+        "streamed": stream,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class ExcelReader:
+    """Parse the sheets of a workbook in parallel into a Parquet cache
+    
+    Sheets that are not cached yet are parsed in worker processes, one sheet
+    per task, with the fastest installed engine (python-calamine, else
+    openpyxl or xlrd), and each one is written once as Parquet under
+    ``cache_dir``. Reads of an unchanged workbook load the Parquet files and
+    skip Excel parsing altogether. Sheets declaring more than
+    ``stream_rows`` rows are streamed in chunks, so a worker never holds a
+    huge sheet as Python objects.
+    
+    Column names are stored as text, so a header cell holding the number 1
+    is read back as "1".
+    """
+    
+    SUPPORTED_FORMATS = ('.xlsx', '.xlsm', '.xls')
+    
+    def __init__(self, cache_dir: str = "data/cache/excel", max_workers: Optional[int] = None,
+                 engine: Optional[str] = None, stream_rows: int = 200_000, chunksize: int = 50_000):
+        """Initialize Excel reader
+        
+        Args:
+            cache_dir: Directory for the Parquet copies of the sheets
+            max_workers: Worker processes (CPU count if None)
+            engine: pandas Excel engine (fastest installed if None)
+            stream_rows: Sheets with more rows are streamed in chunks
+            chunksize: Rows per chunk of a streamed sheet
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow is required for ExcelReader: pip install pyarrow")
+        
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.engine = engine
+        self.stream_rows = stream_rows
+        self.chunksize = chunksize
+        self.logger = get_logger('ExcelReader')
+    
+    def sheets(self, file_path: str) -> Dict[str, Optional[int]]:
+        """Sheet names in workbook order with their row counts when known
+        
+        Args:
+            file_path: Path to the workbook
+        
+        Returns:
+            Sheet name to rows (None if the workbook does not say)
+        """
+        path = Path(file_path)
+        if path.suffix.lower() in ('.xlsx', '.xlsm'):
+            try:
+                return dict(xlsx_sheets(path))
+            except (KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+                # Not a standard OOXML package; let the engine list the sheets
+                pass
+        with pd.ExcelFile(path, engine=self.engine or excel_engine(path)) as workbook:
+            return {name: None for name in workbook.sheet_names}
+    
+    @timed("excel_reader.read_workbook", rows=lambda frames: sum(len(df) for df in frames.values()))
+    def read_workbook(self, file_path: str, sheets: Optional[List[Union[str, int]]] = None,
+                      refresh: bool = False, **kwargs) -> Dict[str, pd.DataFrame]:
+        """Read sheets of a workbook, parsing the ones not cached in parallel
+        
+        Args:
+            file_path: Path to the workbook
+            sheets: Sheet names or positions (all sheets if None)
+            refresh: Parse the sheets again even if they are cached
+            **kwargs: Additional parameters for pd.read_excel (header,
+                usecols, dtype...); sheets read with them are never streamed
+        
+        Returns:
+            Sheet name to DataFrame, in workbook order
+        """
+        entries = self.convert(file_path, sheets, refresh=refresh, **kwargs)
+        return {name: self._read_parts(directory, entry["parts"]) for name, (directory, entry) in entries.items()}
+    
+    def read_sheet(self, file_path: str, sheet: Union[str, int] = 0, **kwargs) -> pd.DataFrame:
+        """Read one sheet through the cache
+        
+        Args:
+            file_path: Path to the workbook
+            sheet: Sheet name or position
+            **kwargs: Additional parameters for pd.read_excel
+        
+        Returns:
+            DataFrame with the sheet
+        """
+        return next(iter(self.read_workbook(file_path, [sheet], **kwargs).values()))
+    
+    def iter_batches(self, file_path: str, sheet: Union[str, int] = 0, batch_size: int = 100_000,
+                     **kwargs) -> Iterator[pd.DataFrame]:
+        """Stream one sheet from the cache in batches of rows
+        
+        Args:
+            file_path: Path to the workbook
+            sheet: Sheet name or position
+            batch_size: Maximum rows per batch
+            **kwargs: Additional parameters for pd.read_excel
+        
+        Yields:
+            DataFrames with at most batch_size rows
+        """
+        import pyarrow.parquet as pq
+        
+        (directory, entry), = self.convert(file_path, [sheet], **kwargs).values()
+        for part in entry["parts"]:
+            for batch in pq.ParquetFile(directory / part).iter_batches(batch_size=batch_size):
+                yield batch.to_pandas()
+    
+    def convert(self, file_path: str, sheets: Optional[List[Union[str, int]]] = None,
+                refresh: bool = False, **kwargs) -> Dict[str, Tuple[Path, Dict]]:
+        """Parse the requested sheets that are not cached into Parquet
+        
+        The cache of a workbook is keyed on its path, size, modification
+        time and the read_excel arguments, so an edited file is parsed again
+        and the copies of its earlier versions are removed.
+        
+        Args:
+            file_path: Path to the workbook
+            sheets: Sheet names or positions (all sheets if None)
+            refresh: Parse the sheets again even if they are cached
+            **kwargs: Additional parameters for pd.read_excel
+        
+        Returns:
+            Sheet name to (cache directory of the sheet, manifest entry)
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        engine = kwargs.pop('engine', None) or self.engine or excel_engine(path)
+        available = self.sheets(path)
+        names = self._select(list(available), sheets)
+        cache, manifest = self._open_cache(path, kwargs)
+        
+        pending = [
+            name for name in names
+            if refresh or name not in manifest["sheets"]
+            or not all((cache / manifest["sheets"][name]["dir"] / part).exists()
+                       for part in manifest["sheets"][name]["parts"])
+        ]
+        annotate(bytes=path.stat().st_size, file=path.name, sheets=len(names), parsed=len(pending))
+        
+        if pending:
+            started = time.perf_counter()
+            order = list(available)
+            # Largest sheets first, so a big sheet does not start last
+            pending.sort(key=lambda name: available[name] or 0, reverse=True)
+            jobs = {
+                name: (str(path), name, engine, str(cache / f"sheet-{order.index(name):03d}"),
+                       not kwargs and (available[name] or 0) > self.stream_rows, self.chunksize, kwargs)
+                for name in pending
+            }
+            manifest["sheets"].update(self._run(jobs, path))
+            self._save_manifest(cache, manifest)
+            self.logger.info(f"Parsed {len(pending)} of {len(names)} sheets of {path.name} with {engine} "
+                             f"in {time.perf_counter() - started:.2f}s")
+        
+        return {name: (cache / manifest["sheets"][name]["dir"], manifest["sheets"][name]) for name in names}
+    
+    def _run(self, jobs: Dict[str, Tuple], path: Path) -> Dict[str, Dict]:
+        """Convert sheets, in worker processes when there is more than one"""
+        workers = min(self.max_workers, len(jobs))
+        if workers <= 1:
+            return {name: self._convert(name, job, path) for name, job in jobs.items()}
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_convert_sheet, *job): name for name, job in jobs.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error reading sheet {name!r} of {path.name}: {str(e)}")
+                    raise
+        return results
+    
+    def _convert(self, name: str, job: Tuple, path: Path) -> Dict:
+        try:
+            return _convert_sheet(*job)
+        except Exception as e:
+            self.logger.error(f"Error reading sheet {name!r} of {path.name}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _select(available: List[str], sheets: Optional[List[Union[str, int]]]) -> List[str]:
+        """Sheet names for names or positions, in the order requested"""
+        if sheets is None:
+            return available
+        names = []
+        for sheet in sheets:
+            if isinstance(sheet, int):
+                if not -len(available) <= sheet < len(available):
+                    raise ValueError(f"Worksheet index {sheet} is invalid, {len(available)} worksheets found")
+                sheet = available[sheet]
+            elif sheet not in available:
+                raise ValueError(f"Worksheet named {sheet!r} not found")
+            names.append(sheet)
+        return names
+    
+    def _open_cache(self, path: Path, read_kwargs: Dict) -> Tuple[Path, Dict]:
+        """Cache directory and manifest of the current version of a workbook"""
+        source = str(path.resolve())
+        stat = path.stat()
+        options = json.dumps(read_kwargs, sort_keys=True, default=str)
+        key = hashlib.sha256(f"{source}|{stat.st_size}|{stat.st_mtime_ns}|{options}".encode('utf-8')).hexdigest()[:16]
+        cache = self.cache_dir / f"{path.stem}-{key}"
+        
+        manifest = self._load_manifest(cache)
+        if not manifest:
+            manifest = {"source": source, "options": options, "sheets": {}}
+            # Copies of earlier versions of this workbook
+            for other in self.cache_dir.glob(f"{glob.escape(path.stem)}-*"):
+                previous = self._load_manifest(other)
+                if other != cache and previous.get("source") == source and previous.get("options") == options:
+                    shutil.rmtree(other, ignore_errors=True)
+        return cache, manifest
+    
+    @staticmethod
+    def _load_manifest(cache: Path) -> Dict:
+        try:
+            with open(cache / "manifest.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _save_manifest(cache: Path, manifest: Dict):
+        cache.mkdir(parents=True, exist_ok=True)
+        temp_path = cache / "manifest.json.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, cache / "manifest.json")
+    
+    @staticmethod
+    def _read_parts(directory: Path, parts: List[str]) -> pd.DataFrame:
+        """Load the Parquet parts of a sheet as one DataFrame"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if not parts:
+            return pd.DataFrame()
+        tables = [pq.read_table(directory / part) for part in parts]
+        if len(tables) == 1:
+            return tables[0].to_pandas()
+        try:
+            # Empty and integer chunks widen to the type of the others
+            return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # A column holding numbers in some chunks and text in others
+            return pd.concat([table.to_pandas() for table in tables], ignore_index=True)
@@ -12,13 +12,14 @@ from datetime import datetime
 class GoogleDriveConnector:
     """Connector for accessing Google Drive data"""
     
-    def __init__(self, config_path: str = "config/paths.json"):
+    def __init__(self, config_path: str = "config/paths.json", config: Optional[Dict] = None):
         """Initialize the Google Drive connector
         
         Args:
             config_path: Path to the configuration file
+            config: Parsed configuration (read from config_path if None)
         """
-        self.config = self._load_config(config_path)
+        self.config = config if config is not None else self._load_config(config_path)
         self.google_drive_path = self.config["google_drive"]["local_path"]
         self.drive_url = self.config["google_drive"]["drive_url"]
         
@@ -8,13 +8,22 @@ from typing import Dict, List, Tuple
 from pathlib import Path
 import re
 
+try:
+    from ..telemetry import timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from telemetry import timed
+
+from .dtype_optimizer import DtypeOptimizer
+
 
 class GoogleSheetsReader:
     """Leer datos de Google Sheets mediante URL pública"""
     
     def __init__(self):
         """Initialize Google Sheets reader"""
-        pass
+        self.dtype_optimizer = DtypeOptimizer()
+        self.last_dtype_report = None
     
     def extract_sheet_id(self, url: str) -> str:
         """Extract sheet ID from Google Sheets URL
@@ -45,13 +54,16 @@ class GoogleSheetsReader:
             return match.group(1)
         return None
     
-    def read_sheet(self, url: str, sheet_name: str = None) -> pd.DataFrame:
+    @timed("sheets.read_sheet", rows=len)
+    def read_sheet(self, url: str, sheet_name: str = None, optimize_dtypes: bool = False) -> pd.DataFrame:
         """Read Google Sheet as DataFrame
         
         Args:
             url: Google Sheets URL
             sheet_name: Name or index of the sheet to read
-            
+            optimize_dtypes: Infer compact dtypes instead of keeping every
+                value as text
+
         Returns:
             DataFrame with sheet data
         """
@@ -109,6 +121,8 @@ class GoogleSheetsReader:
                 if data:
                     df = pd.DataFrame(data[1:], columns=data[0])
                     print(f"   ✓ Datos leídos: {df.shape[0]:,} filas, {df.shape[1]} columnas")
+                    if optimize_dtypes:
+                        df = self.optimize_dtypes(df)
                     return df
                 else:
                     return pd.DataFrame()
@@ -136,8 +150,25 @@ class GoogleSheetsReader:
                 export_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
             
             df = pd.read_csv(export_url)
+            if optimize_dtypes:
+                df = self.optimize_dtypes(df)
             return df
     
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert text columns to compact dtypes and report the memory saved
+        
+        Args:
+            df: DataFrame read from a sheet
+        
+        Returns:
+            Optimized DataFrame
+        """
+        df, report = self.dtype_optimizer.optimize(df)
+        self.last_dtype_report = report
+        print(f"   ✓ Tipos optimizados: {report['memory_before_mb']:.2f} MB → {report['memory_after_mb']:.2f} MB "
+              f"({report['memory_saved_pct']:.1f}% menos, {len(report['conversions'])} columnas)")
+        return df
+    
     def read_all_sheets(self, url: str) -> Dict[str, pd.DataFrame]:
         """Read all sheets from a Google Sheets document
         
@@ -0,0 +1,219 @@
+"""
+DIBIE - SQLite Profile
+Connection settings for the SQLite warehouse read by Superset
+"""
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+from urllib.parse import quote
+
+try:
+    from ..log_config import get_logger
+    from ..telemetry import annotate, timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import annotate, timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class SQLiteProfile:
+    """Pragmas shared by the loaders and the dashboard readers
+    
+    Writers put the database in WAL mode, so a sync appends to the
+    write-ahead log while dashboard queries keep reading the last committed
+    snapshot instead of waiting for the rollback journal to clear. Readers
+    open the file read-only with ``query_only`` and get a larger page cache,
+    memory-mapped I/O and in-memory temp tables for sorts and GROUP BYs.
+    
+    WAL mode is stored in the database file, so it only has to be set by
+    the writer; the per-connection pragmas are applied on every connect.
+    """
+    
+    DEFAULT_DB_PATH = "data/database/dibie_financiero.db"
+    
+    def __init__(self, mmap_size: int = 256 * 1024 * 1024, cache_size_kb: int = 64 * 1024,
+                 busy_timeout_ms: int = 5000, synchronous: str = "NORMAL"):
+        """Initialize SQLite profile
+        
+        Args:
+            mmap_size: Bytes of the file to memory-map
+            cache_size_kb: Page cache per connection in KiB
+            busy_timeout_ms: Milliseconds to wait for a lock before failing
+            synchronous: Writer synchronous level; NORMAL is durable in WAL
+                mode except for the last transactions on power loss
+        """
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.logger = get_logger('SQLiteProfile')
+    
+    def pragmas(self, read_only: bool = False) -> Dict[str, Union[int, str]]:
+        """Per-connection pragmas, in the order they are applied
+        
+        Args:
+            read_only: Pragmas for a dashboard reader instead of a loader
+        
+        Returns:
+            Pragma name to value
+        """
+        pragmas: Dict[str, Union[int, str]] = {
+            "busy_timeout": self.busy_timeout_ms,
+            "cache_size": -self.cache_size_kb,
+            "mmap_size": self.mmap_size,
+            "temp_store": "MEMORY",
+        }
+        if read_only:
+            pragmas["query_only"] = 1
+        else:
+            pragmas["journal_mode"] = "WAL"
+            pragmas["synchronous"] = self.synchronous
+        return pragmas
+    
+    def apply(self, conn, read_only: bool = False) -> Dict[str, Union[int, str]]:
+        """Apply the profile to an open DB-API connection
+        
+        Args:
+            conn: sqlite3 connection
+            read_only: Apply the reader pragmas
+        
+        Returns:
+            Pragma name to value
+        """
+        pragmas = self.pragmas(read_only)
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return pragmas
+    
+    def connect(self, db_path: Union[str, Path] = DEFAULT_DB_PATH, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the profile applied
+        
+        Args:
+            db_path: SQLite database path
+            read_only: Open the file read-only for dashboard queries
+        
+        Returns:
+            sqlite3 connection
+        """
+        db_path = Path(db_path)
+        timeout = self.busy_timeout_ms / 1000
+        if read_only:
+            conn = sqlite3.connect(f"{db_path.absolute().as_uri()}?mode=ro", uri=True, timeout=timeout,
+                                   check_same_thread=False)
+        else:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(db_path), timeout=timeout)
+        self.apply(conn, read_only)
+        return conn
+    
+    @timed("sqlite.replace_table", rows=int)
+    def replace_table(self, conn: sqlite3.Connection, table: str,
+                      data: Union['pd.DataFrame', Iterable['pd.DataFrame']]) -> int:
+        """Replace a table so readers never see it empty or half written
+        
+        ``DataFrame.to_sql(if_exists='replace')`` commits the new empty
+        table before inserting. Here the rows go to a staging table first
+        and the old table is swapped out in one short transaction, so a
+        dashboard reads either the previous rows or the new ones.
+        
+        Args:
+            conn: Writer connection
+            table: Table to replace
+            data: DataFrame or batches of DataFrames
+        
+        Returns:
+            Number of rows written
+        """
+        staging = f"{table}__staging"
+        annotate(table=table)
+        batches = [data] if hasattr(data, 'to_sql') else data
+        conn.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        
+        rows, written = 0, False
+        for batch in batches:
+            batch.to_sql(staging, conn, if_exists='append' if written else 'replace', index=False)
+            rows += len(batch)
+            written = True
+        conn.commit()
+        if not written:
+            return 0
+        
+        # Views are kept as written; the renamed table takes over their references
+        conn.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{table}"')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("PRAGMA legacy_alter_table = OFF")
+        return rows
+    
+    def checkpoint(self, conn: sqlite3.Connection):
+        """Fold the write-ahead log back into the database after a sync
+        
+        Keeps the WAL file from growing across syncs and refreshes the
+        query planner statistics for the tables that were replaced.
+        """
+        conn.commit()
+        conn.execute("PRAGMA optimize")
+        busy, log_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            self.logger.info(f"WAL checkpoint deferred by active readers ({checkpointed}/{log_pages} pages)")
+    
+    @staticmethod
+    def sqlalchemy_uri(db_path: Union[str, Path] = DEFAULT_DB_PATH, read_only: bool = True) -> str:
+        """SQLAlchemy URI of the database
+        
+        Args:
+            db_path: SQLite database path
+            read_only: Open the file read-only
+        
+        Returns:
+            URI for Superset
+        """
+        path = Path(db_path).absolute().as_posix()
+        if not read_only:
+            return f"sqlite:///{path}"
+        return f"sqlite:///file:{quote(path)}?mode=ro&uri=true"
+    
+    def superset_database(self, name: str, db_path: Union[str, Path] = DEFAULT_DB_PATH,
+                          description: Optional[str] = None) -> Dict:
+        """Database entry for the generated Superset configuration
+        
+        The URI opens the file read-only. The remaining pragmas are applied
+        by the connect hook in config/superset_config.py, which reads them
+        from ``pragmas`` here.
+        
+        Args:
+            name: Database name shown in Superset
+            db_path: SQLite database path
+            description: Optional description
+        
+        Returns:
+            Database configuration dictionary
+        """
+        database = {
+            "name": name,
+            "sqlalchemy_uri": self.sqlalchemy_uri(db_path, read_only=True),
+            "extra": {
+                "engine_params": {
+                    "connect_args": {"timeout": self.busy_timeout_ms / 1000, "check_same_thread": False}
+                }
+            },
+            "pragmas": self.pragmas(read_only=True),
+        }
+        if description:
+            database["description"] = description
+        return database
+    
+    @staticmethod
+    def database_files(conn) -> List[str]:
+        """Files attached to an open DB-API connection"""
+        return [row[2] for row in conn.execute("PRAGMA database_list").fetchall() if row[2]]
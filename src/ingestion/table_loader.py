@@ -5,8 +5,17 @@ Load and process tabular data from various formats
 import pandas as pd
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-import logging
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    from ..log_config import get_logger
+    from ..telemetry import annotate, timed
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import annotate, timed
+
+from .dtype_optimizer import DtypeOptimizer
 
 
 class TableLoader:
@@ -29,25 +38,30 @@ class TableLoader:
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.logger = self._setup_logger()
+        self.logger = get_logger('TableLoader')
+        self.dtype_optimizer = DtypeOptimizer()
+        self.last_dtype_report: Optional[Dict] = None
+        self._excel_reader = None
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger for the table loader"""
-        logger = logging.getLogger('TableLoader')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.FileHandler('logs/table_loader.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
+    @property
+    def excel_reader(self):
+        """ExcelReader caching sheets under cache_dir/excel, or None without pyarrow"""
+        if self._excel_reader is None:
+            from .excel_reader import ExcelReader
+            try:
+                self._excel_reader = ExcelReader(cache_dir=str(self.cache_dir / "excel"))
+            except ImportError as e:
+                self.logger.warning(f"Reading Excel files without the sheet cache: {str(e)}")
+                self._excel_reader = False
+        return self._excel_reader or None
     
-    def load_table(self, file_path: str, **kwargs) -> pd.DataFrame:
+    @timed("table_loader.load_table", rows=len)
+    def load_table(self, file_path: str, optimize_dtypes: bool = False, **kwargs) -> pd.DataFrame:
         """Load table from file
         
         Args:
             file_path: Path to the file
+            optimize_dtypes: Convert columns to compact dtypes after loading
             **kwargs: Additional parameters for pandas readers
             
         Returns:
@@ -64,12 +78,17 @@ class TableLoader:
             raise ValueError(f"Unsupported file format: {extension}")
         
         self.logger.info(f"Loading table from: {file_path}")
+        annotate(bytes=path.stat().st_size, file=path.name)
         
         try:
             if extension == '.csv':
                 df = pd.read_csv(file_path, **kwargs)
             elif extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path, **kwargs)
+                sheet_name = kwargs.pop('sheet_name', 0)
+                if isinstance(sheet_name, (int, str)) and self.excel_reader is not None:
+                    df = self.excel_reader.read_sheet(file_path, sheet_name, **kwargs)
+                else:
+                    df = pd.read_excel(file_path, sheet_name=sheet_name, **kwargs)
             elif extension == '.json':
                 df = pd.read_json(file_path, **kwargs)
             elif extension == '.parquet':
@@ -79,12 +98,100 @@ class TableLoader:
                 df = pd.read_csv(file_path, sep='\t', **kwargs)
             
             self.logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
+            
+            if optimize_dtypes:
+                df = self.optimize_dtypes(df)
             return df
             
         except Exception as e:
             self.logger.error(f"Error loading table: {str(e)}")
             raise
     
+    def iter_chunks(self, file_path: str, chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]:
+        """Read a table in chunks of rows
+        
+        CSV, TXT, JSON Lines and Parquet files are streamed, and Excel sheets
+        are streamed from their cached Parquet copy; other formats are loaded
+        whole and yielded as a single chunk.
+        
+        Args:
+            file_path: Path to the file
+            chunksize: Rows per chunk
+            **kwargs: Additional parameters for pandas readers
+            
+        Yields:
+            DataFrames with at most chunksize rows
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        extension = path.suffix.lower()
+        
+        if extension not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported file format: {extension}")
+        
+        self.logger.info(f"Streaming table from: {file_path} ({chunksize} rows per chunk)")
+        
+        if extension in ['.csv', '.txt']:
+            if extension == '.txt':
+                kwargs.setdefault('sep', '\t')
+            with pd.read_csv(file_path, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+        elif extension == '.json' and kwargs.get('lines'):
+            with pd.read_json(file_path, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+        elif extension == '.parquet':
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                yield self.load_table(file_path, **kwargs)
+                return
+            
+            parquet_file = pq.ParquetFile(file_path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=kwargs.get('columns')):
+                yield batch.to_pandas()
+        elif extension in ['.xlsx', '.xls'] and self.excel_reader is not None:
+            sheet_name = kwargs.pop('sheet_name', 0)
+            yield from self.excel_reader.iter_batches(file_path, sheet_name, chunksize, **kwargs)
+        else:
+            yield self.load_table(file_path, **kwargs)
+    
+    def load_workbook(self, file_path: str, sheets: Optional[List[Union[str, int]]] = None,
+                      optimize_dtypes: bool = False, **kwargs) -> Dict[str, pd.DataFrame]:
+        """Load several sheets of an Excel workbook
+        
+        Sheets are parsed in parallel worker processes and cached as Parquet,
+        so loading the same workbook again only reads the cache.
+        
+        Args:
+            file_path: Path to the workbook
+            sheets: Sheet names or positions (all sheets if None)
+            optimize_dtypes: Convert columns to compact dtypes after loading
+            **kwargs: Additional parameters for pd.read_excel
+            
+        Returns:
+            Sheet name to DataFrame, in workbook order
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        self.logger.info(f"Loading workbook from: {file_path}")
+        
+        if self.excel_reader is not None:
+            frames = self.excel_reader.read_workbook(file_path, sheets, **kwargs)
+        else:
+            frames = pd.read_excel(file_path, sheet_name=sheets, **kwargs)
+        
+        self.logger.info(f"Loaded {len(frames)} sheets, {sum(len(df) for df in frames.values())} rows")
+        
+        if optimize_dtypes:
+            frames = {name: self.optimize_dtypes(df) for name, df in frames.items()}
+        return frames
+    
     def get_table_info(self, df: pd.DataFrame) -> Dict:
         """Get information about a DataFrame
         
@@ -103,6 +210,25 @@ class TableLoader:
             "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024 / 1024
         }
     
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert columns to compact dtypes and log the memory saved
+        
+        The report of the last call is kept in ``last_dtype_report``.
+        
+        Args:
+            df: DataFrame to optimize
+        
+        Returns:
+            Optimized DataFrame
+        """
+        df, report = self.dtype_optimizer.optimize(df)
+        self.last_dtype_report = report
+        self.logger.info(
+            f"Optimized dtypes: {report['memory_before_mb']:.2f} MB -> {report['memory_after_mb']:.2f} MB "
+            f"({report['memory_saved_pct']:.1f}% saved, {len(report['conversions'])} columns converted)"
+        )
+        return df
+    
     def save_to_cache(self, df: pd.DataFrame, name: str, format: str = 'parquet') -> str:
         """Save DataFrame to cache
         
@@ -0,0 +1,235 @@
+"""
+DIBIE - Logging
+One non-blocking logging setup shared by every DIBIE component
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Defaults for the "logs" section of config/paths.json
+DEFAULTS = {
+    "path": "logs",
+    "level": "INFO",
+    "console_level": "WARNING",
+    "text_file": "dibie.log",
+    "json_file": "dibie.jsonl",
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+    "components": {},
+}
+
+# PID of the process that configured logging first, inherited by the
+# worker processes it forks or spawns
+PARENT_ENV = "DIBIE_LOG_PARENT"
+
+# Attributes every LogRecord has; the rest were passed with extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_console_handler: Optional[logging.Handler] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Format a record as one JSON object per line
+    
+    Fields passed with ``extra`` become top-level keys, so
+    ``logger.info("Loaded table", extra={"rows": n})`` can be filtered on
+    ``rows`` with jq or pandas.read_json(lines=True).
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue records with only the message merged
+    
+    The stock QueueHandler formats the whole record in the calling thread;
+    here timestamps and layout are formatted by the listener, so a log call
+    costs a copy and a queue put.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge now: the arguments may change after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Keep the text, not the traceback and the frames it holds
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _level(value) -> int:
+    return value if isinstance(value, int) else logging.getLevelName(str(value).upper())
+
+
+def _load_config(config_path: str) -> Dict:
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("logs", {})
+    except FileNotFoundError:
+        return {}
+
+
+def configure_logging(config: Optional[Dict] = None, config_path: str = "config/paths.json",
+                      console_level: Optional[str] = None, force: bool = False) -> logging.handlers.QueueListener:
+    """Route every logger through a queue to a background writer thread
+    
+    The root logger gets a single queue handler; a listener thread writes
+    the records to a rotating text log, a rotating JSON Lines log and the
+    console. Calling it again only changes the console level, so components
+    can call it (through get_logger) every time they are created without
+    adding handlers.
+    
+    Rollover is not safe across processes, so only the process that
+    configured logging first rotates the files. Its worker processes
+    (process pools, forked profilers) append to the same files and reopen
+    them after the parent rotates them.
+    
+    Args:
+        config: "logs" settings (read from config_path if None): path,
+            level, console_level, text_file, json_file (null to disable
+            either), max_bytes, backup_count and components, a map of logger
+            name to level
+        config_path: Configuration file with a "logs" section
+        console_level: Level of records printed to stderr (overrides config)
+        force: Stop the current listener and configure again
+    
+    Returns:
+        The running QueueListener
+    """
+    global _listener, _queue_handler, _console_handler
+    with _lock:
+        if _listener is not None and not force:
+            if console_level is not None:
+                _console_handler.setLevel(_level(console_level))
+            return _listener
+        _stop_listener()
+        
+        settings = {**DEFAULTS, **(config if config is not None else _load_config(config_path))}
+        log_dir = Path(settings["path"])
+        log_dir.mkdir(parents=True, exist_ok=True)
+        
+        parent = os.environ.setdefault(PARENT_ENV, str(os.getpid()))
+        rotate = parent == str(os.getpid())
+        
+        handlers = []
+        for filename, formatter in ((settings["text_file"], logging.Formatter(TEXT_FORMAT)),
+                                    (settings["json_file"], JSONFormatter())):
+            if not filename:
+                continue
+            if rotate:
+                handler = logging.handlers.RotatingFileHandler(
+                    log_dir / filename, maxBytes=settings["max_bytes"], backupCount=settings["backup_count"],
+                    encoding='utf-8', delay=True)
+            else:
+                handler = logging.handlers.WatchedFileHandler(log_dir / filename, encoding='utf-8', delay=True)
+            handler.setFormatter(formatter)
+            handlers.append(handler)
+        
+        _console_handler = logging.StreamHandler(sys.stderr)
+        _console_handler.setLevel(_level(console_level or settings["console_level"]))
+        _console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(_console_handler)
+        
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(_level(os.environ.get('DIBIE_LOG_LEVEL', settings["level"])))
+        for name, level in settings["components"].items():
+            logging.getLogger(name).setLevel(_level(level))
+        
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a component, configuring logging on first use
+    
+    Args:
+        name: Component name, also the key for its level in "components"
+    """
+    if _listener is None:
+        configure_logging()
+    return logging.getLogger(name)
+
+
+def _stop_listener():
+    """Flush the queue and detach the handlers (caller holds _lock)"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+def shutdown_logging():
+    """Write out the queued records and close the log files"""
+    with _lock:
+        _stop_listener()
+
+
+def _after_fork():
+    """Drop the parent's listener in a forked child
+    
+    Its thread does not exist in the child, so records put on the inherited
+    queue would never be written; the next get_logger starts a new one.
+    The inherited files are let go without flushing: the thread may have
+    held their buffers mid-write, and the parent writes what is in them.
+    """
+    global _listener, _queue_handler, _lock
+    _lock = threading.Lock()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    if _listener is not None:
+        for handler in _listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.stream = None
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
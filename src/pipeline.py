@@ -0,0 +1,365 @@
+"""
+DIBIE - Pipeline
+Run stages in dependency order and skip the ones whose inputs are unchanged
+"""
+import hashlib
+import inspect
+import json
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from .log_config import get_logger
+    from .telemetry import span
+except ImportError:
+    # src/ on sys.path instead of the src package
+    from log_config import get_logger
+    from telemetry import span
+
+
+class Stage:
+    """One step of a pipeline
+    
+    The function is called with its inputs as keyword arguments, named
+    after the artifacts they come from. It returns a dictionary with one
+    value per declared output; a stage with a single output may return the
+    value itself.
+    """
+    
+    def __init__(self, name: str, func: Callable, inputs: Optional[List[str]] = None,
+                 outputs: Optional[List[str]] = None, files: Optional[List[str]] = None,
+                 creates: Optional[List[str]] = None, always_run: bool = False,
+                 version: Optional[str] = None):
+        """Initialize stage
+        
+        Args:
+            name: Stage name
+            func: Function run by the stage
+            inputs: Artifacts produced by other stages
+            outputs: Artifacts produced by this stage
+            files: External files read by the stage; their content is part
+                of the input fingerprint. List here the modules a thin
+                wrapper function calls into, since only the wrapper's own
+                source is hashed by default.
+            creates: Files written by the stage; a stage is rerun if any is
+                missing
+            always_run: Run on every pipeline run, e.g. to read a remote
+                source. Downstream stages are still skipped when the
+                source's outputs did not change.
+            version: Mixed into the fingerprint (hash of the function's
+                source code if None), so editing a stage invalidates it
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs or [])
+        self.outputs = list(outputs or [])
+        self.files = [str(path) for path in files or []]
+        self.creates = [str(path) for path in creates or []]
+        self.always_run = always_run
+        self.version = version or self._source_hash(func)
+    
+    @staticmethod
+    def _source_hash(func: Callable) -> str:
+        """Hash of a function's source code, or of its name if unavailable"""
+        try:
+            source = inspect.getsource(func)
+        except (OSError, TypeError):
+            source = getattr(func, '__qualname__', repr(func))
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+    
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class Pipeline:
+    """DAG of stages with fingerprint caching
+    
+    Stages run as soon as the stages producing their inputs have finished,
+    with independent stages running in parallel threads. Outputs are passed
+    in memory and also pickled under ``cache_dir``, so a later run can skip
+    a stage whose input fingerprint matches the previous run and still feed
+    its outputs to the stages that do run. Cached outputs are only loaded
+    when a running stage needs them.
+    """
+    
+    def __init__(self, stages: Optional[Iterable[Stage]] = None, cache_dir: str = "data/cache/pipeline",
+                 max_workers: int = 4):
+        """Initialize pipeline
+        
+        Args:
+            stages: Stages of the pipeline
+            cache_dir: Directory for stage state and cached outputs
+            max_workers: Stages run at the same time
+        """
+        self.cache_dir = Path(cache_dir)
+        self.artifact_dir = self.cache_dir / "artifacts"
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.cache_dir / "state.json"
+        self.max_workers = max_workers
+        self.logger = get_logger('Pipeline')
+        
+        self.stages: Dict[str, Stage] = {}
+        self._producers: Dict[str, str] = {}
+        self._values: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        
+        for stage in stages or []:
+            self.add(stage)
+    
+    def add(self, stage: Stage) -> Stage:
+        """Add a stage
+        
+        Args:
+            stage: Stage to add
+        
+        Returns:
+            The stage
+        """
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        for output in stage.outputs:
+            if output in self._producers:
+                raise ValueError(f"Artifact {output} is produced by both {self._producers[output]} and {stage.name}")
+            self._producers[output] = stage.name
+        self.stages[stage.name] = stage
+        return stage
+    
+    def stage(self, name: Optional[str] = None, **options) -> Callable:
+        """Decorator adding a function as a stage
+        
+        Args:
+            name: Stage name (the function name if None)
+            **options: Stage arguments (inputs, outputs, files, ...)
+        """
+        def decorator(func: Callable) -> Callable:
+            self.add(Stage(name or func.__name__, func, **options))
+            return func
+        return decorator
+    
+    def dependencies(self, name: str) -> List[str]:
+        """Stages producing the inputs of a stage"""
+        missing = [i for i in self.stages[name].inputs if i not in self._producers]
+        if missing:
+            raise ValueError(f"Stage {name} needs artifacts no stage produces: {', '.join(missing)}")
+        return sorted({self._producers[i] for i in self.stages[name].inputs})
+    
+    def order(self, targets: Optional[List[str]] = None) -> List[str]:
+        """Stages in dependency order
+        
+        Args:
+            targets: Stages to run with everything upstream of them (all if None)
+        
+        Returns:
+            Stage names
+        """
+        ordered: List[str] = []
+        visiting = set()
+        
+        def visit(name: str):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            visiting.add(name)
+            for dependency in self.dependencies(name):
+                visit(dependency)
+            visiting.discard(name)
+            ordered.append(name)
+        
+        for name in targets or list(self.stages):
+            visit(name)
+        return ordered
+    
+    def run(self, targets: Optional[List[str]] = None, force: bool = False) -> Dict[str, Dict]:
+        """Run the pipeline
+        
+        Args:
+            targets: Stages to run with everything upstream of them (all if None)
+            force: Run every stage even if its inputs are unchanged
+        
+        Returns:
+            Dictionary of stage name to result (status, seconds, fingerprint,
+            and error for failed stages). Status is one of ran, skipped,
+            failed or blocked (an upstream stage failed).
+        """
+        names = self.order(targets)
+        state = self._load_state()
+        results: Dict[str, Dict] = {}
+        pending = {name: set(self.dependencies(name)) for name in names}
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps - set(results)]:
+                    del pending[name]
+                    failed = [d for d in self.dependencies(name) if results[d]["status"] in ("failed", "blocked")]
+                    if failed:
+                        results[name] = {"status": "blocked", "seconds": 0.0, "blocked_by": failed}
+                        self.logger.warning(f"Stage {name} blocked by {', '.join(failed)}")
+                        continue
+                    running[executor.submit(self._run_stage, self.stages[name], state, force)] = name
+                
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    with self._lock:
+                        state[name] = {key: value for key, value in results[name].items() if key != "error"}
+                        self._save_state(state)
+        
+        counts = {status: sum(r["status"] == status for r in results.values())
+                  for status in ("ran", "skipped", "failed", "blocked")}
+        self.logger.info(f"Pipeline finished in {time.perf_counter() - started:.2f}s: "
+                         + ", ".join(f"{count} {status}" for status, count in counts.items() if count))
+        return results
+    
+    def artifact(self, name: str) -> Any:
+        """Value of an artifact, loaded from the cache if needed
+        
+        Args:
+            name: Artifact name
+        
+        Returns:
+            The value produced by the last run of its stage
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+        
+        with open(self.artifact_dir / f"{name}.pkl", 'rb') as f:
+            value = pickle.load(f)
+        with self._lock:
+            self._values[name] = value
+        return value
+    
+    def _run_stage(self, stage: Stage, state: Dict, force: bool) -> Dict:
+        """Run one stage unless its cached outputs are still valid"""
+        fingerprint = self._stage_fingerprint(stage)
+        previous = state.get(stage.name, {})
+        
+        if (not force and not stage.always_run
+                and previous.get("fingerprint") == fingerprint
+                and previous.get("status") in ("ran", "skipped")
+                and all((self.artifact_dir / f"{output}.pkl").exists() for output in stage.outputs)
+                and all(Path(path).exists() for path in stage.creates)):
+            with self._lock:
+                self._fingerprints.update(previous.get("outputs", {}))
+            self.logger.info(f"Stage {stage.name} skipped (inputs unchanged)")
+            return {"status": "skipped", "seconds": 0.0, "fingerprint": fingerprint,
+                    "outputs": previous.get("outputs", {}), "ran_at": previous.get("ran_at")}
+        
+        self.logger.info(f"Running stage {stage.name}")
+        started = time.perf_counter()
+        try:
+            kwargs = {name: self.artifact(name) for name in stage.inputs}
+            with span(f"pipeline.{stage.name}"):
+                result = stage.func(**kwargs)
+            if len(stage.outputs) == 1 and not (isinstance(result, dict) and stage.outputs[0] in result):
+                result = {stage.outputs[0]: result}
+            
+            outputs = {}
+            for output in stage.outputs:
+                if not isinstance(result, dict) or result.get(output) is None:
+                    raise ValueError(f"Stage {stage.name} did not return output {output}")
+                outputs[output] = self._store(output, result[output])
+        except Exception as e:
+            self.logger.error(f"Stage {stage.name} failed: {e}")
+            return {"status": "failed", "seconds": time.perf_counter() - started, "error": str(e)}
+        
+        seconds = time.perf_counter() - started
+        self.logger.info(f"Stage {stage.name} ran in {seconds:.2f}s")
+        return {"status": "ran", "seconds": seconds, "fingerprint": fingerprint, "outputs": outputs,
+                "ran_at": datetime.now().isoformat()}
+    
+    def _store(self, name: str, value: Any) -> str:
+        """Keep an output in memory and in the cache, returning its fingerprint"""
+        fingerprint = self.fingerprint(value)
+        path = self.artifact_dir / f"{name}.pkl"
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(path)
+        with self._lock:
+            self._values[name] = value
+            self._fingerprints[name] = fingerprint
+        return fingerprint
+    
+    def _stage_fingerprint(self, stage: Stage) -> str:
+        """Fingerprint of a stage's code, input artifacts and input files"""
+        with self._lock:
+            inputs = {name: self._fingerprints.get(name) for name in stage.inputs}
+        files = {path: self.file_fingerprint(path) for path in stage.files}
+        payload = json.dumps({"version": stage.version, "inputs": inputs, "files": files}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def fingerprint(cls, value: Any) -> str:
+        """Content fingerprint of an artifact value
+        
+        DataFrames are hashed row by row with pandas, dictionaries and lists
+        by their items, anything else by its pickle.
+        """
+        sha = hashlib.sha256()
+        cls._update(sha, value)
+        return sha.hexdigest()
+    
+    @classmethod
+    def _update(cls, sha, value: Any):
+        """Feed a value into a hash"""
+        if hasattr(value, 'to_frame') and hasattr(value, 'dtype'):
+            value = value.to_frame()
+        if hasattr(value, 'columns') and hasattr(value, 'dtypes'):
+            from pandas.util import hash_pandas_object
+            sha.update(repr([(str(c), str(t)) for c, t in value.dtypes.items()]).encode('utf-8'))
+            sha.update(hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, dict):
+            sha.update(b'{')
+            for key in sorted(value, key=repr):
+                sha.update(repr(key).encode('utf-8'))
+                cls._update(sha, value[key])
+            sha.update(b'}')
+        elif isinstance(value, (list, tuple)):
+            sha.update(b'[')
+            for item in value:
+                cls._update(sha, item)
+            sha.update(b']')
+        else:
+            sha.update(pickle.dumps(value, protocol=4))
+    
+    @staticmethod
+    def file_fingerprint(path: str) -> Optional[str]:
+        """SHA-256 of a file's content, or None if it does not exist"""
+        sha = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(block)
+        except FileNotFoundError:
+            return None
+        return sha.hexdigest()
+    
+    def _load_state(self) -> Dict:
+        """Stage results of the previous run"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _save_state(self, state: Dict):
+        """Persist stage results"""
+        temp_path = self.state_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+        temp_path.replace(self.state_path)
@@ -0,0 +1,324 @@
+"""
+DIBIE - Profiling
+Opt-in CPU and allocation profiling for DIBIE entry points
+"""
+# cProfile, pstats and tracemalloc are imported when a profile starts, so
+# entry points can offer --profile without paying for them on every run
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# Leaf frames in these files are threads blocked on a lock, queue or socket
+IDLE_FILES = ('threading.py', 'queue.py', 'selectors.py', '_base.py', 'connection.py', 'thread.py')
+IDLE_FUNCTIONS = {'wait', 'get', 'select', 'acquire', 'join', '_wait_for_tstate_lock', '_worker', 'poll',
+                  'accept', 'recv'}
+
+Frame = Tuple[str, int, str]
+
+
+class Profiler:
+    """Profile a block of code and write the results to logs/profiles
+    
+    Two CPU modes:
+    
+    - ``sample`` (default): a background thread records the stack of every
+      thread each ``interval`` seconds. Overhead is low and work done in
+      pipeline worker threads is included. Writes ``<run>.folded``, the
+      collapsed-stack format read by flamegraph.pl, speedscope and inferno.
+    - ``cprofile``: deterministic cProfile with exact call counts, of the
+      calling thread (every thread from Python 3.12). Writes ``<run>.prof``
+      for snakeviz or pstats.
+    
+    With ``allocations`` tracemalloc records where memory is allocated; the
+    report lists the sites holding the most memory at the traced peak.
+    Tracing slows allocation-heavy pandas code several times over, so turn
+    it off when the timings matter.
+    The report with the top functions and allocation sites is printed to
+    stderr and saved as ``<run>.txt``.
+    """
+    
+    def __init__(self, name: str, mode: str = "sample", output_dir: str = "logs/profiles",
+                 interval: float = 0.005, allocations: bool = True, top: int = 20):
+        """Initialize profiler
+        
+        Args:
+            name: Run name used in the output file names
+            mode: "sample" or "cprofile"
+            output_dir: Directory for the profile files
+            interval: Seconds between stack samples in sample mode
+            allocations: Trace memory allocations with tracemalloc
+            top: Number of functions and allocation sites in the report
+        """
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.name = name
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.allocations = allocations
+        self.top = top
+        
+        self.samples: Counter = Counter()
+        self.idle_samples = 0
+        self.files: List[str] = []
+        self.report = ""
+        self._profile = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._peak_snapshot = None
+        self._peak_bytes = 0
+        self._started = 0.0
+        self._seconds = 0.0
+    
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+    
+    def start(self):
+        """Start profiling"""
+        self._started = time.perf_counter()
+        self._stop.clear()
+        if self.allocations:
+            import tracemalloc
+            tracemalloc.start(1)
+            self._threads.append(threading.Thread(target=self._watch_memory, name="dibie-profiler-memory",
+                                                  daemon=True))
+        if self.mode == "sample":
+            self._threads.append(threading.Thread(target=self._sample, name="dibie-profiler-sampler",
+                                                  daemon=True))
+        for thread in self._threads:
+            thread.start()
+        if self.mode == "cprofile":
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+    
+    def stop(self) -> str:
+        """Stop profiling, write the output files and print the report
+        
+        Returns:
+            The report
+        """
+        if self._profile is not None:
+            self._profile.disable()
+        self._seconds = time.perf_counter() - self._started
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        
+        snapshot = None
+        if self.allocations:
+            self._take_peak_snapshot()
+            snapshot = self._peak_snapshot
+            import tracemalloc
+            tracemalloc.stop()
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        
+        sections = [f"Profile of {self.name}: {self._seconds:.2f}s ({self.mode})"]
+        if self.mode == "sample":
+            self.files.append(self._write_folded(stem.with_suffix(".folded")))
+            sections.append(self._sample_report())
+        else:
+            self._profile.dump_stats(str(stem.with_suffix(".prof")))
+            self.files.append(str(stem.with_suffix(".prof")))
+            sections.append(self._cprofile_report())
+        if snapshot is not None:
+            sections.append(self._allocation_report(snapshot))
+        
+        report_path = stem.with_suffix(".txt")
+        self.files.append(str(report_path))
+        sections.append("Files:\n" + "\n".join(f"  {path}" for path in self.files))
+        self.report = "\n\n".join(sections)
+        report_path.write_text(self.report + "\n", encoding='utf-8')
+        
+        print("\n" + self.report, file=sys.stderr)
+        return self.report
+    
+    # ------------------------------------------------------------------ CPU
+    
+    def _sample(self):
+        """Record the stack of every other thread until stopped"""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or names.get(thread_id, "").startswith("dibie-profiler"):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                if self._is_idle(stack[0]):
+                    self.idle_samples += 1
+                    continue
+                stack.reverse()
+                self.samples[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+    
+    @staticmethod
+    def _is_idle(leaf: Frame) -> bool:
+        filename, _, function = leaf
+        return function in IDLE_FUNCTIONS and filename.endswith(IDLE_FILES)
+    
+    @staticmethod
+    def _label(frame: Frame) -> str:
+        filename, line, function = frame
+        path = Path(filename)
+        try:
+            path = path.resolve().relative_to(Path.cwd())
+        except ValueError:
+            path = Path(*path.parts[-2:])
+        return f"{function} ({path.as_posix()}:{line})".replace(";", ",")
+    
+    def _write_folded(self, path: Path) -> str:
+        """Write samples in collapsed-stack format, one stack per line"""
+        threads = {thread for thread, _ in self.samples}
+        with open(path, 'w', encoding='utf-8') as f:
+            for (thread, stack), count in self.samples.most_common():
+                frames = [self._label(frame) for frame in stack]
+                if len(threads) > 1:
+                    frames.insert(0, thread)
+                f.write(f"{';'.join(frames)} {count}\n")
+        return str(path)
+    
+    def _sample_report(self) -> str:
+        """Hot functions by share of busy samples"""
+        total = sum(self.samples.values())
+        if not total:
+            return "No busy samples recorded"
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for (_, stack), count in self.samples.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                inclusive[frame] += count
+        
+        lines = [f"Top functions ({total} busy samples, {self.idle_samples} idle, every {self.interval * 1000:.0f} ms)",
+                 f"  {'self %':>7} {'total %':>8}  function"]
+        for frame, count in own.most_common(self.top):
+            lines.append(f"  {count / total:>7.1%} {inclusive[frame] / total:>8.1%}  {self._label(frame)}")
+        return "\n".join(lines)
+    
+    def _cprofile_report(self) -> str:
+        """Hot functions by own time from cProfile"""
+        import pstats
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        lines = ["Top functions by own time",
+                 f"  {'calls':>10} {'own s':>9} {'total s':>9}  function"]
+        for (filename, line, function), (_, calls, own_time, total_time, _) in rows:
+            lines.append(f"  {calls:>10} {own_time:>9.3f} {total_time:>9.3f}  {self._label((filename, line, function))}")
+        return "\n".join(lines)
+    
+    # ---------------------------------------------------------- allocations
+    
+    def _watch_memory(self):
+        """Snapshot the allocations when traced memory grows 10% past the last snapshot
+        
+        Snapshots are taken at most once a second; each one copies every
+        live trace.
+        """
+        import tracemalloc
+        while not self._stop.wait(1.0):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self._peak_bytes * 1.1:
+                self._take_peak_snapshot()
+    
+    def _take_peak_snapshot(self):
+        import tracemalloc
+        current, _ = tracemalloc.get_traced_memory()
+        if current >= self._peak_bytes or self._peak_snapshot is None:
+            self._peak_bytes = current
+            self._peak_snapshot = tracemalloc.take_snapshot()
+    
+    def _allocation_report(self, snapshot) -> str:
+        """Allocation sites holding the most memory at the traced peak"""
+        import tracemalloc
+        lines = [f"Top allocation sites ({self._peak_bytes / 1024 ** 2:.1f} MiB traced at the sampled peak)",
+                 f"  {'MiB':>9} {'blocks':>9}  site"]
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            site = self._label((frame.filename, frame.lineno, '')).strip(' ()')
+            lines.append(f"  {stat.size / 1024 ** 2:>9.2f} {stat.count:>9}  {site}")
+        return "\n".join(lines)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add --profile and --profile-no-allocations to an entry point's parser"""
+    parser.add_argument('--profile', nargs='?', const='sample', choices=["sample", "cprofile"],
+                        help="Profile the run (default: sample) and write the results to logs/profiles")
+    parser.add_argument('--profile-no-allocations', action='store_true',
+                        help="Profile CPU only, without tracemalloc")
+
+
+def profile_run(name: str, args: argparse.Namespace):
+    """Profiler for an entry point run, or a no-op context without --profile
+    
+    Args:
+        name: Run name used in the output file names
+        args: Parsed arguments from a parser set up with add_profile_arguments
+    """
+    if not getattr(args, 'profile', None):
+        return contextlib.nullcontext()
+    return Profiler(name, mode=args.profile, allocations=not args.profile_no_allocations)
+
+
+def run_script(path: str, args: List[str], profiler: Profiler):
+    """Run a Python script as __main__ under a profiler
+    
+    Args:
+        path: Script path
+        args: Command line arguments for the script
+        profiler: Profiler to run it under
+    """
+    script = Path(path)
+    argv, sys_path = sys.argv, list(sys.path)
+    sys.argv = [str(script)] + args
+    sys.path.insert(0, str(script.parent.resolve()))
+    import runpy
+    try:
+        with profiler:
+            runpy.run_path(str(script), run_name="__main__")
+    finally:
+        sys.argv, sys.path[:] = argv, sys_path
+
+
+def main(argv: Optional[List[str]] = None):
+    """Profile any DIBIE script: python src/profiling.py examples/normalize_data.py"""
+    parser = argparse.ArgumentParser(description="Profile a DIBIE script")
+    parser.add_argument('script', help="Script to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments for the script")
+    parser.add_argument('--mode', choices=["sample", "cprofile"], default="sample")
+    parser.add_argument('--interval', type=float, default=0.005, help="Seconds between samples")
+    parser.add_argument('--no-allocations', action='store_true',
+                        help="Do not trace allocations (tracemalloc slows pandas code down)")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output-dir', default="logs/profiles")
+    args = parser.parse_args(argv)
+    
+    profiler = Profiler(Path(args.script).stem, mode=args.mode, output_dir=args.output_dir,
+                        interval=args.interval, allocations=not args.no_allocations, top=args.top)
+    run_script(args.script, args.args, profiler)
+
+
+if __name__ == "__main__":
+    main()
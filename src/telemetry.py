@@ -0,0 +1,258 @@
+"""
+DIBIE - Telemetry
+Time spans of work and record them to a JSON Lines metrics file
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None when unavailable
+    
+    Uses getrusage on Unix and psutil, when installed, on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, 'peak_wset', info.rss)
+
+
+class Span:
+    """One timed unit of work
+    
+    ``rows`` and ``bytes`` are filled in by the code being measured, either
+    directly or through ``Telemetry.annotate``. ``peak_rss_mb`` is the
+    process high-water mark when the span ended and ``rss_growth_mb`` how
+    much of it was reached inside the span, which points at the spans that
+    set the peak.
+    """
+    
+    def __init__(self, name: str, parent: Optional[str] = None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.attrs: Dict[str, Any] = attrs
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self.seconds = 0.0
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._peak_before = peak_rss_bytes()
+    
+    def set(self, rows: Optional[int] = None, bytes: Optional[int] = None, **attrs):
+        """Set the rows and bytes handled and any extra attributes"""
+        if rows is not None:
+            self.rows = int(rows)
+        if bytes is not None:
+            self.bytes = int(bytes)
+        self.attrs.update(attrs)
+    
+    def finish(self) -> Dict:
+        """Stop the clock and return the metrics record"""
+        self.seconds = time.perf_counter() - self._started
+        peak = peak_rss_bytes()
+        record = {
+            "ts": self.started_at.isoformat(timespec='milliseconds'),
+            "span": self.name,
+            "seconds": round(self.seconds, 6),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "peak_rss_mb": round(peak / 1024 ** 2, 1) if peak is not None else None,
+            "rss_growth_mb": (round((peak - self._peak_before) / 1024 ** 2, 1)
+                              if peak is not None and self._peak_before is not None else None),
+            "status": self.status,
+            "pid": os.getpid(),
+        }
+        if self.parent:
+            record["parent"] = self.parent
+        if self.error:
+            record["error"] = self.error
+        if self.attrs:
+            record["attrs"] = self.attrs
+        return record
+
+
+class Telemetry:
+    """Record spans of pipeline work to a metrics file
+    
+    Every finished span is appended as one JSON line, so several processes
+    (pipeline workers, the Superset sync, the orchestrator) can share one
+    file and ``summary`` shows where time went across all of them. Spans
+    nest: a span opened inside another one records it as its parent.
+    """
+    
+    DEFAULT_METRICS_FILE = "logs/metrics.jsonl"
+    
+    def __init__(self, metrics_file: Optional[str] = DEFAULT_METRICS_FILE, max_bytes: int = 10 * 1024 * 1024,
+                 keep_recent: int = 1000):
+        """Initialize telemetry
+        
+        Args:
+            metrics_file: JSON Lines file spans are appended to (None keeps
+                them in memory only)
+            max_bytes: Size at which the file is rotated to ``<file>.1``
+            keep_recent: Spans of this process kept in memory
+        """
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.recent: deque = deque(maxlen=keep_recent)
+        self.logger = logging.getLogger('Telemetry')
+        self._lock = threading.Lock()
+        self._current: contextvars.ContextVar = contextvars.ContextVar('dibie_span', default=None)
+    
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        """Time the enclosed block
+        
+        Args:
+            name: Span name, ``component.operation``
+            **attrs: Extra attributes stored with the span
+        
+        Yields:
+            The span, to set rows and bytes on
+        """
+        if not self.enabled:
+            yield Span(name, **attrs)
+            return
+        
+        parent = self._current.get()
+        span = Span(name, parent=parent.name if parent else None, **attrs)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = type(e).__name__
+            raise
+        finally:
+            self._current.reset(token)
+            self.record(span.finish())
+    
+    def timed(self, name: Optional[str] = None, rows: Optional[Callable[[Any], int]] = None,
+              bytes: Optional[Callable[[Any], int]] = None) -> Callable:
+        """Decorator that runs a function inside a span
+        
+        Args:
+            name: Span name (module and function name if None)
+            rows: Function of the result giving the rows handled
+            bytes: Function of the result giving the bytes handled
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or f"{func.__module__}.{func.__qualname__}"
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name) as span:
+                    result = func(*args, **kwargs)
+                    if rows is not None and span.rows is None:
+                        span.rows = rows(result)
+                    if bytes is not None and span.bytes is None:
+                        span.bytes = bytes(result)
+                    return result
+            return wrapper
+        return decorator
+    
+    def annotate(self, rows: Optional[int] = None, bytes: Optional[int] = None, **attrs):
+        """Set rows, bytes or attributes on the innermost open span, if any"""
+        span = self._current.get()
+        if span is not None:
+            span.set(rows=rows, bytes=bytes, **attrs)
+    
+    def record(self, record: Dict):
+        """Keep a finished span and append it to the metrics file"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.recent.append(record)
+            if self.metrics_file is None:
+                return
+            try:
+                self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+                if self.metrics_file.exists() and self.metrics_file.stat().st_size >= self.max_bytes:
+                    self.metrics_file.replace(self.metrics_file.with_name(self.metrics_file.name + ".1"))
+                with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                self.logger.warning(f"Could not write metrics to {self.metrics_file}: {e}")
+    
+    def read(self, limit: int = 10_000) -> List[Dict]:
+        """Last spans in the metrics file, oldest first
+        
+        Args:
+            limit: Maximum number of spans
+        
+        Returns:
+            Span records (the in-memory spans if there is no file)
+        """
+        if self.metrics_file is None or not self.metrics_file.exists():
+            return list(self.recent)[-limit:]
+        records: deque = deque(maxlen=limit)
+        with open(self.metrics_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a concurrent writer or a crash
+                    continue
+        return list(records)
+    
+    def summary(self, limit: int = 10_000) -> Dict[str, Dict]:
+        """Aggregate recent spans by name, slowest total first
+        
+        Args:
+            limit: Number of most recent spans to aggregate
+        
+        Returns:
+            Span name to count, errors, total/mean/p95/max seconds, rows,
+            bytes, peak RSS and time of the last run
+        """
+        groups: Dict[str, List[Dict]] = {}
+        for record in self.read(limit):
+            groups.setdefault(record["span"], []).append(record)
+        
+        summary = {}
+        for name, records in groups.items():
+            seconds = sorted(r["seconds"] for r in records)
+            peaks = [r["peak_rss_mb"] for r in records if r.get("peak_rss_mb") is not None]
+            summary[name] = {
+                "count": len(records),
+                "errors": sum(r.get("status") == "error" for r in records),
+                "total_s": round(sum(seconds), 3),
+                "mean_s": round(sum(seconds) / len(seconds), 3),
+                "p95_s": round(seconds[min(len(seconds) - 1, int(0.95 * len(seconds)))], 3),
+                "max_s": round(seconds[-1], 3),
+                "rows": sum(r.get("rows") or 0 for r in records),
+                "bytes": sum(r.get("bytes") or 0 for r in records),
+                "peak_rss_mb": max(peaks) if peaks else None,
+                "last_run": records[-1]["ts"],
+            }
+        return dict(sorted(summary.items(), key=lambda item: item[1]["total_s"], reverse=True))
+
+
+# Shared instance used by the components
+telemetry = Telemetry(os.environ.get('DIBIE_METRICS_FILE', Telemetry.DEFAULT_METRICS_FILE))
+span = telemetry.span
+timed = telemetry.timed
+annotate = telemetry.annotate
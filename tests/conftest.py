@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Tests import the package as ``src`` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep spans out of logs/metrics.jsonl; read when src.telemetry is imported
+os.environ["DIBIE_METRICS_FILE"] = str(Path(tempfile.mkdtemp(prefix="dibie-tests-")) / "metrics.jsonl")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def log_dir(tmp_path_factory):
+    """Write the component logs to a temporary directory"""
+    from src.log_config import configure_logging, shutdown_logging
+
+    path = tmp_path_factory.mktemp("logs")
+    configure_logging(config={"path": str(path)}, force=True)
+    yield path
+    shutdown_logging()
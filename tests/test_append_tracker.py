@@ -0,0 +1,46 @@
+import os
+import time
+
+from src.analysis.append_tracker import AppendTracker
+
+
+def write(path, data: bytes, age: float = 0):
+    path.write_bytes(data)
+    if age:
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+
+def test_unterminated_line_waits_while_file_is_written(tmp_path):
+    path = tmp_path / "ventas.csv"
+    write(path, b"a,b\n1,2\n3,4")
+
+    assert AppendTracker.complete_lines_end(str(path), 0) == len(b"a,b\n1,2\n")
+    assert not AppendTracker.is_settled(str(path))
+
+
+def test_final_line_without_newline_is_counted(tmp_path):
+    path = tmp_path / "ventas.csv"
+    write(path, b"a,b\n1,2\n3,4", age=AppendTracker.SETTLE_SECONDS + 1)
+    tracker = AppendTracker(str(tmp_path / "state"))
+
+    assert tracker.is_settled(str(path))
+    end = tracker.complete_lines_end(str(path), 0, final=True)
+    assert end == path.stat().st_size
+
+    rows = list(tracker.iter_rows(str(path), 0, end))
+    assert rows[0].to_dict("list") == {"a": [1, 3], "b": [2, 4]}
+
+
+def test_rows_appended_after_final_line(tmp_path):
+    path = tmp_path / "ventas.csv"
+    write(path, b"a,b\n1,2\n3,4")
+    tracker = AppendTracker(str(tmp_path / "state"))
+    start = tracker.complete_lines_end(str(path), 0, final=True)
+
+    with open(path, "ab") as f:
+        f.write(b"\n5,6\n")
+    end = tracker.complete_lines_end(str(path), start)
+
+    rows = list(tracker.iter_rows(str(path), start, end, columns=["a", "b"]))
+    assert rows[0].to_dict("list") == {"a": [5], "b": [6]}
@@ -0,0 +1,33 @@
+import math
+
+from src.dashboard.chart_sampler import ChartSampler
+from src.dashboard.dashboard_generator import DashboardGenerator
+
+
+def test_lttb_caps_points_and_keeps_extremes():
+    data = [{"x": i, "y": math.sin(i / 50) + (5 if i == 1234 else 0)} for i in range(10_000)]
+
+    records, meta = ChartSampler(max_points=200).sample(data, "line", "x", "y")
+
+    assert len(records) <= 200
+    assert meta["method"] == "lttb" and meta["source_points"] == 10_000
+    assert records[0]["x"] == 0 and records[-1]["x"] == 9_999
+    assert any(record["x"] == 1234 for record in records)
+
+
+def test_bar_groups_are_capped():
+    data = [{"x": f"cat{i}", "y": i} for i in range(500)]
+
+    records, meta = ChartSampler(max_points=20).sample(data, "bar", "x", "y")
+
+    assert len(records) <= 20
+    assert sum(record["y"] for record in records) == sum(range(500))
+
+
+def test_short_chart_does_not_create_sampler(tmp_path):
+    generator = DashboardGenerator(output_dir=str(tmp_path), cache_dir=None, config={})
+
+    chart = generator.create_chart("bar", "Corta", [{"x": 1, "y": 2}], "x", "y")
+
+    assert chart["data"] == [{"x": 1, "y": 2}]
+    assert generator._chart_sampler is None
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.ingestion.columnar_store import ColumnarStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ColumnarStore(str(tmp_path / "store"))
+
+
+@pytest.fixture
+def matricula():
+    return pd.DataFrame({
+        "anio": [2023, 2023, 2024, 2024, 2024],
+        "dane_institucion": ["105001", "105002", "105001", "105001", "105002"],
+        "grado_codigo": ["1", "2", "1", "2", "1"],
+        "nivel_educativo": ["primaria"] * 5,
+        "cantidad_estudiantes": [30, 25, 28, 31, 22],
+    })
+
+
+def sort(df):
+    return df.sort_values(["anio", "dane_institucion", "grado_codigo"]).reset_index(drop=True)
+
+
+def test_round_trip_with_partition_filter(store, matricula):
+    entry = store.write_table("hechos_matricula", matricula)
+
+    assert entry["rows"] == 5
+    assert entry["partition_cols"] == ["anio", "dane_institucion"]
+    assert (store.root / "hechos_matricula" / "anio=2024" / "dane_institucion=105001").is_dir()
+
+    read = store.read("hechos_matricula", columns=list(matricula.columns), filters={"anio": 2024})
+    expected = matricula[matricula["anio"] == 2024]
+
+    result = sort(read.astype({"anio": "int64", "dane_institucion": str, "grado_codigo": str,
+                               "nivel_educativo": str}))
+    pd.testing.assert_frame_equal(result, sort(expected), check_dtype=False)
+
+
+def test_partitions_mode_replaces_only_written_partitions(store, matricula):
+    store.write_table("hechos_matricula", matricula)
+    correction = matricula[(matricula["anio"] == 2024) & (matricula["dane_institucion"] == "105002")].assign(
+        cantidad_estudiantes=99
+    )
+
+    store.write_table("hechos_matricula", correction, mode="partitions")
+    read = store.read("hechos_matricula", filters=[("cantidad_estudiantes", ">=", 28)])
+
+    assert len(store.read("hechos_matricula")) == 5
+    assert sorted(read["cantidad_estudiantes"].tolist()) == [28, 30, 31, 99]
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from src.analysis.cost_cube import CostCube
+
+
+COSTS = pd.DataFrame({
+    "institucion_id": ["A", "A", "B", "C"],
+    "anio": [2023, 2024, 2024, 2024],
+    "personal": [100.0, 120.0, 80.0, 50.0],
+    "tecnologia": [10.0, 12.0, 8.0, 5.0],
+})
+
+ENROLLMENT = pd.DataFrame({
+    "institucion_id": ["A", "A", "A", "A", "B"],
+    "anio": [2023, 2023, 2024, 2024, 2024],
+    "grado_codigo": ["1", "2", "1", "2", "1"],
+    "nivel_educativo": ["primaria"] * 5,
+    "estudiantes": [10, 30, 20, 20, 40],
+})
+
+
+def cells(cube):
+    frame = cube.to_frame().drop(columns=["costo_por_estudiante"])
+    return frame.astype({"grouping_id": "int64"}).astype(object).sort_values(
+        ["grouping_id"] + CostCube.DIMENSIONS, key=lambda col: col.astype(str)
+    ).reset_index(drop=True)
+
+
+def test_lookup_matches_groupby():
+    cube = CostCube().build(COSTS, ENROLLMENT)
+    students = ENROLLMENT.groupby("anio")["estudiantes"].sum()
+
+    for year, total in students.items():
+        cell = cube.lookup(anio=year)
+        assert cell["estudiantes"] == total
+        assert cell["costo_total_operativo"] == pytest.approx(
+            COSTS.loc[COSTS["anio"] == year, ["personal", "tecnologia"]].sum().sum()
+        )
+
+    # Institution A in 2024 splits its cost evenly over two grades of 20 students
+    assert cube.lookup(institucion_id="A", anio=2024, grado_codigo="1")["personal"] == pytest.approx(60.0)
+    assert cube.lookup(institucion_id="Z") is None
+
+
+def test_update_matches_fresh_build():
+    late = pd.DataFrame({
+        "institucion_id": ["C"],
+        "anio": [2024],
+        "grado_codigo": ["3"],
+        "nivel_educativo": ["primaria"],
+        "estudiantes": [25],
+    })
+    cube = CostCube().build(COSTS, ENROLLMENT)
+    assert cube.lookup(grado_codigo=CostCube.UNASSIGNED) is not None
+
+    cube.update(enrollment=late)
+    fresh = CostCube().build(COSTS, pd.concat([ENROLLMENT, late], ignore_index=True))
+
+    assert cube.lookup(grado_codigo=CostCube.UNASSIGNED) is None
+    pd.testing.assert_frame_equal(cells(cube), cells(fresh), check_exact=False)
+
+
+def test_saved_cube_keeps_updating(tmp_path):
+    cube = CostCube().build(COSTS, ENROLLMENT.iloc[:4])
+    cube.save(str(tmp_path))
+
+    loaded = CostCube.load(str(tmp_path))
+    loaded.update(enrollment=ENROLLMENT.iloc[4:])
+
+    pd.testing.assert_frame_equal(cells(loaded), cells(CostCube().build(COSTS, ENROLLMENT)), check_exact=False)
@@ -0,0 +1,67 @@
+import io
+import json
+
+import pytest
+
+from src.dashboard.dashboard_generator import DashboardGenerator
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return DashboardGenerator(output_dir=str(tmp_path / "output"), cache_dir=str(tmp_path / "cache"), config={})
+
+
+def test_unchanged_dashboard_is_not_rewritten(generator):
+    dashboard = generator.create_dashboard("Costos", [generator.create_kpi_card("Estudiantes", 120)])
+    path = generator.save_dashboard(dashboard, "costos", "html")
+    written = generator.output_dir.joinpath("costos.html").stat().st_mtime_ns
+
+    assert generator.save_dashboard(dashboard, "costos", "html") == path
+    assert generator.output_dir.joinpath("costos.html").stat().st_mtime_ns == written
+    assert generator.fragment_cache.is_current(path, generator.renderer.page_key(
+        dashboard, str(generator.output_dir / "costos_data")
+    ))
+
+
+def test_unchanged_fragments_are_reused(generator):
+    kpi = generator.create_kpi_card("Estudiantes", 120)
+    table = generator.create_table("Costos", [{"anio": 2024, "costo": 10.0}], ["anio", "costo"])
+    generator.renderer.render(generator.create_dashboard("Costos", [kpi, table]), io.StringIO(),
+                              cache=generator.fragment_cache)
+
+    changed = generator.create_kpi_card("Docentes", 8)
+    summary = generator.renderer.render(generator.create_dashboard("Costos", [kpi, table, changed]),
+                                        io.StringIO(), cache=generator.fragment_cache)
+
+    assert summary["cached_fragments"] == 2
+    assert summary["rendered_fragments"] == 1
+
+
+def test_write_if_changed_skips_identical_bytes(generator, tmp_path):
+    cache = generator.fragment_cache
+    path = str(tmp_path / "page.html")
+
+    assert cache.write_if_changed(path, b"<p>1</p>", key="a")
+    assert not cache.write_if_changed(path, b"<p>1</p>", key="a")
+    assert cache.write_if_changed(path, b"<p>2</p>", key="b")
+    assert cache.is_current(path, "b")
+    assert not list(cache.cache_dir.glob("*.tmp"))
+
+
+def test_large_table_streams_into_json_chunks(tmp_path):
+    generator = DashboardGenerator(output_dir=str(tmp_path / "output"), cache_dir=None,
+                                   config={"renderer": {"inline_rows": 10, "page_size": 5, "chunk_rows": 20}})
+    rows = [{"anio": 2024, "costo": i} for i in range(45)]
+    dashboard = generator.create_dashboard("Costos", [generator.create_table("<Costos>", rows, ["anio", "costo"])])
+
+    out = io.StringIO()
+    summary = generator.stream_html(dashboard, out, data_dir=str(tmp_path / "data"))
+    html = out.getvalue()
+
+    assert summary["paginated_tables"] == 1
+    assert summary["json_chunks"] == 3
+    assert html.count("<tr><td>") == 5
+    assert "&lt;Costos&gt;" in html
+    chunks = sorted((tmp_path / "data" / "table_0").glob("chunk_*.json"))
+    values = [row[1] for chunk in chunks for row in json.loads(chunk.read_text(encoding="utf-8"))["rows"]]
+    assert sorted(values) == list(range(45))
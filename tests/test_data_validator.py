@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.analysis.data_validator import DataValidator
+
+DICTIONARY = Path(__file__).resolve().parent.parent / "config" / "diccionario_costo_estudiante.py"
+
+
+@pytest.fixture
+def validator(tmp_path):
+    validator = DataValidator(dictionary_path=str(DICTIONARY), reference_dir=str(tmp_path))
+    validator.set_reference_keys("maestro_instituciones", "dane_institucion", pd.Series(["105001", "105002"]))
+    return validator
+
+
+@pytest.fixture
+def matricula():
+    return pd.DataFrame({
+        "dane_institucion": ["105001", 105001.0, "105002", "999999"],
+        "anio": [2024, 2024, 2024, 2024],
+        "grado_codigo": ["1", "1", " ", "2"],
+        "cantidad_estudiantes": [30, 25, -4, "veinte"],
+    })
+
+
+def test_rule_failures_are_reported(validator, matricula):
+    result = validator.validate(matricula, "matricula")
+
+    assert result["summary"]["regla:cantidad_estudiantes >= 0"] == 1
+    assert result["summary"]["tipo:cantidad_estudiantes"] == 1
+    assert result["summary"]["obligatorio:grado_codigo"] == 1
+    assert result["summary"]["llave_primaria"] == 1
+    assert result["summary"]["llave_foranea:dane_institucion"] == 1
+    assert result["invalid"].tolist() == [False, True, True, True]
+    assert result["invalid_rows"] == 3
+
+
+def test_business_rule_ranges(validator):
+    rows = pd.DataFrame({"ratio_estudiante_docente": [20, 40, None]})
+
+    result = validator.validate(rows, "matricula")
+
+    assert result["violations"]["regla:" + validator.business_rules[-1]["expression"]].tolist() == [False, True, False]
+    assert "cantidad_estudiantes" in result["missing_columns"]
+
+
+def test_chunks_report_keys_repeated_across_chunks(validator, matricula):
+    totals = validator.validate_chunks([matricula.iloc[:1], matricula.iloc[1:]], "matricula")
+
+    assert totals["summary"] == validator.validate(matricula, "matricula")["summary"]
+    assert totals["invalid_rows"] == 3
@@ -0,0 +1,67 @@
+import pytest
+
+from src.ingestion.document_processor import DocumentProcessor
+
+TEXT = "Primera línea con palabras\n\nsegunda\tlínea  con espacios raros\r\núltima sin salto"
+
+
+@pytest.fixture
+def processor(tmp_path):
+    return DocumentProcessor(output_dir=str(tmp_path / "documents"))
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 64])
+def test_streaming_counts_equal_full_read(processor, tmp_path, block_size):
+    path = tmp_path / "texto.txt"
+    path.write_text(TEXT, encoding="utf-8")
+
+    full = processor.process_text_file(str(path))
+    streamed = processor.process_text_file(str(path), streaming=True, include_content=False,
+                                           block_size=block_size)
+
+    for key in ("word_count", "char_count", "line_count"):
+        assert streamed[key] == full[key], key
+    assert "content" not in streamed
+
+
+def test_passages_rejoin_to_the_text(processor, tmp_path):
+    path = tmp_path / "texto.txt"
+    path.write_text(TEXT * 20, encoding="utf-8")
+
+    passages = list(processor._iter_text_passages(path, block_size=16))
+
+    assert "".join(passages) == path.read_text(encoding="utf-8")
+
+
+def test_text_without_whitespace_is_cut_at_block_size(processor, tmp_path):
+    path = tmp_path / "base64.txt"
+    path.write_text("QUJD" * 1000, encoding="utf-8")
+
+    passages = list(processor._iter_text_passages(path, block_size=100))
+
+    assert "".join(passages) == "QUJD" * 1000
+    assert max(len(passage) for passage in passages) <= 100
+
+
+def test_unchanged_and_duplicate_files_are_not_processed_again(processor, tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.txt").write_text("costos 2023", encoding="utf-8")
+    (source / "b.txt").write_text("costos 2024", encoding="utf-8")
+
+    first = processor.process_directory(str(source), extensions=[".txt"])
+    assert len(first["processed"]) == 2
+
+    (source / "copia.txt").write_text("costos 2023", encoding="utf-8")
+    second = processor.process_directory(str(source), extensions=[".txt"])
+
+    assert second["processed"] == []
+    assert second["skipped"] == 2
+    assert second["duplicates"] == {str(source / "copia.txt"): str(source / "a.txt")}
+
+    (source / "b.txt").unlink()
+    third = processor.process_directory(str(source), extensions=[".txt"])
+
+    assert third["processed"] == []
+    assert third["skipped"] == 2
+    assert third["removed"] == [str(source / "b.txt")]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from src.ingestion.dtype_optimizer import DtypeOptimizer
+
+
+def test_numbers_in_object_column_are_kept():
+    converted = DtypeOptimizer().convert_column(pd.Series([1, 2, "3"], dtype=object))
+
+    assert converted.tolist() == [1, 2, 3]
+
+
+def test_mixed_category_keeps_non_string_values():
+    series = pd.Series(["a", "b", 5] * 20)
+
+    converted = DtypeOptimizer().convert_column(series)
+
+    assert converted.notna().sum() == series.notna().sum()
+    assert converted.astype(object).tolist() == series.tolist()
+
+
+def test_blank_cells_become_missing():
+    converted = DtypeOptimizer().convert_column(pd.Series([" 1", " ", "2", None]))
+
+    assert converted.tolist() == [1, pd.NA, 2, pd.NA]
+
+
+def test_optimize_does_not_lose_values():
+    df = pd.DataFrame({
+        "codigo": ["05001", "05002"] * 50,
+        "valor": [1.5, 2.25] * 50,
+        "fecha": ["2024-01-31", "2024-02-29"] * 50,
+        "mixto": [1, "dos"] * 50,
+    })
+
+    optimized, report = DtypeOptimizer().optimize(df)
+
+    assert (optimized.notna().sum() == df.notna().sum()).all()
+    assert optimized["codigo"].astype(str).tolist() == df["codigo"].tolist()
+    assert optimized["valor"].astype(float).tolist() == df["valor"].tolist()
+    assert report["memory_after_mb"] <= report["memory_before_mb"]
@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openpyxl")
+pytest.importorskip("pyarrow")
+
+from src.ingestion.excel_reader import ExcelReader
+
+
+def write_workbook(path, students):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"grado_codigo": ["1", "2"], "cantidad_estudiantes": students}).to_excel(
+            writer, sheet_name="matricula", index=False
+        )
+        pd.DataFrame({"anio": [2024], "personal": [1000.0]}).to_excel(writer, sheet_name="costos", index=False)
+
+
+@pytest.fixture
+def reader(tmp_path):
+    return ExcelReader(cache_dir=str(tmp_path / "cache"), max_workers=1, engine="openpyxl")
+
+
+def test_cache_key_changes_with_the_file(reader, tmp_path):
+    workbook = tmp_path / "matricula.xlsx"
+    write_workbook(workbook, [30, 25])
+
+    first = reader.read_workbook(str(workbook))
+    assert list(first) == ["matricula", "costos"]
+    assert first["matricula"]["cantidad_estudiantes"].tolist() == [30, 25]
+    (cache,) = (tmp_path / "cache").iterdir()
+
+    # Same size, later modification time
+    write_workbook(workbook, [31, 26])
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    second = reader.read_sheet(str(workbook), "matricula")
+    (updated,) = (tmp_path / "cache").iterdir()
+
+    assert updated != cache
+    assert second["cantidad_estudiantes"].tolist() == [31, 26]
+
+
+def test_unchanged_file_is_read_from_the_cache(reader, tmp_path):
+    workbook = tmp_path / "matricula.xlsx"
+    write_workbook(workbook, [30, 25])
+    reader.read_workbook(str(workbook))
+    (cache,) = (tmp_path / "cache").iterdir()
+    manifest = (cache / "manifest.json").stat().st_mtime_ns
+
+    frames = reader.read_workbook(str(workbook), sheets=[1, "matricula"])
+
+    assert list(frames) == ["costos", "matricula"]
+    assert (cache / "manifest.json").stat().st_mtime_ns == manifest
@@ -0,0 +1,15 @@
+import importlib
+
+import pytest
+
+
+def test_public_names_resolve_from_package():
+    src = importlib.import_module("src")
+    for name in src.__all__:
+        assert getattr(src, name).__name__ == name
+
+
+def test_unknown_name_raises_attribute_error():
+    src = importlib.import_module("src")
+    with pytest.raises(AttributeError):
+        src.NotAComponent
@@ -0,0 +1,39 @@
+import importlib.util
+
+from src.pipeline import Pipeline, Stage
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build(tmp_path, script):
+    def wrapper():
+        # Thin wrapper like the examples/run_pipeline.py stages
+        return load_module(script).transform()
+
+    return Pipeline([Stage("transform", wrapper, outputs=["result"], files=[script])],
+                    cache_dir=str(tmp_path / "cache"))
+
+
+def test_unchanged_stage_is_skipped(tmp_path):
+    script = tmp_path / "transform.py"
+    script.write_text("def transform():\n    return 1\n")
+
+    assert build(tmp_path, script).run()["transform"]["status"] == "ran"
+    assert build(tmp_path, script).run()["transform"]["status"] == "skipped"
+
+
+def test_editing_the_called_function_reruns_the_stage(tmp_path):
+    script = tmp_path / "transform.py"
+    script.write_text("def transform():\n    return 1\n")
+    build(tmp_path, script).run()
+
+    script.write_text("def transform():\n    return 2\n")
+    pipeline = build(tmp_path, script)
+
+    assert pipeline.run()["transform"]["status"] == "ran"
+    assert pipeline.artifact("result") == 2
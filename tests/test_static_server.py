@@ -0,0 +1,57 @@
+import gzip
+import http.client
+
+import pytest
+
+from src.dashboard.static_server import DashboardServer, precompress
+
+PAGE = ("<html><body>" + "<p>costo por estudiante</p>" * 100 + "</body></html>").encode("utf-8")
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "costos.html").write_bytes(PAGE)
+    precompress(str(tmp_path / "costos.html"))
+    server = DashboardServer(str(tmp_path), port=0)
+    server.start(background=True)
+    yield server
+    server.stop()
+
+
+def get(server, path, **headers):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+
+def test_serves_precompressed_sibling(server):
+    response, body = get(server, "/costos.html", **{"Accept-Encoding": "gzip, deflate"})
+
+    assert response.status == 200
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body) == PAGE
+
+    response, body = get(server, "/costos.html")
+    assert response.getheader("Content-Encoding") is None
+    assert body == PAGE
+
+
+def test_conditional_request_is_not_modified(server):
+    response, _ = get(server, "/costos.html")
+    etag = response.getheader("ETag")
+
+    response, body = get(server, "/costos.html", **{"If-None-Match": etag})
+
+    assert response.status == 304
+    assert body == b""
+    assert get(server, "/costos.html", **{"If-None-Match": '"otro"'})[0].status == 200
+
+
+def test_compressed_files_are_not_served_directly(server):
+    assert get(server, "/costos.html.gz")[0].status == 404
+    assert get(server, "/../costos.html")[0].status == 404
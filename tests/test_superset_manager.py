@@ -0,0 +1,19 @@
+import json
+import sqlite3
+
+from src.dashboard.superset_manager import SupersetManager
+
+
+def test_refresh_after_sync_accepts_a_generator(tmp_path):
+    db_path = tmp_path / "dibie.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE hechos (x INTEGER)")
+        conn.execute("CREATE VIEW v_hechos AS SELECT x FROM hechos")
+    config_path = tmp_path / "dashboards.json"
+    config_path.write_text(json.dumps({"dashboards": [{"slices": [{"datasource": "otra_vista"}]}]}))
+
+    summary = SupersetManager().refresh_after_sync((name for name in ["hechos"]), str(db_path),
+                                                   str(config_path))
+
+    assert summary["changed_tables"] == ["hechos"]
+    assert summary["datasets"] == []
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.table_profile import TableProfile
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "institucion_id": rng.integers(0, 500, 4000).astype(str),
+        "anio": rng.choice([2022, 2023, 2024], 4000),
+        "costo": rng.normal(100, 10, 4000).round(1),
+    })
+    df.loc[::7, "costo"] = np.nan
+    # Exact copies of earlier rows
+    return pd.concat([df, df.iloc[:300]], ignore_index=True)
+
+
+def test_profile_matches_pandas(table):
+    profile = TableProfile(bloom_capacity=100_000, seed=0)
+    for start in range(0, len(table), 1000):
+        profile.update(table.iloc[start:start + 1000])
+
+    assert profile.rows == len(table)
+    assert profile.null_counts == table.isnull().sum().to_dict()
+    assert profile.duplicates()["duplicate_count"] == pytest.approx(table.duplicated().sum(), abs=3)
+
+    types = profile.data_types()
+    for col in table.columns:
+        assert types[col]["unique_values"] == pytest.approx(table[col].nunique(), rel=0.03)
+    assert types["anio"]["top_values"][0]["value"] == table["anio"].value_counts().index[0]
+
+
+def test_merged_halves_equal_single_pass(table):
+    whole = TableProfile(exact_duplicates=True, seed=0)
+    whole.update(table)
+
+    first, second = TableProfile(exact_duplicates=True, seed=0), TableProfile(exact_duplicates=True, seed=0)
+    first.update(table.iloc[:2500])
+    second.update(table.iloc[2500:])
+    merged = TableProfile.combine([first, second])
+
+    assert merged.rows == whole.rows
+    assert merged.null_counts == whole.null_counts
+    assert merged.duplicates() == whole.duplicates()
+    for col in table.columns:
+        assert merged.distinct[col].count() == whole.distinct[col].count()
+
+
+def test_saved_profile_merges_like_the_original(table, tmp_path):
+    first, second = TableProfile(exact_duplicates=True, seed=0), TableProfile(exact_duplicates=True, seed=0)
+    first.update(table.iloc[:2500])
+    second.update(table.iloc[2500:])
+
+    loaded = TableProfile.load(first.save(str(tmp_path / "part_0")))
+    merged = loaded.merge(second)
+
+    assert merged.completeness() == first.merge(second).completeness()
+    assert merged.duplicates()["duplicate_count"] == table.duplicated().sum()